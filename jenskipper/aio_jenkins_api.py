@@ -0,0 +1,284 @@
+"""
+An :mod:`asyncio` client for the Jenkins API.
+
+:class:`AsyncJenkinsClient` exposes the same operations as
+:mod:`jenskipper.jenkins_api`, but as coroutines, so thousands of requests can
+be in flight at the same time. It shares URL building and response handling
+with the synchronous API, so both raise the same exceptions.
+
+This module requires :mod:`aiohttp`::
+
+    $ pip install jenskipper[async]
+
+"""
+import asyncio
+
+import requests
+import requests.structures
+from six.moves.urllib import parse as urlparse
+
+try:
+    import aiohttp
+    HAVE_AIOHTTP = True
+except ImportError:
+    HAVE_AIOHTTP = False
+
+from . import jenkins_api
+from . import exceptions
+
+
+#: Default maximum number of requests in flight
+DEFAULT_CONCURRENCY = 100
+
+
+class AsyncJenkinsClient(object):
+    """
+    An asynchronous Jenkins client.
+
+    *concurrency* is the maximum number of requests in flight at any given
+    time. *auth* is a ``(username, password)`` tuple, *headers* and *cookies*
+    are sent with all requests.
+
+    Use :meth:`from_session` to create a client from a session returned by
+    :func:`jenskipper.jenkins_api.auth`. Clients must be closed with
+    :meth:`close`, or used as asynchronous context managers::
+
+        async with AsyncJenkinsClient.from_session(session) as client:
+            config = await client.get_job_config('my-job')
+
+    """
+
+    def __init__(self, jenkins_url, auth=None, headers=None, cookies=None,
+                 concurrency=DEFAULT_CONCURRENCY, use_crumbs=False):
+        if not HAVE_AIOHTTP:
+            raise RuntimeError('the asyncio client requires aiohttp')
+        self.jenkins_url = jenkins_url
+        self.concurrency = concurrency
+        self.use_crumbs = use_crumbs
+        self.crumb_headers = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._crumb_lock = asyncio.Lock()
+        if auth is not None:
+            auth = aiohttp.BasicAuth(*auth)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        self._session = aiohttp.ClientSession(connector=connector, auth=auth,
+                                              headers=headers,
+                                              cookies=cookies)
+
+    @classmethod
+    def from_session(cls, session, concurrency=DEFAULT_CONCURRENCY):
+        """
+        Create a client sharing the URL, credentials, headers (including the
+        crumb, if any) and cookies of a :class:`requests.Session` returned by
+        :func:`jenskipper.jenkins_api.auth`.
+        """
+        client = cls(session.jenkins_url,
+                     auth=session.auth,
+                     headers=dict(session.headers),
+                     cookies=session.cookies.get_dict(),
+                     concurrency=concurrency,
+                     use_crumbs=session.use_crumbs)
+        if session.crumb_field is not None:
+            client.crumb_headers = {session.crumb_field: session.crumb}
+        return client
+
+    async def close(self):
+        await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        await self.close()
+
+    async def request(self, method, url, data=None, headers=None):
+        """
+        Send a request and read the response.
+
+        Return a :class:`requests.Response` object, so the response handling
+        functions of :mod:`jenskipper.jenkins_api` can be used on it.
+
+        Like :class:`jenskipper.jenkins_api.JenkinsSession`, a crumb is
+        fetched right before sending the first mutating request if the server
+        demands it.
+        """
+        needs_crumb = (self.use_crumbs and
+                       method.upper() not in jenkins_api.SAFE_HTTP_METHODS)
+        if not needs_crumb:
+            return await self._send(method, url, data, headers)
+        if self.crumb_headers is None:
+            await self._refresh_crumb(None)
+        crumb_headers = self.crumb_headers
+        resp = await self._send(method, url, data,
+                                dict(headers or {}, **crumb_headers))
+        if jenkins_api._is_crumb_error(resp):
+            await self._refresh_crumb(crumb_headers)
+            resp = await self._send(method, url, data,
+                                    dict(headers or {}, **self.crumb_headers))
+        return resp
+
+    async def _refresh_crumb(self, stale_crumb_headers):
+        async with self._crumb_lock:
+            if self.crumb_headers == stale_crumb_headers:
+                resp = await self.get(urlparse.urljoin(
+                    self.jenkins_url, '/crumbIssuer/api/json'
+                ))
+                resp.raise_for_status()
+                crumbs_dict = resp.json()
+                self.crumb_headers = {
+                    crumbs_dict['crumbRequestField']: crumbs_dict['crumb'],
+                }
+
+    async def _send(self, method, url, data, headers):
+        async with self._semaphore:
+            async with self._session.request(method, url, data=data,
+                                             headers=headers,
+                                             allow_redirects=True) as aresp:
+                content = await aresp.read()
+                return _to_requests_response(aresp, content)
+
+    async def get(self, url):
+        return await self._send('GET', url, None, None)
+
+    async def post(self, url, data=None, headers=None):
+        return await self.request('POST', url, data=data, headers=headers)
+
+    async def _post_data(self, url, data, content_type='application/xml'):
+        data, headers = jenkins_api._encode_post_data(data, content_type)
+        return await self.post(url, data, headers=headers)
+
+    async def map(self, func, items):
+        """
+        Call coroutine function ``func(item)`` for each element of *items*
+        concurrently.
+
+        Return a list of ``(item, result, error)`` tuples in the order of
+        *items*, like :func:`jenskipper.jenkins_api.get_jobs_configs`.
+        """
+        items = list(items)
+        results = await asyncio.gather(*[func(i) for i in items],
+                                       return_exceptions=True)
+        ret = []
+        for item, result in zip(items, results):
+            if isinstance(result, (exceptions.JenskipperError,
+                                   requests.RequestException,
+                                   aiohttp.ClientError)):
+                ret.append((item, None, result))
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                ret.append((item, result, None))
+        return ret
+
+    async def list_jobs(self):
+        """
+        Get the names of jobs on the server.
+        """
+        data = await self.get_object('', tree='jobs[name]')
+        return [j['name'] for j in data['jobs']]
+
+    async def get_job_config(self, name):
+        """
+        Get the XML configuration for job *name* from server.
+        """
+        url = jenkins_api._get_job_config_url(self, name)
+        resp = await self.get(url)
+        return jenkins_api._handle_job_config_response(resp, name)
+
+    async def get_jobs_configs(self, names):
+        """
+        Get the XML configurations of jobs *names*, see
+        :func:`jenskipper.jenkins_api.get_jobs_configs`.
+        """
+        return await self.map(self.get_job_config, names)
+
+    async def push_job_config(self, name, config, allow_create=True):
+        """
+        Replace the configuration of job *name* with *config*, see
+        :func:`jenskipper.jenkins_api.push_job_config`.
+        """
+        url = jenkins_api._get_job_config_url(self, name)
+        resp = await self._post_data(url, config)
+        if jenkins_api._push_job_config_needs_create(resp, allow_create):
+            await self.create_job(name, config)
+
+    async def create_job(self, name, conf):
+        """
+        Create a new job named *name* with *conf* on server.
+        """
+        url = jenkins_api._get_create_job_url(self, name)
+        resp = await self._post_data(url, conf, 'application/xml')
+        resp.raise_for_status()
+
+    async def delete_job(self, name):
+        """
+        Delete job named *name* on server.
+        """
+        resp = await self.post(jenkins_api._get_delete_job_url(self, name))
+        resp.raise_for_status()
+
+    async def rename_job(self, name, new_name):
+        """
+        Rename job *name* to *new_name* on server.
+        """
+        url = jenkins_api._get_rename_job_url(self, name, new_name)
+        resp = await self.post(url)
+        resp.raise_for_status()
+
+    async def build_job(self, job_name, parameters=None):
+        """
+        Trigger a build for *job_name*, see
+        :func:`jenskipper.jenkins_api.build_job`.
+        """
+        url = jenkins_api._get_build_job_url(self, job_name, parameters)
+        resp = await self._post_data(url, parameters)
+        return jenkins_api._handle_build_job_response(resp, job_name)
+
+    async def get_build_log(self, build_url):
+        """
+        Retrieve the log for build at *build_url*.
+        """
+        resp = await self.get(jenkins_api._get_build_log_url(build_url))
+        resp.raise_for_status()
+        return resp.text
+
+    async def get_object(self, path_or_url, tree=None, depth=None):
+        """
+        Get data from the ``api/json`` page of *path_or_url*, see
+        :func:`jenskipper.jenkins_api.get_object`.
+        """
+        url = jenkins_api._get_object_url(self, path_or_url, tree, depth)
+        resp = await self.get(url)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def toggle_job(self, job_name, enable):
+        """
+        Enable or disable a job.
+        """
+        url = jenkins_api._get_toggle_job_url(self, job_name, enable)
+        resp = await self.post(url)
+        resp.raise_for_status()
+
+    async def get_artifact(self, job_name, build, artifact_name, node_name):
+        """
+        Get a build artifact.
+
+        Return a :class:`requests.Response` object. Unlike the synchronous
+        version the artifact is not streamed, its whole content is read in
+        memory.
+        """
+        url = jenkins_api._get_artifact_url(self, job_name, build,
+                                            artifact_name, node_name)
+        return await self.get(url)
+
+
+def _to_requests_response(aresp, content):
+    resp = requests.Response()
+    resp.status_code = aresp.status
+    resp.reason = aresp.reason
+    resp.url = str(aresp.url)
+    resp.headers = requests.structures.CaseInsensitiveDict(aresp.headers)
+    resp.encoding = aresp.charset
+    resp._content = content
+    return resp
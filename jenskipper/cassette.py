@@ -0,0 +1,211 @@
+"""
+Record requests made to the Jenkins server, and replay them later.
+
+Interactions (requests and their responses) are stored in cassettes,
+gzipped files containing one JSON document per line. Each interaction is
+appended to the cassette as soon as its response is received, so partial
+recordings are usable.
+
+Enable recording with :func:`enable_recording` or replay with
+:func:`enable_replay`, then :func:`jenskipper.jenkins_api.auth` mounts the
+corresponding transport adapter on the sessions it creates.
+"""
+import base64
+import collections
+import functools
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+
+import requests
+import requests.adapters
+import requests.structures
+import six
+
+from . import exceptions
+
+
+_adapter_factory = None
+
+
+def enable_recording(fname):
+    """
+    Record the requests made by the next sessions in cassette *fname*.
+
+    Interactions are appended to the cassette if it already exists.
+    """
+    global _adapter_factory
+    _adapter_factory = functools.partial(RecordingAdapter, fname)
+
+
+def enable_replay(fname, latency_factor=0):
+    """
+    Make the next sessions replay the interactions recorded in cassette
+    *fname* instead of sending requests.
+
+    Responses are delayed by their recorded latency multiplied by
+    *latency_factor* (i.e. 0 to replay as fast as possible, 1 to replay at
+    the recorded speed).
+    """
+    global _adapter_factory
+    cassette = Cassette.load(fname)
+    _adapter_factory = functools.partial(ReplayAdapter, cassette,
+                                         latency_factor)
+
+
+def disable():
+    """
+    Stop recording or replaying.
+    """
+    global _adapter_factory
+    _adapter_factory = None
+
+
+def is_enabled():
+    """
+    Tell if recording or replaying is enabled.
+    """
+    return _adapter_factory is not None
+
+
+def mount(session):
+    """
+    Mount the recording or replaying adapter on *session*, if enabled.
+    """
+    if _adapter_factory is None:
+        return
+    adapter = _adapter_factory()
+    for prefix in ('http://', 'https://'):
+        session.mount(prefix, adapter)
+
+
+class Cassette(object):
+    """
+    Recorded interactions, indexed by request.
+
+    Requests are identified by their method, URL and a hash of their body.
+    Identical requests are replayed in the order they were recorded; the last
+    one is replayed again if they are all used up (e.g. when polling).
+    """
+
+    def __init__(self, interactions):
+        self._interactions = collections.defaultdict(collections.deque)
+        for interaction in interactions:
+            self._interactions[_get_key(interaction['method'],
+                                        interaction['url'],
+                                        interaction['body_hash'])].append(
+                interaction
+            )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, fname):
+        with gzip.open(fname, 'rb') as fp:
+            interactions = [json.loads(line.decode('utf8')) for line in fp
+                            if line.strip()]
+        return cls(interactions)
+
+    def pop(self, method, url, body):
+        """
+        Get the interaction recorded for a request.
+
+        Raise :class:`jenskipper.exceptions.InteractionNotRecorded` if there
+        is none.
+        """
+        key = _get_key(method, url, _hash_body(body))
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise exceptions.InteractionNotRecorded(method, url)
+            if len(interactions) > 1:
+                return interactions.popleft()
+            return interactions[0]
+
+
+class RecordingAdapter(requests.adapters.HTTPAdapter):
+    """
+    A transport adapter recording interactions in cassette *fname*.
+    """
+
+    def __init__(self, fname, **kwargs):
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.fname = fname
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        start_time = time.time()
+        resp = super(RecordingAdapter, self).send(request, **kwargs)
+        # Read the body now, even for streamed responses, so it can be
+        # recorded; reading it again later is served from memory
+        content = resp.content
+        interaction = {
+            'method': request.method,
+            'url': request.url,
+            'body_hash': _hash_body(request.body),
+            'status': resp.status_code,
+            'reason': resp.reason,
+            'headers': dict(resp.headers),
+            'body': base64.b64encode(content).decode('ascii'),
+            'elapsed': time.time() - start_time,
+        }
+        line = json.dumps(interaction, sort_keys=True).encode('utf8') + b'\n'
+        with self._lock:
+            # Each interaction is written in its own gzip member, so the
+            # cassette stays valid if the process is interrupted
+            with gzip.open(self.fname, 'ab') as fp:
+                fp.write(line)
+        return resp
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """
+    A transport adapter replaying the interactions recorded in
+    :class:`Cassette` *cassette*.
+    """
+
+    def __init__(self, cassette, latency_factor=0):
+        super(ReplayAdapter, self).__init__()
+        self.cassette = cassette
+        self.latency_factor = latency_factor
+
+    def send(self, request, stream=False, **kwargs):
+        interaction = self.cassette.pop(request.method, request.url,
+                                        request.body)
+        if self.latency_factor:
+            time.sleep(interaction['elapsed'] * self.latency_factor)
+        content = base64.b64decode(interaction['body'])
+        resp = requests.Response()
+        resp.status_code = interaction['status']
+        resp.reason = interaction['reason']
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.headers = requests.structures.CaseInsensitiveDict(
+            interaction['headers']
+        )
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.raw = io.BytesIO(content)
+        if not stream:
+            resp.content
+        return resp
+
+    def close(self):
+        pass
+
+
+def _get_key(method, url, body_hash):
+    return (method.upper(), url, body_hash)
+
+
+def _hash_body(body):
+    if body is None:
+        return None
+    if isinstance(body, six.text_type):
+        body = body.encode('utf8')
+    elif not isinstance(body, bytes):
+        # Generators and files are not replayable anyway
+        return None
+    return hashlib.sha1(body).hexdigest()
@@ -10,4 +10,4 @@ def authenticate(base_dir):
     """
     Authenticate against the jenkins server.
     """
-    jenkins_api.auth(base_dir)
+    jenkins_api.auth(base_dir, use_cache=False)
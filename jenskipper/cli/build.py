@@ -13,6 +13,7 @@ RESULT_COLORS = {
     'UNSTABLE': 'yellow',
     'FAILURE': 'red',
 }
+BUILD_RESULT_TREE = 'result,runs[url]'
 
 
 @click.command()
@@ -86,7 +87,8 @@ def print_build_result(session, base_dir, job_name, build_url, result=None,
     """
     # Get result and/or runs URLs if not given in arguments
     if result is None or runs_urls is None:
-        build_infos = jenkins_api.get_object(session, build_url)
+        build_infos = jenkins_api.get_object(session, build_url,
+                                             tree=BUILD_RESULT_TREE)
     if result is None:
         result = build_infos['result']
     if runs_urls is None:
@@ -108,7 +110,8 @@ def print_build_result(session, base_dir, job_name, build_url, result=None,
             print(log.rstrip())
             _print_marker('End of "%s" logs' % job_name)
         for run_url in runs_urls:
-            run_info = jenkins_api.get_object(session, run_url)
+            run_info = jenkins_api.get_object(session, run_url,
+                                              tree='fullDisplayName,result')
             print_build_result(session,
                                base_dir,
                                run_info['fullDisplayName'],
@@ -131,7 +134,8 @@ def _get_builds_urls(session, queue_urls):
     while True:
         for job_name, queue_url in list(queue_urls.items()):
             try:
-                queue_infos = jenkins_api.get_object(session, queue_url)
+                queue_infos = jenkins_api.get_object(session, queue_url,
+                                                     tree='executable[url]')
             except requests.HTTPError as exc:
                 if exc.response.status_code == 404:
                     # A 404 means that the queue info is not available anymore.
@@ -157,7 +161,8 @@ def _poll_builds(session, builds_urls):
     builds_urls = builds_urls.copy()
     while True:
         for job_name, build_url in list(builds_urls.items()):
-            build_infos = jenkins_api.get_object(session, build_url)
+            build_infos = jenkins_api.get_object(session, build_url,
+                                                 tree=BUILD_RESULT_TREE)
             result = build_infos['result']
             if result is not None:
                 runs_urls = _get_runs_urls(build_infos)
@@ -1,18 +1,16 @@
-import sys
-
 import click
-import jinja2
 
 from . import decorators
-from .. import repository
-from .. import templates
+from .. import render_pool
 
 
 @click.command()
 @decorators.repos_command
 @decorators.jobs_command()
+@decorators.render_command
+@decorators.profile_templates_command
 @click.pass_context
-def check(context, jobs_names, base_dir):
+def check(context, jobs_names, base_dir, workers, profile_templates):
     """
     Check JOBS templates render correctly.
     """
@@ -20,20 +18,19 @@ def check(context, jobs_names, base_dir):
         context.exit(0)
 
     ret = 0
-    for job in jobs_names:
+    if profile_templates:
+        workers = 1
+    results = render_pool.render_jobs(base_dir, jobs_names, workers=workers,
+                                      use_cache=not profile_templates)
+    for job, _, error in results:
         click.secho('Checking %s' % job, fg='green')
-        try:
-            repository.get_job_conf(base_dir, job)
-        except jinja2.TemplateNotFound as exc:
-            click.secho('    Template not found: %s' % exc.name, fg='red',
-                        bold=True)
-            click.secho('')
+        if error is None:
+            continue
+        decorators.print_render_error(error, lines_prefix='    ')
+        click.secho('')
+        if error.missing_template is not None:
             ret |= 1
-        except jinja2.TemplateError:
-            exc_info = sys.exc_info()
-            stack, error = templates.extract_jinja_error(exc_info, base_dir)
-            templates.print_jinja_error(stack, error, lines_prefix='    ')
-            click.secho('')
+        else:
             ret |= 2
 
     click.secho('')
@@ -1,4 +1,5 @@
 import functools
+import os.path as op
 import sys
 
 import click
@@ -16,6 +17,7 @@ from .. import conf
 from .. import exceptions
 from .. import utils
 from .. import templates
+from .. import template_profiler
 
 
 def repos_command(func):
@@ -65,13 +67,13 @@ def jobs_command(num_jobs=-1, dirty_flag=False, allow_unknown=False,
             if num_jobs == 1:
                 jobs_names = [jobs_names]
             if not allow_unknown:
-                jobs_defs = repository.get_jobs_defs(base_dir)
+                repos_jobs = _get_jobs_names(base_dir=base_dir)
                 if not jobs_names:
                     if default_to_all:
-                        jobs_names = jobs_defs.keys()
+                        jobs_names = repos_jobs
                     else:
                         jobs_names = []
-                unknown_jobs = set(jobs_names).difference(jobs_defs)
+                unknown_jobs = set(jobs_names).difference(repos_jobs)
                 if unknown_jobs:
                     click.secho('Job(s) not found in repository: %s' %
                                 ', '.join(unknown_jobs), fg='red', bold=True)
@@ -225,11 +227,64 @@ def handle_jinja_errors(func):
             exc_info = sys.exc_info()
             stack, error = templates.extract_jinja_error(exc_info, base_dir)
             templates.print_jinja_error(stack, error)
+        except exceptions.RenderError as exc:
+            print_render_error(exc)
         sys.exit(1)
 
     return wrapper
 
 
+def print_render_error(error, lines_prefix=''):
+    """
+    Print :class:`jenskipper.exceptions.RenderError` *error*.
+    """
+    if error.missing_template is not None:
+        click.secho('%sTemplate not found: %s' % (lines_prefix,
+                                                  error.missing_template),
+                    fg='red', bold=True)
+    else:
+        templates.print_jinja_error(error.stack, error.message,
+                                    lines_prefix=lines_prefix)
+
+
+def render_command(func):
+    """
+    Options for commands rendering jobs in parallel, see
+    :mod:`jenskipper.render_pool`.
+
+    The command receives a *workers* argument.
+    """
+
+    return click.option('--workers', '-j', type=click.IntRange(min=1),
+                        help='Number of processes rendering jobs (default: '
+                        'the number of CPUs).')(func)
+
+
+def profile_templates_command(func):
+    """
+    Add a ``--profile-templates`` flag, printing a profile of the templates
+    rendered by the command, see :mod:`jenskipper.template_profiler`.
+
+    The command receives a *profile_templates* argument. When it is true,
+    jobs must be rendered in the current process, without the render cache.
+    """
+
+    @click.option('--profile-templates', is_flag=True, help='Print the time '
+                  'spent in each template and macro.')
+    @functools.wraps(func)
+    def wrapper(profile_templates, **kwargs):
+        if not profile_templates:
+            return func(profile_templates=False, **kwargs)
+        with template_profiler.profile() as profiler:
+            try:
+                return func(profile_templates=True, **kwargs)
+            finally:
+                click.echo('', err=True)
+                click.echo('\n'.join(profiler.format_report()), err=True)
+
+    return wrapper
+
+
 def handle_yaml_errors(func):
     """
     Print nice error messages on yaml parse errors.
@@ -239,13 +294,33 @@ def handle_yaml_errors(func):
     def wrapper(**kwargs):
         try:
             return func(**kwargs)
-        except yaml.error.MarkedYAMLError as exc:
-            click.secho(u'YAML parser error: %s' % exc, fg='red', bold=True)
+        except (yaml.error.MarkedYAMLError,
+                exceptions.DuplicateDefinition) as exc:
+            print_yaml_error(exc)
         sys.exit(1)
 
     return wrapper
 
 
+def print_yaml_error(error):
+    """
+    Print *error*, a YAML parser error or a
+    :class:`jenskipper.exceptions.DuplicateDefinition`.
+    """
+    if isinstance(error, exceptions.DuplicateDefinition):
+        click.secho(u'The %s "%s" is defined several times:' %
+                    (error.kind, error.name), fg='red', bold=True)
+        for fname, line in error.locations:
+            click.secho(u'  %s:%s' % (op.relpath(fname), line), fg='red')
+    else:
+        click.secho(u'YAML parser error: %s' % error, fg='red', bold=True)
+
+
+@handle_yaml_errors
+def _get_jobs_names(base_dir):
+    return repository.get_repository(base_dir).get_jobs_names()
+
+
 def handle_lxml_syntax_errors():
     """
     Prints nice error messages on :class:`lxml.etree.XMLSyntaxError`.
@@ -53,23 +53,26 @@ def diff(context, jobs_names, base_dir, context_overrides, reverse,
         click.secho('  $ pip install lxml', fg='green')
     session = jenkins_api.auth(base_dir)
     ret_code = 0
-    for job_name in jobs_names:
-        try:
-            ret_code |= print_job_diff(session, base_dir, job_name,
-                                       context_overrides, reverse=reverse,
-                                       names_only=names_only)
-        except exceptions.JobNotFound:
+    remote_configs = jenkins_api.get_jobs_configs(session, jobs_names)
+    for job_name, remote_xml, error in remote_configs:
+        if isinstance(error, exceptions.JobNotFound):
             utils.sechowrap('')
             utils.sechowrap('Unknown job: %s' % job_name, fg='red', bold=True)
             utils.sechowrap('Job is present in the local repository, but not '
                             'on the Jenkins server.', fg='red')
             context.exit(2)
+        elif error is not None:
+            raise error
+        ret_code |= print_job_diff(session, base_dir, job_name,
+                                   context_overrides, reverse=reverse,
+                                   names_only=names_only,
+                                   remote_xml=remote_xml)
     ret_code = 3 if ret_code != 0 else 0
     context.exit(ret_code)
 
 
 def print_job_diff(session, base_dir, job_name, context_overrides=None,
-                   reverse=False, names_only=False):
+                   reverse=False, names_only=False, remote_xml=None):
     """
     Print the diff between job *job_name* in the repository at *base_dir* and
     the server.
@@ -80,31 +83,36 @@ def print_job_diff(session, base_dir, job_name, context_overrides=None,
     The diff shows what would change if the local job would be pushed to the
     server, unless *reverse* is true.
 
+    *remote_xml* is the job configuration on the server, if it was already
+    fetched; it is retrieved from the server if not given.
+
     Return the number of lines in the diff.
     """
     diff = get_job_diff(session, base_dir, job_name,
-                        context_overrides=context_overrides, reverse=reverse)
+                        context_overrides=context_overrides, reverse=reverse,
+                        remote_xml=remote_xml)
     if names_only:
         if diff:
             print(job_name)
     else:
-        _print_diff(diff)
+        print_diff(diff)
     return len(diff)
 
 
 def get_job_diff(session, base_dir, job_name, context_overrides=None,
-                 reverse=False):
+                 reverse=False, remote_xml=None):
     """
     Get the diff lines printed by :func:`print_job_diff`.
     """
     logger.debug('diffing %s', job_name)
     if context_overrides is None:
         context_overrides = {}
-    local_xml, _ = repository.get_job_conf(base_dir, job_name,
-                                           context_overrides)
+    repos = repository.get_repository(base_dir)
+    local_xml, _ = repos.render_job(job_name, context_overrides)
     with utils.add_lxml_syntax_error_context(local_xml, job_name):
         local_xml = _prepare_xml(base_dir, local_xml)
-    remote_xml = jenkins_api.get_job_config(session, job_name)
+    if remote_xml is None:
+        remote_xml = jenkins_api.get_job_config(session, job_name)
     with utils.add_lxml_syntax_error_context(remote_xml, job_name):
         remote_xml = _prepare_xml(base_dir, remote_xml)
     from_text = remote_xml
@@ -129,7 +137,11 @@ def _prepare_xml(base_dir, xml):
     return xml.splitlines(True)
 
 
-def _print_diff(diff):
+def print_diff(diff):
+    """
+    Print *diff* lines, as returned by :func:`difflib.unified_diff`, in
+    colors.
+    """
     for line in diff:
         line = line.rstrip()
         if line.startswith('---') or line.startswith('+++'):
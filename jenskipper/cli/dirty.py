@@ -10,6 +10,7 @@ from six.moves import reduce
 
 from . import decorators
 from .. import repository
+from .. import render_pool
 
 
 logger = logging.getLogger(__name__)
@@ -18,20 +19,23 @@ logger = logging.getLogger(__name__)
 @click.command('dirty')
 @decorators.repos_command
 @decorators.jobs_command()
-def print_dirty_jobs(jobs_names, base_dir):
+@decorators.render_command
+def print_dirty_jobs(jobs_names, base_dir, workers):
     """
     Print the list of jobs with uncommitted changes in the current repository.
     """
-    dirty_jobs = get_dirty_jobs(base_dir, jobs_names)
+    dirty_jobs = get_dirty_jobs(base_dir, jobs_names, workers)
     print('\n'.join(sorted(dirty_jobs)))
 
 
-def get_dirty_jobs(base_dir, jobs_names=None):
+def get_dirty_jobs(base_dir, jobs_names=None, workers=None):
     """
     Get the list of dirty job names in the jenskipper repository at *base_dir*.
 
     If *jobs_names* is given, it should be a list of the jobs to examine. The
-    default is to examine all jobs.
+    default is to examine all jobs. Their template files are found without
+    rendering them when possible, see
+    :func:`jenskipper.render_pool.find_jobs_files`.
     """
     # Get the list of dirty files in the repository
     vcs = _get_vcs(base_dir)
@@ -42,15 +46,18 @@ def get_dirty_jobs(base_dir, jobs_names=None):
         sys.exit(1)
 
     # Build a map of template files to jobs
-    jobs_defs = repository.get_jobs_defs(base_dir)
+    repos_jobs = repository.get_repository(base_dir).get_jobs_names()
     if jobs_names:
-        examined_jobs = set(jobs_defs).intersection(jobs_names)
+        examined_jobs = set(repos_jobs).intersection(jobs_names)
     else:
-        examined_jobs = jobs_defs.keys()
+        examined_jobs = repos_jobs
     files_jobs = collections.defaultdict(set)
-    for job_name in examined_jobs:
+    results = render_pool.find_jobs_files(base_dir, sorted(examined_jobs),
+                                          workers=workers)
+    for job_name, job_files, error in results:
         logger.debug('looking at: %s', job_name)
-        _, job_files = repository.get_job_conf(base_dir, job_name)
+        if error is not None:
+            logger.debug('could not render %s: %s', job_name, error)
         for fname in job_files:
             files_jobs[fname].add(job_name)
 
@@ -23,7 +23,7 @@ def fetch_new(context, base_dir, force, selected_jobs):
     fetch all new jobs.
     """
     session = jenkins_api.auth(base_dir)
-    repos_jobs = repository.get_jobs_defs(base_dir)
+    repos_jobs = repository.get_repository(base_dir).jobs_defs
     server_jobs = jenkins_api.list_jobs(session)
     new_jobs = set(server_jobs).difference(repos_jobs)
     if selected_jobs:
@@ -34,12 +34,14 @@ def fetch_new(context, base_dir, force, selected_jobs):
         new_jobs = new_jobs.intersection(selected_jobs)
     if new_jobs:
         try:
-            with click.progressbar(new_jobs, label='Fetching new jobs') as bar:
+            with click.progressbar(length=len(new_jobs),
+                                   label='Fetching new jobs') as bar:
                 pipes_bits, jobs_templates = import_.write_jobs_templates(
                     session,
                     base_dir,
-                    bar,
+                    sorted(new_jobs),
                     allow_overwrite=force,
+                    progress_bar=bar,
                 )
         except exceptions.OverwriteError as exc:
             click.secho('File already exists: %s' % exc, fg='red',
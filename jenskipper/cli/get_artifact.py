@@ -70,8 +70,10 @@ def _resolve_build(context, session, base_dir, job_name, build):
         except ValueError:
             utils.sechowrap('Invalid build: %s' % build, fg='red')
             context.exit(1)
+    build_key = BUILD_SHORTCUTS[build]
     try:
-        job_data = jenkins_api.get_object(session, '/job/%s' % job_name)
+        job_data = jenkins_api.get_object(session, '/job/%s' % job_name,
+                                          tree='%s[number]' % build_key)
     except requests.HTTPError as exc:
         if exc.response.status_code == 404:
             utils.sechowrap('Unkown job: %s' % job_name)
@@ -80,7 +82,7 @@ def _resolve_build(context, session, base_dir, job_name, build):
                             'retrieve job data' % exc.response.status_code,
                             fg='red')
         context.exit(1)
-    build_data = job_data[BUILD_SHORTCUTS[build]]
+    build_data = job_data.get(build_key)
     if build_data is None:
         utils.sechowrap('No build data found for: %s' % build, fg='red')
         context.exit(1)
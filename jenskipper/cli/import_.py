@@ -27,10 +27,12 @@ def import_(context, jenkins_url, dest_dir):
                         fg='red', bold=True)
         context.exit(1)
     jobs_names = jenkins_api.list_jobs(session)
-    with click.progressbar(jobs_names, label='Importing jobs') as bar:
+    with click.progressbar(length=len(jobs_names),
+                           label='Importing jobs') as bar:
         pipes_bits, jobs_templates = write_jobs_templates(session,
                                                           dest_dir,
-                                                          bar)
+                                                          jobs_names,
+                                                          progress_bar=bar)
     write_jobs_defs(dest_dir, jobs_templates, 'w')
     write_pipelines(dest_dir, pipes_bits, 'w')
     _write_default_contexts(dest_dir)
@@ -38,7 +40,8 @@ def import_(context, jenkins_url, dest_dir):
     utils.print_jobs_list('Imported jobs:', jobs_names, fg='green')
 
 
-def write_jobs_templates(session, base_dir, jobs_names, allow_overwrite=False):
+def write_jobs_templates(session, base_dir, jobs_names, allow_overwrite=False,
+                         progress_bar=None):
     """
     Retrieve job templates *jobs_names* from server in repository at
     *base_dir*.
@@ -49,11 +52,15 @@ def write_jobs_templates(session, base_dir, jobs_names, allow_overwrite=False):
     If *allow_overwrite* is false, raise a
     :class:`jenskipper.exceptions.OverwriteError` if attempting to overwrite an
     existing file.
+
+    If *progress_bar* is given, it is updated each time a job is written.
     """
     pipes_bits = {}
     jobs_templates = {}
-    for job_name in jobs_names:
-        config = jenkins_api.get_job_config(session, job_name)
+    configs = jenkins_api.get_jobs_configs(session, jobs_names)
+    for job_name, config, error in configs:
+        if error is not None:
+            raise error
         pipe_info, conf = jobs.extract_pipeline_conf(config)
         _, conf = jobs.extract_hash_from_description(config)
         if pipe_info is not None:
@@ -67,6 +74,8 @@ def write_jobs_templates(session, base_dir, jobs_names, allow_overwrite=False):
         with open(tpl_fname, 'w') as fp:
             fp.write(conf)
         jobs_templates[job_name] = tpl_fname
+        if progress_bar is not None:
+            progress_bar.update(1)
     return pipes_bits, jobs_templates
 
 
@@ -11,6 +11,6 @@ def list_jobs(base_dir):
     """
     List jobs in a repository.
     """
-    jobs_defs = repository.get_jobs_defs(base_dir)
-    for name in sorted(jobs_defs):
+    jobs_names = repository.get_repository(base_dir).get_jobs_names()
+    for name in sorted(jobs_names):
         print(name)
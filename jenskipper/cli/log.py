@@ -20,8 +20,8 @@ def log(jobs_names, base_dir, build_number, show_all):
     If no JOBS are specified, show logs of all jobs.
     """
     session = jenkins_api.auth(base_dir)
-    for job_name in jobs_names:
-        builds = _get_job_builds(session, base_dir, job_name)
+    jobs_builds = _get_jobs_builds(session, jobs_names)
+    for job_name, builds in zip(jobs_names, jobs_builds):
         if builds:
             if build_number is not None:
                 build_url, real_build_number = _search_build_url(builds,
@@ -45,10 +45,14 @@ def log(jobs_names, base_dir, build_number, show_all):
             click.secho('%s: no builds' % job_name, fg='yellow')
 
 
-def _get_job_builds(session, base_dir, job_name):
-    path = '/job/%s' % job_name
-    job_infos = jenkins_api.get_object(session, path)
-    return job_infos['builds']
+def _get_jobs_builds(session, jobs_names):
+    paths = ['/job/%s' % n for n in jobs_names]
+    jobs_infos = jenkins_api.get_objects(session, paths,
+                                         tree='builds[number,url]')
+    for _, job_infos, error in jobs_infos:
+        if error is not None:
+            raise error
+        yield job_infos['builds']
 
 
 def _search_build_url(builds, build_number):
@@ -18,13 +18,37 @@ from .get_artifact import get_artifact
 from .status import get_job_status
 from .auth import authenticate
 from .delete import delete
+from .watch import watch
 from .check import check
+from .. import http_stats
+from .. import cassette
 
 
 @click.group()
 @click.option('--log-level', '-l',
               type=click.Choice(('debug', 'info', 'warning', 'error')))
-def main(log_level):
+@click.option('--http-stats', 'print_http_stats', is_flag=True,
+              help='Print statistics about the requests made to the Jenkins '
+              'server when the command exits.')
+@click.option('--slow-request-threshold', type=float, default=5,
+              metavar='SECONDS', show_default=True,
+              help='With --http-stats, list the requests that took longer '
+              'than SECONDS.')
+@click.option('--record-http', type=click.Path(dir_okay=False),
+              envvar='JK_RECORD_HTTP', metavar='CASSETTE',
+              help='Record the requests made to the Jenkins server and their '
+              'responses in CASSETTE.')
+@click.option('--replay-http', type=click.Path(exists=True, dir_okay=False),
+              envvar='JK_REPLAY_HTTP', metavar='CASSETTE',
+              help='Replay the responses recorded in CASSETTE instead of '
+              'talking to the Jenkins server.')
+@click.option('--replay-latency', type=click.FloatRange(min=0), default=0,
+              metavar='FACTOR', show_default=True,
+              help='With --replay-http, delay responses by their recorded '
+              'latency multiplied by FACTOR.')
+@click.pass_context
+def main(context, log_level, print_http_stats, slow_request_threshold,
+         record_http, replay_http, replay_latency):
     """
     Pilot Jenkins from the command line.
     """
@@ -32,6 +56,26 @@ def main(log_level):
         fmt='%(levelname)s %(message)s',
         level=log_level
     )
+    if print_http_stats:
+        _enable_http_stats(context, slow_request_threshold)
+    if record_http and replay_http:
+        raise click.UsageError('--record-http and --replay-http are mutually '
+                               'exclusive')
+    if record_http:
+        cassette.enable_recording(record_http)
+    elif replay_http:
+        cassette.enable_replay(replay_http, replay_latency)
+
+
+def _enable_http_stats(context, slow_request_threshold):
+    recorder = http_stats.enable(slow_request_threshold)
+
+    def print_report():
+        click.echo('', err=True)
+        for line in recorder.format_report():
+            click.echo(line, err=True)
+
+    context.call_on_close(print_report)
 
 
 main.add_command(import_)
@@ -52,3 +96,4 @@ main.add_command(get_job_status)
 main.add_command(authenticate)
 main.add_command(delete)
 main.add_command(check)
+main.add_command(watch)
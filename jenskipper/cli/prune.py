@@ -17,7 +17,7 @@ def prune(base_dir, confirm):
     Remove all jobs on the server that are not present in the repository.
     """
     session = jenkins_api.auth(base_dir)
-    repos_jobs = repository.get_jobs_defs(base_dir)
+    repos_jobs = repository.get_repository(base_dir).jobs_defs
     server_jobs = jenkins_api.list_jobs(session)
     unknown_jobs = set(server_jobs).difference(repos_jobs)
     if unknown_jobs:
@@ -3,7 +3,7 @@ import click
 from . import decorators
 from . import diff
 from . import build
-from .. import repository
+from .. import render_pool
 from .. import jobs
 from .. import jenkins_api
 from .. import conf
@@ -26,11 +26,12 @@ from .. import exceptions
 @decorators.jobs_command(dirty_flag=True)
 @decorators.context_command
 @decorators.build_command
+@decorators.render_command
 @decorators.handle_all_errors()
 @click.pass_context
 def push(context, jobs_names, base_dir, force, allow_overwrite,
          context_overrides, trigger_builds, block_builds, build_parameters,
-         confirm_replace):
+         confirm_replace, workers):
     """
     Push JOBS to the Jenkins server.
 
@@ -38,8 +39,6 @@ def push(context, jobs_names, base_dir, force, allow_overwrite,
     """
     session = jenkins_api.auth(base_dir)
     _check_push_flag(context, base_dir, force)
-    jobs_defs = repository.get_jobs_defs(base_dir)
-    pipelines = repository.get_pipelines(base_dir)
     _check_for_gui_modifications(context, session, base_dir, jobs_names,
                                  allow_overwrite, context_overrides)
     remaining_jobs = list(jobs_names)
@@ -47,8 +46,8 @@ def push(context, jobs_names, base_dir, force, allow_overwrite,
         with click.progressbar(remaining_jobs, label='Pushing jobs') as bar:
             mismatch_info, remaining_jobs = _push_jobs(session, remaining_jobs,
                                                        bar, base_dir,
-                                                       pipelines, jobs_defs,
-                                                       context_overrides)
+                                                       context_overrides,
+                                                       workers)
         if mismatch_info:
             job_name, expected_type, pushed_type = mismatch_info
             if _confirm_mismatching_job_type_overwrite(job_name,
@@ -74,19 +73,20 @@ def _check_for_gui_modifications(context, session, base_dir, jobs_names,
     if allow_overwrite:
         return
     gui_was_modified = False
-    for job_name in jobs_names:
-        try:
-            conf = jenkins_api.get_job_config(session, job_name)
-        except exceptions.JobNotFound:
+    server_confs = jenkins_api.get_jobs_configs(session, jobs_names)
+    for job_name, server_conf, error in server_confs:
+        if isinstance(error, exceptions.JobNotFound):
             continue
-        saved_hash, conf = jobs.extract_hash_from_description(conf)
+        elif error is not None:
+            raise error
+        saved_hash, conf = jobs.extract_hash_from_description(server_conf)
         actual_hash = jobs.get_conf_hash(conf)
         if saved_hash is not None and saved_hash != actual_hash:
             utils.sechowrap('It looks like job "%s" has been modified in the '
                             'Jenkins GUI:' % job_name, fg='red', bold=True)
             utils.sechowrap('')
             diff.print_job_diff(session, base_dir, job_name, context_overrides,
-                                reverse=True)
+                                reverse=True, remote_xml=server_conf)
             utils.sechowrap('')
             gui_was_modified = True
     if gui_was_modified:
@@ -96,26 +96,29 @@ def _check_for_gui_modifications(context, session, base_dir, jobs_names,
         context.exit(1)
 
 
-def _push_jobs(session, jobs_names, progress_bar, base_dir, pipelines,
-               jobs_defs, context_overrides):
-    templates_dir = repository.get_templates_dir(base_dir)
+def _push_jobs(session, jobs_names, progress_bar, base_dir,
+               context_overrides, workers=None):
     remaining_jobs = list(jobs_names)
     mismatch_info = None
-    for job_name in progress_bar:
-        job_def = jobs_defs[job_name]
-        pipe_info = pipelines.get(job_name)
-        final_conf, _ = jobs.render_job(templates_dir, job_def['template'],
-                                        job_def['context'], pipe_info,
-                                        insert_hash=True,
-                                        context_overrides=context_overrides)
-        if conf.get(base_dir, ['server', 'disable_jobs_from_gui']):
-            try:
-                server_conf = jenkins_api.get_job_config(session, job_name)
+    if conf.get(base_dir, ['server', 'disable_jobs_from_gui']):
+        server_confs = jenkins_api.get_jobs_configs(session, jobs_names)
+    else:
+        server_confs = None
+    results = render_pool.render_jobs(base_dir, jobs_names,
+                                      context_overrides=context_overrides,
+                                      insert_hash=True, workers=workers)
+    for job_name, (_, result, error) in zip(progress_bar, results):
+        if error is not None:
+            raise error
+        final_conf, _ = result
+        if server_confs is not None:
+            _, server_conf, error = next(server_confs)
+            if error is None:
                 final_conf = jobs.transfuse_disabled_flag(server_conf,
                                                           final_conf)
-            except exceptions.JobNotFound:
-                # Job does not exist on server, nothing to do
-                pass
+            elif not isinstance(error, exceptions.JobNotFound):
+                # A missing job on server means there is nothing to do
+                raise error
         try:
             jenkins_api.push_job_config(
                 session,
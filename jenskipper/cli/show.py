@@ -8,10 +8,12 @@ from .. import repository
 @click.argument('job_name')
 @decorators.repos_command
 @decorators.context_command
+@decorators.profile_templates_command
 @decorators.handle_all_errors()
-def show(job_name, base_dir, context_overrides):
+def show(job_name, base_dir, context_overrides, profile_templates):
     """
     Show the rendered XML of JOB_NAME.
     """
-    print(repository.get_job_conf(base_dir, job_name,
-                                  context_overrides=context_overrides)[0])
+    repos = repository.get_repository(base_dir)
+    print(repos.render_job(job_name, context_overrides=context_overrides,
+                           use_cache=not profile_templates)[0])
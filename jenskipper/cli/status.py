@@ -11,6 +11,8 @@ JOB_STATUS = (
     ('lastFailedBuild', 'Last failed: %s', 'failed'),
     ('lastUnstableBuild', 'Last unstable: %s', 'unstable'),
 )
+JOB_STATUS_TREE = ','.join('%s[number]' % k for k in
+                           ['lastCompletedBuild'] + [s[0] for s in JOB_STATUS])
 
 
 @click.command('status')
@@ -26,24 +28,28 @@ def get_job_status(context, base_dir, jobs_names, status_only):
     """
     session = jenkins_api.auth(base_dir)
     show_job_name = (len(jobs_names) > 1)
-    for job_num, job_name in enumerate(jobs_names):
+    jobs_data = jenkins_api.get_objects(session,
+                                        ['/job/%s' % n for n in jobs_names],
+                                        tree=JOB_STATUS_TREE)
+    for job_num, (job_name, (_, job_data, error)) in \
+            enumerate(zip(jobs_names, jobs_data)):
         if job_num and not status_only:
             print()
-        _print_job_status(context, session, base_dir, job_name, status_only,
+        _print_job_status(context, job_name, job_data, error, status_only,
                           show_job_name)
 
 
-def _print_job_status(context, session, base_dir, job_name, status_only,
+def _print_job_status(context, job_name, job_data, error, status_only,
                       show_job_name):
-    try:
-        job_data = jenkins_api.get_object(session, '/job/%s' % job_name)
-    except requests.HTTPError as exc:
-        if exc.response.status_code == 404:
+    if error is not None:
+        if not isinstance(error, requests.HTTPError):
+            raise error
+        if error.response.status_code == 404:
             utils.sechowrap('Job not found on Jenkins server: %s' % job_name)
             exit_code = 2
         else:
             utils.sechowrap('Unexpected HTTP error %s while trying to '
-                            'retrieve job data' % exc.response.status_code,
+                            'retrieve job data' % error.response.status_code,
                             fg='red')
             exit_code = 1
         context.exit(exit_code)
@@ -5,28 +5,31 @@ import click
 
 from . import decorators
 from .. import repository
-from .. import jobs
+from .. import render_pool
 
 
 @click.command()
 @click.option('--delete/--no-delete', default=False, help='Delete '
               'unused templates.')
 @decorators.repos_command
+@decorators.render_command
 @decorators.handle_all_errors()
-def sweep(base_dir, delete):
+def sweep(base_dir, delete, workers):
     """
     Find unused templates in the current repository.
     """
-    templates_dir = repository.get_templates_dir(base_dir)
+    repos = repository.get_repository(base_dir)
+    templates_dir = repos.templates_dir
 
     # Get all files used by templates
-    jobs_defs = repository.get_jobs_defs(base_dir)
-    pipelines = repository.get_pipelines(base_dir)
     used_files = set()
-    for job_name, job_def in jobs_defs.items():
-        pipe_info = pipelines.get(job_name)
-        _, job_files = jobs.render_job(templates_dir, job_def['template'],
-                                       job_def['context'], pipe_info)
+    results = render_pool.find_jobs_files(base_dir,
+                                          sorted(repos.get_jobs_names()),
+                                          workers=workers)
+    for _, job_files, error in results:
+        if error is not None:
+            # The job may use templates we don't know about
+            raise error
         used_files.update(job_files)
 
     # Get all files in the templates dir
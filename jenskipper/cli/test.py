@@ -37,12 +37,13 @@ def test(jobs_names, base_dir, context_overrides, build_parameters):
 
 
 def _create_temp_jobs(session, jobs_names, base_dir, context_overrides):
+    repos = repository.get_repository(base_dir)
     ret = []
     for job_name in jobs_names:
         temp_name = '%s%s.%s' % (job_name, TEMP_JOBS_INFIX,
                                  uuid.uuid4().hex[:8])
-        conf, _ = repository.get_job_conf(base_dir, job_name,
-                                          context_overrides=context_overrides)
+        conf, _ = repos.render_job(job_name,
+                                   context_overrides=context_overrides)
         jenkins_api.push_job_config(session, temp_name, conf)
         ret.append(temp_name)
     return ret
@@ -0,0 +1,218 @@
+import difflib
+import os.path as op
+from xml.etree import ElementTree
+
+import click
+import yaml.error
+
+from . import decorators
+from .diff import print_diff
+from .. import file_watcher
+from .. import render_pool
+from .. import repository
+from .. import exceptions
+from .. import utils
+
+
+@click.command()
+@click.option('--diff/--no-diff', 'show_diff', default=False,
+              help='Show the changes of the jobs configurations since their '
+              'last successful render.')
+@click.option('--poll', is_flag=True, help='Poll files for changes instead '
+              'of using inotify.')
+@decorators.repos_command
+@decorators.jobs_command(default_to_all=False)
+@decorators.context_command
+@decorators.render_command
+@decorators.handle_all_errors()
+def watch(jobs_names, base_dir, context_overrides, workers, show_diff, poll):
+    """
+    Check JOBS again each time their templates or definitions change.
+
+    If no JOBS are specified, watch all jobs, including the jobs added while
+    watching.
+
+    Only the jobs affected by a change are rendered again. Stop with Ctrl-C.
+    """
+    jobs_watch = JobsWatch(base_dir, jobs_names or None,
+                           context_overrides=context_overrides,
+                           workers=workers, show_diff=show_diff)
+    watcher = file_watcher.get_watcher(get_watched_paths(base_dir),
+                                       poll=poll)
+    with watcher:
+        try:
+            jobs_watch.start()
+            while True:
+                jobs_watch.update(watcher.wait())
+        except KeyboardInterrupt:
+            click.secho('')
+
+
+def get_watched_paths(base_dir):
+    """
+    Get the files and directories of the repository at *base_dir* that jobs
+    are made of.
+    """
+    return [
+        repository.get_templates_dir(base_dir),
+        repository.get_jobs_defs_fname(base_dir),
+        op.join(base_dir, 'extra-jobs.yaml'),
+        repository.get_jobs_shards_dir(base_dir),
+        repository.get_default_contexts_fname(base_dir),
+        repository.get_contexts_shards_dir(base_dir),
+        repository.get_pipelines_fname(base_dir),
+    ]
+
+
+class JobsWatch(object):
+    """
+    Check jobs *jobs_names* of the repository at *base_dir*, or all its jobs
+    if *jobs_names* is None, and check them again when they change.
+
+    *context_overrides* and *workers* are passed to
+    :func:`jenskipper.render_pool.render_jobs`. If *show_diff* is true, the
+    changes of the jobs since their last successful render are printed.
+    """
+
+    def __init__(self, base_dir, jobs_names=None, context_overrides={},
+                 workers=None, show_diff=False):
+        self.base_dir = base_dir
+        self.jobs_names = jobs_names
+        self.context_overrides = context_overrides
+        self.workers = workers
+        self.show_diff = show_diff
+        self.repos = repository.get_repository(base_dir)
+        #: The indexed informations of the watched jobs, indexed by job name
+        self.jobs_infos = {}
+        #: The template files used by the watched jobs, indexed by job name
+        self.jobs_files = {}
+        #: The last successful render of the watched jobs, indexed by job name
+        self.last_renders = {}
+        #: The names of the jobs that failed to render
+        self.failed_jobs = set()
+        #: The names of the failed jobs whose template files are not all
+        #: known, because they are included dynamically
+        self.incomplete_jobs = set()
+
+    def start(self):
+        """
+        Check all the watched jobs.
+        """
+        jobs_infos = self._get_jobs_infos()
+        if jobs_infos is not None:
+            self.jobs_infos = jobs_infos
+            self.check_jobs(self._get_jobs_names(jobs_infos))
+        click.secho('Watching %d jobs, press Ctrl-C to stop.' %
+                    len(self.jobs_infos), bold=True)
+
+    def update(self, changed_files):
+        """
+        Check the jobs affected by the changes of *changed_files*.
+        """
+        jobs_infos = self._get_jobs_infos()
+        if jobs_infos is None:
+            return
+        for job_name in set(self.jobs_infos).difference(jobs_infos):
+            click.secho('Job %s was removed' % job_name, fg='yellow')
+            self.jobs_files.pop(job_name, None)
+            self.last_renders.pop(job_name, None)
+            self.failed_jobs.discard(job_name)
+            self.incomplete_jobs.discard(job_name)
+        changed_files = {op.abspath(f) for f in changed_files}
+        affected_jobs = []
+        for job_name in self._get_jobs_names(jobs_infos):
+            info = jobs_infos[job_name]
+            files = self.jobs_files.get(job_name, ())
+            if info != self.jobs_infos.get(job_name) or \
+                    not changed_files.isdisjoint(files) or \
+                    job_name in self.incomplete_jobs:
+                affected_jobs.append(job_name)
+        self.jobs_infos = jobs_infos
+        if affected_jobs:
+            self.check_jobs(affected_jobs)
+
+    def check_jobs(self, jobs_names):
+        """
+        Render jobs *jobs_names*, print their errors and remember the template
+        files they use.
+
+        The files of the jobs that fail to render are found without rendering
+        them, see :meth:`jenskipper.repository.Repository.find_job_files`.
+        """
+        results = render_pool.render_jobs(
+            self.base_dir, jobs_names,
+            context_overrides=self.context_overrides, workers=self.workers
+        )
+        for job_name, result, error in results:
+            click.secho('Checking %s' % job_name, fg='green')
+            self.incomplete_jobs.discard(job_name)
+            if error is None:
+                rendered, files = result
+                error = _check_xml(rendered)
+            else:
+                files, complete = self.repos.find_job_files(job_name)
+                if error.syntax_error_fname is not None:
+                    # The job can only be fixed by changing this file, even
+                    # if the templates it references are unknown
+                    files.add(error.syntax_error_fname)
+                elif not complete:
+                    self.incomplete_jobs.add(job_name)
+            self.jobs_files[job_name] = {op.abspath(f) for f in files}
+            if isinstance(error, exceptions.RenderError):
+                decorators.print_render_error(error, lines_prefix='    ')
+            elif error is not None:
+                click.secho('    XML error: %s' % error, fg='red', bold=True)
+            if error is not None:
+                self.failed_jobs.add(job_name)
+                continue
+            self.failed_jobs.discard(job_name)
+            last_render = self.last_renders.get(job_name)
+            if self.show_diff and last_render is not None:
+                print_diff(difflib.unified_diff(
+                    last_render.splitlines(True), rendered.splitlines(True),
+                    fromfile='previous/%s.xml' % job_name,
+                    tofile='current/%s.xml' % job_name
+                ))
+            self.last_renders[job_name] = rendered
+        self.repos.index.save()
+
+        click.secho('')
+        if self.failed_jobs:
+            click.secho('%d jobs have errors :(' % len(self.failed_jobs),
+                        fg='red', bold=True)
+        else:
+            click.secho('All good!', fg='green', bold=True)
+
+    def _get_jobs_names(self, jobs_infos):
+        """
+        Get the names of the jobs in *jobs_infos*, in definition order.
+        """
+        return [j for j in self.repos.index.get_jobs_names()
+                if j in jobs_infos]
+
+    def _get_jobs_infos(self):
+        """
+        Get the indexed informations of the watched jobs, or None if the jobs
+        definitions are broken.
+        """
+        index = self.repos.index
+        try:
+            jobs_names = index.get_jobs_names()
+            if self.jobs_names is not None:
+                jobs_names = set(self.jobs_names).intersection(jobs_names)
+            return {j: index.get_job(j) for j in jobs_names}
+        except (yaml.error.MarkedYAMLError,
+                exceptions.DuplicateDefinition) as exc:
+            decorators.print_yaml_error(exc)
+            return None
+
+
+def _check_xml(xml):
+    """
+    Return the error found parsing *xml*, or None.
+    """
+    try:
+        utils.parse_xml(xml)
+    except ElementTree.ParseError as exc:
+        return exc
+    return None
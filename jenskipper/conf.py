@@ -20,6 +20,16 @@ def get_user_conf_fname():
     )
 
 
+def get_user_cache_dir():
+    """
+    Get the directory where user-wide caches are stored.
+    """
+    return os.environ.get(
+        'JK_CACHE_DIR',
+        op.expanduser(op.join('~', '.cache', 'jenskipper'))
+    )
+
+
 def get_user_conf():
     """
     Get the global user configuration.
@@ -73,6 +73,70 @@ class BuildIsNotParametrized(JenskipperError):
     pass
 
 
+class InteractionNotRecorded(JenskipperError):
+    """
+    Raised when replaying a cassette that does not contain the interaction for
+    a request.
+    """
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        super(InteractionNotRecorded, self).__init__(
+            'no recorded interaction for %s %s' % (method, url)
+        )
+
+
+class DuplicateDefinition(JenskipperError):
+    """
+    Raised when a job or a default context (depending on *kind*) named *name*
+    is defined in several files of a repository.
+
+    *locations* is a list of ``(file_name, line)`` tuples.
+    """
+
+    def __init__(self, kind, name, locations):
+        super(DuplicateDefinition, self).__init__(kind, name, locations)
+        self.kind = kind
+        self.name = name
+        self.locations = locations
+
+    def __str__(self):
+        return '%s "%s" is defined several times: %s' % (
+            self.kind, self.name,
+            ', '.join('%s:%s' % loc for loc in self.locations)
+        )
+
+
+class RenderError(JenskipperError):
+    """
+    Describe a template or XML error that occured while rendering job
+    *job_name* in :mod:`jenskipper.render_pool`.
+
+    Jinja exceptions can't be sent between processes, so the error is
+    described by *stack* and *message* (see
+    :func:`jenskipper.templates.extract_jinja_error`), or by
+    *missing_template* if a template was not found. *syntax_error_fname* is
+    the file of the template with a syntax error, if any.
+    """
+
+    def __init__(self, job_name, stack=None, message=None,
+                 missing_template=None, syntax_error_fname=None):
+        super(RenderError, self).__init__(job_name, stack, message,
+                                          missing_template,
+                                          syntax_error_fname)
+        self.job_name = job_name
+        self.stack = stack
+        self.message = message
+        self.missing_template = missing_template
+        self.syntax_error_fname = syntax_error_fname
+
+    def __str__(self):
+        if self.missing_template is not None:
+            return 'template not found: %s' % self.missing_template
+        return self.message
+
+
 class TemplateUserError(jinja2.exceptions.TemplateRuntimeError):
     """
     Raised by the {% raise 'error' %} extension.
@@ -0,0 +1,544 @@
+"""
+A fake Jenkins server, to test and load test Jenskipper without a real one.
+
+:class:`FakeJenkins` is a WSGI application implementing the parts of the
+Jenkins API used by :mod:`jenskipper.jenkins_api`, with configurable latency
+and error rate. Jobs are kept in memory, and builds complete as soon as they
+are triggered.
+
+Use :func:`serve` to start it in a background thread::
+
+    server = fake_jenkins.serve(fake_jenkins.FakeJenkins(job_count=10000))
+    try:
+        session = jenkins_api.auth(base_dir, server.url)
+        ...
+    finally:
+        server.stop()
+
+"""
+import hashlib
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse as urlparse
+
+
+#: Configuration of the synthetic jobs
+DEFAULT_JOB_CONFIG = u'''<?xml version='1.0' encoding='UTF-8'?>
+<project>
+  <description>%(name)s</description>
+  <disabled>false</disabled>
+  <builders>
+    <hudson.tasks.Shell>
+      <command>echo %(name)s</command>
+    </hudson.tasks.Shell>
+  </builders>
+</project>
+'''
+
+#: HTTP reason phrases of the status codes used by the server
+STATUS_REASONS = {
+    200: 'OK',
+    201: 'Created',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Server Error',
+    503: 'Service Unavailable',
+}
+
+CRUMB_FIELD = 'Jenkins-Crumb'
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, body=''):
+        super(HTTPError, self).__init__(status)
+        self.status = status
+        self.body = body
+
+
+class FakeJenkins(object):
+    """
+    A WSGI application behaving like a Jenkins server.
+
+    The server starts with *job_count* synthetic jobs named ``job-00000``,
+    ``job-00001``, etc... *jobs* is a dict of additional jobs configurations
+    indexed by name.
+
+    Responses are delayed by *latency* seconds, or a random number of seconds
+    between ``latency[0]`` and ``latency[1]`` if it's a tuple. A fraction
+    *error_rate* of the requests fail with a 503 error.
+
+    If *use_crumbs* is true, mutating requests must carry the crumb given by
+    ``/crumbIssuer/api/json``.
+    """
+
+    def __init__(self, job_count=0, jobs=None, latency=0, error_rate=0,
+                 use_crumbs=False):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.use_crumbs = use_crumbs
+        self.crumb = '%032x' % random.getrandbits(128)
+        self.jobs = {}
+        self.builds = {}
+        self.queue = {}
+        self.requests_count = 0
+        self._lock = threading.Lock()
+        for i in range(job_count):
+            name = 'job-%05d' % i
+            self.jobs[name] = DEFAULT_JOB_CONFIG % {'name': name}
+        self.jobs.update(jobs or {})
+        self._routes = [
+            ('GET', r'/api/json', self._get_root),
+            ('GET', r'/crumbIssuer/api/json', self._get_crumb),
+            ('POST', r'/createItem', self._create_job),
+            ('GET', r'/queue/item/(\d+)/api/json', self._get_queue_item),
+            ('GET', r'/job/([^/]+)/api/json', self._get_job),
+            ('GET', r'/job/([^/]+)/config.xml', self._get_job_config),
+            ('POST', r'/job/([^/]+)/config.xml', self._set_job_config),
+            ('POST', r'/job/([^/]+)/doDelete', self._delete_job),
+            ('POST', r'/job/([^/]+)/doRename', self._rename_job),
+            ('POST', r'/job/([^/]+)/(enable|disable)', self._toggle_job),
+            ('POST', r'/job/([^/]+)/build', self._build_job),
+            ('POST', r'/job/([^/]+)/buildWithParameters',
+             self._build_job_with_parameters),
+            ('GET', r'/job/([^/]+)/(\d+)/api/json', self._get_build),
+            ('GET', r'/job/([^/]+)/(\d+)/consoleText', self._get_build_log),
+            ('GET', r'/job/([^/]+)/(\d+)/artifact/(.+)', self._get_artifact),
+        ]
+        self._routes = [(m, re.compile(p + '$'), f)
+                        for m, p, f in self._routes]
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.requests_count += 1
+        self._sleep()
+        headers = []
+        try:
+            if self.error_rate and random.random() < self.error_rate:
+                raise HTTPError(503)
+            status, body = self._dispatch(environ, headers)
+        except HTTPError as exc:
+            status, body = exc.status, exc.body
+        if not isinstance(body, bytes):
+            if not isinstance(body, type(u'')):
+                body = json.dumps(body)
+                headers.append(('Content-Type', 'application/json'))
+            else:
+                headers.append(('Content-Type', 'text/plain; charset=utf-8'))
+            body = body.encode('utf8')
+        headers.append(('Content-Length', str(len(body))))
+        start_response('%s %s' % (status, STATUS_REASONS[status]), headers)
+        return [body]
+
+    def _sleep(self):
+        if isinstance(self.latency, tuple):
+            time.sleep(random.uniform(*self.latency))
+        elif self.latency:
+            time.sleep(self.latency)
+
+    def _dispatch(self, environ, headers):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '/')
+        if six.PY3:
+            # PEP 3333 mandates latin-1 decoded paths
+            path = path.encode('latin-1').decode('utf8')
+        # Like Jenkins, ignore empty path segments (API URLs are often built
+        # by appending "/api/json" to objects URLs ending with a slash)
+        path = re.sub('/+', '/', path)
+        query = dict(urlparse.parse_qsl(environ.get('QUERY_STRING', '')))
+        path_matched = False
+        for route_method, regex, func in self._routes:
+            match = regex.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            if (method == 'POST' and self.use_crumbs and
+                    environ.get('HTTP_JENKINS_CRUMB') != self.crumb):
+                raise HTTPError(403, u'No valid crumb was included in the '
+                                u'request')
+            request = Request(environ, query, headers)
+            with self._lock:
+                ret = func(request, *match.groups())
+            if request.tree is not None and not isinstance(ret[1], bytes):
+                ret = ret[0], filter_tree(ret[1], request.tree)
+            return ret
+        raise HTTPError(405 if path_matched else 404)
+
+    def _get_url(self, request, path):
+        return '%s%s' % (request.base_url, path)
+
+    def _get_job_config_or_404(self, name):
+        try:
+            return self.jobs[name]
+        except KeyError:
+            raise HTTPError(404)
+
+    def _get_root(self, request):
+        return 200, {
+            'useCrumbs': self.use_crumbs,
+            'jobs': [{'name': name,
+                      'url': self._get_url(request, 'job/%s/' % name)}
+                     for name in sorted(self.jobs)],
+        }
+
+    def _get_crumb(self, request):
+        if not self.use_crumbs:
+            raise HTTPError(404)
+        return 200, {'crumbRequestField': CRUMB_FIELD, 'crumb': self.crumb}
+
+    def _create_job(self, request):
+        name = request.query.get('name')
+        if not name or name in self.jobs:
+            raise HTTPError(400)
+        self.jobs[name] = request.read_body().decode('utf8')
+        return 200, u''
+
+    def _get_job(self, request, name):
+        self._get_job_config_or_404(name)
+        builds = self.builds.get(name, [])
+        builds_data = [self._get_build_summary(request, name, b)
+                       for b in reversed(builds)]
+
+        def last_build(result=None):
+            for build in reversed(builds):
+                if result is None or build['result'] == result:
+                    return self._get_build_summary(request, name, build)
+
+        return 200, {
+            'name': name,
+            'url': self._get_url(request, 'job/%s/' % name),
+            'builds': builds_data,
+            'lastBuild': last_build(),
+            'lastCompletedBuild': last_build(),
+            'lastSuccessfulBuild': last_build('SUCCESS'),
+            'lastStableBuild': last_build('SUCCESS'),
+            'lastUnstableBuild': last_build('UNSTABLE'),
+            'lastFailedBuild': last_build('FAILURE'),
+        }
+
+    def _get_build_summary(self, request, name, build):
+        return {
+            'number': build['number'],
+            'url': self._get_url(request,
+                                 'job/%s/%s/' % (name, build['number'])),
+        }
+
+    def _get_job_config(self, request, name):
+        config = self._get_job_config_or_404(name).encode('utf8')
+        etag = '"%s"' % hashlib.sha1(config).hexdigest()
+        request.headers.append(('ETag', etag))
+        if request.environ.get('HTTP_IF_NONE_MATCH') == etag:
+            return 304, b''
+        request.headers.append(('Content-Type', 'application/xml'))
+        return 200, config
+
+    def _set_job_config(self, request, name):
+        self._get_job_config_or_404(name)
+        self.jobs[name] = request.read_body().decode('utf8')
+        return 200, u''
+
+    def _delete_job(self, request, name):
+        self._get_job_config_or_404(name)
+        del self.jobs[name]
+        self.builds.pop(name, None)
+        return 200, u''
+
+    def _rename_job(self, request, name):
+        config = self._get_job_config_or_404(name)
+        new_name = request.query.get('newName')
+        if not new_name or new_name in self.jobs:
+            raise HTTPError(400)
+        del self.jobs[name]
+        self.jobs[new_name] = config
+        self.builds[new_name] = self.builds.pop(name, [])
+        return 200, u''
+
+    def _toggle_job(self, request, name, action):
+        config = self._get_job_config_or_404(name)
+        disabled = u'<disabled>%s</disabled>' % (
+            'false' if action == 'enable' else 'true'
+        )
+        self.jobs[name] = re.sub(u'<disabled>\\w+</disabled>', disabled,
+                                 config)
+        return 200, u''
+
+    def _build_job(self, request, name):
+        if _is_parametrized(self._get_job_config_or_404(name)):
+            raise HTTPError(400)
+        return self._queue_build(request, name, {})
+
+    def _build_job_with_parameters(self, request, name):
+        if not _is_parametrized(self._get_job_config_or_404(name)):
+            raise HTTPError(500)
+        parameters = dict(urlparse.parse_qsl(
+            request.read_body().decode('utf8')
+        ))
+        return self._queue_build(request, name, parameters)
+
+    def _queue_build(self, request, name, parameters):
+        builds = self.builds.setdefault(name, [])
+        number = len(builds) + 1
+        builds.append({
+            'number': number,
+            'result': 'SUCCESS',
+            'parameters': parameters,
+        })
+        queue_id = len(self.queue) + 1
+        self.queue[queue_id] = (name, number)
+        location = self._get_url(request, 'queue/item/%s/' % queue_id)
+        request.headers.append(('Location', location))
+        return 201, u''
+
+    def _get_queue_item(self, request, queue_id):
+        try:
+            name, number = self.queue[int(queue_id)]
+        except KeyError:
+            raise HTTPError(404)
+        return 200, {
+            'id': int(queue_id),
+            'executable': {
+                'number': number,
+                'url': self._get_url(request, 'job/%s/%s/' % (name, number)),
+            },
+        }
+
+    def _get_build_or_404(self, name, number):
+        try:
+            return self.builds[name][int(number) - 1]
+        except (KeyError, IndexError):
+            raise HTTPError(404)
+
+    def _get_build(self, request, name, number):
+        build = self._get_build_or_404(name, number)
+        return 200, {
+            'number': build['number'],
+            'url': self._get_url(request, 'job/%s/%s/' % (name, number)),
+            'fullDisplayName': '%s #%s' % (name, number),
+            'result': build['result'],
+            'building': False,
+        }
+
+    def _get_build_log(self, request, name, number):
+        build = self._get_build_or_404(name, number)
+        return 200, u'Started\n%s\nFinished: %s\n' % (
+            ' '.join('%s=%s' % i for i in sorted(build['parameters'].items())),
+            build['result'],
+        )
+
+    def _get_artifact(self, request, name, number, path):
+        self._get_build_or_404(name, number)
+        return 200, ('%s #%s: %s\n' % (name, number, path)).encode('utf8')
+
+
+def _is_parametrized(config):
+    return '<parameterDefinitions' in config
+
+
+class Request(object):
+    """
+    A request handled by :class:`FakeJenkins`.
+
+    *headers* is the list of response headers, that handlers can extend.
+    """
+
+    def __init__(self, environ, query, headers):
+        self.environ = environ
+        self.query = query
+        self.headers = headers
+        self.tree = query.get('tree')
+        self.base_url = '%s://%s/' % (environ['wsgi.url_scheme'],
+                                      environ.get('HTTP_HOST') or
+                                      '%s:%s' % (environ['SERVER_NAME'],
+                                                 environ['SERVER_PORT']))
+
+    def read_body(self):
+        length = int(self.environ.get('CONTENT_LENGTH') or 0)
+        return self.environ['wsgi.input'].read(length)
+
+
+def filter_tree(data, tree):
+    """
+    Filter *data* with the Jenkins API *tree* syntax (e.g.
+    ``"jobs[name],builds[number,url]"``).
+    """
+    return _filter_tree(data, _parse_tree(tree))
+
+
+def _filter_tree(data, fields):
+    if isinstance(data, list):
+        return [_filter_tree(d, fields) for d in data]
+    if not isinstance(data, dict):
+        return data
+    ret = {}
+    for name, sub_fields in fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        if sub_fields and value is not None:
+            value = _filter_tree(value, sub_fields)
+        ret[name] = value
+    return ret
+
+
+def _parse_tree(tree):
+    """
+    Parse *tree* into a dict of fields names, with dicts of sub fields as
+    values.
+    """
+    stack = [{}]
+    name = ''
+    for char in tree + ',':
+        if char in ',[]':
+            if name:
+                stack[-1][name.strip()] = {}
+                last_name = name.strip()
+            name = ''
+            if char == '[':
+                stack.append(stack[-1][last_name])
+            elif char == ']':
+                stack.pop()
+        else:
+            name += char
+    return stack[0]
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+    # Load tests open lots of connections at once
+    request_queue_size = 128
+
+    def __init__(self, *args, **kwargs):
+        BaseHTTPServer.HTTPServer.__init__(self, *args, **kwargs)
+        self.connections_count = 0
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections_count += 1
+        socketserver.ThreadingMixIn.process_request(self, request,
+                                                    client_address)
+
+
+class _WSGIRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Serve the WSGI application of the server over HTTP/1.1, keeping
+    connections alive between requests like Jenkins does.
+
+    :mod:`wsgiref` only speaks HTTP/1.0, so clients would open a connection
+    per request and connection pools could not be tested.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Close idle connections eventually
+    timeout = 60
+
+    def do_GET(self):
+        self._run_app()
+
+    do_HEAD = do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+    def _run_app(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        path, _, query = self.path.partition('?')
+        environ = {
+            'REQUEST_METHOD': self.command,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': urlparse.unquote(path, 'latin-1'),
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': self.headers.get('Content-Type', ''),
+            'CONTENT_LENGTH': str(length),
+            'SERVER_NAME': self.server.server_name,
+            'SERVER_PORT': str(self.server.server_port),
+            'SERVER_PROTOCOL': self.request_version,
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(self.rfile.read(length)),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in self.headers.items():
+            key = 'HTTP_%s' % name.upper().replace('-', '_')
+            if key in ('HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH'):
+                continue
+            if key in environ:
+                value = '%s,%s' % (environ[key], value)
+            environ[key] = value
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+
+        body = b''.join(self.server.app(environ, start_response))
+        status, headers = response
+        code, reason = status.split(' ', 1)
+        self.send_response(int(code), reason)
+        for name, value in headers:
+            if name.lower() != 'content-length':
+                self.send_header(name, value)
+        # The body is buffered, so the connection can be kept alive
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+class Server(object):
+    """
+    A running :class:`FakeJenkins` server, see :func:`serve`.
+
+    Connections are kept alive between requests, the number of connections
+    opened by clients is in :attr:`connections_count`.
+    """
+
+    def __init__(self, app, host='127.0.0.1', port=0):
+        self.app = app
+        self._server = _ThreadingHTTPServer((host, port), _WSGIRequestHandler)
+        self._server.app = app
+        self.url = 'http://%s:%s/' % (host, self._server.server_port)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    @property
+    def connections_count(self):
+        return self._server.connections_count
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def serve(app, host='127.0.0.1', port=0):
+    """
+    Serve :class:`FakeJenkins` *app* from a background thread.
+
+    Listen on a random port if *port* is 0. Return a started :class:`Server`,
+    the URL of the server is in its ``url`` attribute.
+    """
+    server = Server(app, host, port)
+    server.start()
+    return server
@@ -0,0 +1,197 @@
+"""
+Watch files for changes.
+
+The changed files are found by comparing snapshots of the modification times
+and sizes of the watched files. On Linux, inotify is used to sleep until
+something happens in the watched directories; elsewhere, or if inotify is not
+available, files are polled at regular intervals.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import os.path as op
+import select
+import sys
+import time
+
+from . import utils
+
+
+#: Seconds between two scans of the watched files, when polling
+POLL_INTERVAL = 0.5
+
+#: Seconds without inotify events to wait for before scanning the watched
+#: files, editors often write files in several steps
+SETTLE_DELAY = 0.05
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+            _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+
+
+def get_watcher(paths, poll=False):
+    """
+    Get a watcher for *paths*, a list of files and directories, which don't
+    need to exist yet.
+
+    Return an :class:`InotifyWatcher` if inotify is available and *poll* is
+    false, or a :class:`PollingWatcher`.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
+
+
+class PollingWatcher(object):
+    """
+    Watch *paths* for changes, by scanning them every *interval* seconds.
+
+    Directories are watched recursively. Hidden files and editors backup files
+    are ignored.
+    """
+
+    def __init__(self, paths, interval=POLL_INTERVAL):
+        self.paths = [op.abspath(p) for p in paths]
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def wait(self, timeout=None):
+        """
+        Wait until some of the watched files change, or for *timeout* seconds
+        if it is not None.
+
+        Return the set of files created, modified or deleted since the
+        previous call, or since the watcher was created.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            if deadline is None:
+                remaining = None
+            else:
+                remaining = max(0, deadline - time.time())
+            self._sleep(remaining)
+            changed = self._scan()
+            if changed or (deadline is not None and time.time() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _sleep(self, timeout):
+        if timeout is None:
+            timeout = self.interval
+        time.sleep(min(timeout, self.interval))
+
+    def _scan(self):
+        old_snapshot = self._snapshot
+        self._snapshot = self._take_snapshot()
+        return {f for f in set(old_snapshot).union(self._snapshot)
+                if old_snapshot.get(f) != self._snapshot.get(f)}
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in self.paths:
+            if op.isdir(path):
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames[:] = [d for d in dirnames if not _is_ignored(d)]
+                    for name in filenames:
+                        if not _is_ignored(name):
+                            fname = op.join(dirpath, name)
+                            snapshot[fname] = utils.get_file_stamp(fname)
+            else:
+                snapshot[path] = utils.get_file_stamp(path)
+        return {k: v for k, v in snapshot.items() if v is not None}
+
+    def _get_dirs(self):
+        """
+        Get the directories where changes to the watched files happen.
+        """
+        dirs = set()
+        for path in self.paths:
+            if op.isdir(path):
+                for dirpath, dirnames, _ in os.walk(path):
+                    dirnames[:] = [d for d in dirnames if not _is_ignored(d)]
+                    dirs.add(dirpath)
+            else:
+                # Watch the parent directory to see files (and directories)
+                # being created or replaced
+                parent_dir = op.dirname(path)
+                if op.isdir(parent_dir):
+                    dirs.add(parent_dir)
+        return dirs
+
+
+class InotifyWatcher(PollingWatcher):
+    """
+    Watch *paths* for changes, using inotify to sleep until something changes
+    in the watched directories.
+
+    Raise :class:`OSError` or :class:`AttributeError` if inotify is not
+    available.
+    """
+
+    def __init__(self, paths, interval=SETTLE_DELAY):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._inotify_add_watch = libc.inotify_add_watch
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        super(InotifyWatcher, self).__init__(paths, interval)
+        self._add_watches()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _sleep(self, timeout):
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return
+        while True:
+            self._read_events()
+            if not select.select([self._fd], [], [], self.interval)[0]:
+                return
+
+    def _scan(self):
+        # New directories may have been created
+        self._add_watches()
+        return super(InotifyWatcher, self)._scan()
+
+    def _add_watches(self):
+        # Adding a watch again to a directory is a no-op
+        for dname in self._get_dirs():
+            path = dname.encode(sys.getfilesystemencoding())
+            self._inotify_add_watch(self._fd, path, _IN_MASK)
+
+    def _read_events(self):
+        # Events are not decoded, the changes are found by scanning files
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except OSError as exc:
+            if exc.errno != errno.EAGAIN:
+                raise
+
+
+def _is_ignored(name):
+    return name.startswith('.') or name.endswith('~')
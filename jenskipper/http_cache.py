@@ -0,0 +1,177 @@
+"""
+An on-disk cache of HTTP responses, revalidated with conditional requests.
+
+Responses carrying an ``ETag`` or ``Last-Modified`` header are stored with
+their body. The next requests for the same URL send the corresponding
+``If-None-Match`` and ``If-Modified-Since`` headers, and the body is served
+from disk when the server answers with ``304 Not Modified``.
+"""
+import hashlib
+import json
+import os
+import os.path as op
+import shutil
+import threading
+
+import requests
+import requests.structures
+from six.moves.urllib import parse as urlparse
+
+
+#: The headers of cached responses that are stored with them
+STORED_HEADERS = ('content-type', 'etag', 'last-modified')
+
+
+class HTTPCache(object):
+    """
+    A cache of responses stored in *directory*.
+
+    The least recently used entries are evicted when the size of the cache
+    goes over *max_size* bytes.
+
+    Entries are grouped by job, so all the entries related to a job can be
+    dropped when it is modified, see :meth:`invalidate_job`.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """
+        Get the entry for *url*.
+
+        Return a ``(headers, content)`` tuple, or None if *url* is not in the
+        cache.
+        """
+        fname = self._get_entry_fname(url)
+        try:
+            with open(fname, 'rb') as fp:
+                headers = json.loads(fp.readline().decode('utf8'))
+                content = fp.read()
+            # Entries are evicted in modification time order
+            os.utime(fname, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return headers, content
+
+    def set(self, url, resp):
+        """
+        Store response *resp* for *url*, if it has validators.
+        """
+        headers = {k: resp.headers[k] for k in STORED_HEADERS
+                   if k in resp.headers}
+        if 'etag' not in headers and 'last-modified' not in headers:
+            return
+        fname = self._get_entry_fname(url)
+        data = json.dumps(headers).encode('utf8') + b'\n' + resp.content
+        tmp_fname = '%s.%s.%s.tmp' % (fname, os.getpid(),
+                                      threading.current_thread().ident)
+        try:
+            dirname = op.dirname(fname)
+            if not op.isdir(dirname):
+                os.makedirs(dirname)
+            with open(tmp_fname, 'wb') as fp:
+                fp.write(data)
+            try:
+                old_size = os.stat(fname).st_size
+            except OSError:
+                old_size = 0
+            os.rename(tmp_fname, fname)
+        except (IOError, OSError):
+            # The cache is only an optimization
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(s for _, _, s in self._list_entries())
+            else:
+                # Revalidated entries are overwritten
+                self._size += len(data) - old_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def invalidate_job(self, job_name):
+        """
+        Drop all the entries related to job *job_name*, and the entries not
+        related to any job (e.g. the list of jobs).
+        """
+        for scope in (job_name, None):
+            shutil.rmtree(self._get_scope_dir(scope), ignore_errors=True)
+        with self._lock:
+            self._size = None
+
+    def add_validators(self, headers, entry):
+        """
+        Return a copy of the *headers* dict with the validators of cache
+        *entry* added.
+        """
+        entry_headers, _ = entry
+        headers = dict(headers or {})
+        if 'etag' in entry_headers:
+            headers['If-None-Match'] = entry_headers['etag']
+        if 'last-modified' in entry_headers:
+            headers['If-Modified-Since'] = entry_headers['last-modified']
+        return headers
+
+    def make_response(self, entry, not_modified_resp):
+        """
+        Build a response from cache *entry*, to replace the ``304 Not
+        Modified`` response *not_modified_resp*.
+        """
+        entry_headers, content = entry
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = 'OK'
+        resp.url = not_modified_resp.url
+        resp.request = not_modified_resp.request
+        resp.elapsed = not_modified_resp.elapsed
+        resp.headers = requests.structures.CaseInsensitiveDict(entry_headers)
+        resp.headers.update(not_modified_resp.headers)
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp._content = content
+        resp.from_cache = True
+        return resp
+
+    def _evict(self):
+        entries = sorted(self._list_entries())
+        target_size = self.max_size * 0.8
+        for _, fname, size in entries:
+            if self._size <= target_size:
+                break
+            try:
+                os.unlink(fname)
+            except OSError:
+                pass
+            self._size -= size
+
+    def _list_entries(self):
+        for dirpath, _, fnames in os.walk(self.directory):
+            for fname in fnames:
+                path = op.join(dirpath, fname)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, path, stat.st_size
+
+    def _get_entry_fname(self, url):
+        url_hash = hashlib.sha1(url.encode('utf8')).hexdigest()
+        return op.join(self._get_scope_dir(_get_job_name(url)), url_hash)
+
+    def _get_scope_dir(self, job_name):
+        if job_name is None:
+            return op.join(self.directory, 'root')
+        job_hash = hashlib.sha1(job_name.encode('utf8')).hexdigest()
+        return op.join(self.directory, 'jobs', job_hash)
+
+
+def _get_job_name(url):
+    parts = urlparse.urlparse(url).path.split('/')
+    try:
+        index = parts.index('job')
+    except ValueError:
+        return None
+    if index + 1 < len(parts):
+        return urlparse.unquote(parts[index + 1])
@@ -0,0 +1,96 @@
+"""
+Timeouts and retries policy for requests made to the Jenkins server.
+"""
+import random
+
+import requests
+
+
+#: HTTP status codes indicating a transient server error. 500 is not part of
+#: them, Jenkins uses it to report some errors (e.g. a job type mismatch).
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+#: HTTP methods that can always be retried
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+#: Endpoint classes, as returned by
+#: :func:`jenskipper.jenkins_api.get_endpoint_class`
+ENDPOINT_CLASSES = ('config_get', 'config_post', 'api_json', 'console',
+                    'artifact', 'other')
+
+
+class RequestPolicy(object):
+    """
+    Decide timeouts and retries of requests.
+
+    *connect_timeout* and *read_timeout* are the default timeouts, in seconds.
+    *read_timeouts* is a dict of read timeouts by endpoint class (see
+    :data:`ENDPOINT_CLASSES`), overriding *read_timeout*. A timeout of 0 or
+    None means no timeout.
+
+    Failed requests are retried up to *retries* times, with exponential
+    backoff (``backoff_factor * 2 ** attempt`` seconds, capped to
+    *backoff_max*) and full jitter. Idempotent requests are retried on
+    connection errors, timeouts and :data:`RETRYABLE_STATUS_CODES`; other
+    requests are only retried if the connection to the server could not be
+    established, because the server may have processed them.
+    """
+
+    def __init__(self, connect_timeout=10, read_timeout=60, read_timeouts=None,
+                 retries=3, backoff_factor=0.5, backoff_max=30):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.read_timeouts = read_timeouts or {}
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+    @classmethod
+    def from_conf(cls, http_conf):
+        """
+        Create a policy from the ``http`` section of the configuration.
+        """
+        return cls(connect_timeout=http_conf['connect_timeout'],
+                   read_timeout=http_conf['read_timeout'],
+                   read_timeouts=dict(http_conf['read_timeouts']),
+                   retries=http_conf['retries'],
+                   backoff_factor=http_conf['backoff_factor'],
+                   backoff_max=http_conf['backoff_max'])
+
+    def get_timeout(self, endpoint_class):
+        """
+        Get the ``(connect_timeout, read_timeout)`` tuple for requests to
+        *endpoint_class*.
+        """
+        read_timeout = self.read_timeouts.get(endpoint_class)
+        if read_timeout is None:
+            read_timeout = self.read_timeout
+        return (self.connect_timeout or None, read_timeout or None)
+
+    def should_retry(self, attempt, idempotent, response=None, error=None):
+        """
+        Decide if a request should be retried after its *attempt*-th try
+        (starting at 0) returned *response* or raised *error*.
+        """
+        if attempt >= self.retries:
+            return False
+        if error is not None:
+            if isinstance(error, requests.ConnectTimeout):
+                return True
+            return idempotent and isinstance(error, (requests.ConnectionError,
+                                                     requests.Timeout))
+        return idempotent and response.status_code in RETRYABLE_STATUS_CODES
+
+    def get_delay(self, attempt, response=None):
+        """
+        Get the number of seconds to wait before retrying a request for the
+        *attempt*-th time.
+
+        Honor the ``Retry-After`` header of *response*, if any.
+        """
+        if response is not None:
+            retry_after = response.headers.get('retry-after', '')
+            if retry_after.isdigit():
+                return min(int(retry_after), self.backoff_max)
+        max_delay = min(self.backoff_max, self.backoff_factor * 2 ** attempt)
+        return random.uniform(0, max_delay)
@@ -0,0 +1,189 @@
+"""
+Statistics about the requests made to the Jenkins server.
+
+Enable recording with :func:`enable`; :class:`jenskipper.jenkins_api.
+JenkinsSession` then records all the requests it sends in the recorder
+returned by :func:`get_recorder`.
+"""
+import collections
+import threading
+import time
+
+
+#: Upper bounds of the latency histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+
+#: Width of the histogram bars
+HISTOGRAM_WIDTH = 40
+
+#: A request sent to the server. *status* is None if the request failed
+#: without a response. *ttfb* is the time until the response headers were
+#: received, *total* the time until the body was read (except for streamed
+#: responses), and *start* the time at which the request was sent.
+Request = collections.namedtuple('Request', 'method url endpoint_class status '
+                                 'size start ttfb total')
+
+
+_recorder = None
+
+
+def enable(slow_threshold=None):
+    """
+    Start recording requests statistics.
+
+    Requests taking more than *slow_threshold* seconds are reported
+    individually.
+
+    Return the :class:`StatsRecorder`.
+    """
+    global _recorder
+    _recorder = StatsRecorder(slow_threshold)
+    return _recorder
+
+
+def get_recorder():
+    """
+    Get the current :class:`StatsRecorder`, or None if recording is disabled.
+    """
+    return _recorder
+
+
+class StatsRecorder(object):
+    """
+    Record requests and report statistics about them.
+    """
+
+    def __init__(self, slow_threshold=None):
+        self.slow_threshold = slow_threshold
+        self.start_time = time.time()
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def record(self, method, url, endpoint_class, status, size, start, ttfb,
+               total):
+        """
+        Record a request, see :class:`Request` for the meaning of arguments.
+        """
+        request = Request(method, url, endpoint_class, status, size, start,
+                          ttfb, total)
+        with self._lock:
+            self.requests.append(request)
+
+    def format_report(self):
+        """
+        Return the statistics report, as a list of lines.
+        """
+        with self._lock:
+            requests = list(self.requests)
+        wall_time = time.time() - self.start_time
+        lines = ['HTTP requests statistics:', '']
+        if not requests:
+            lines.append('No requests were made.')
+            return lines
+
+        # Totals by endpoint class
+        lines.append('%-12s %6s %6s %10s %9s %9s %9s' %
+                     ('endpoint', 'count', 'errors', 'bytes', 'ttfb',
+                      'total', 'p95'))
+        by_class = collections.OrderedDict()
+        for request in sorted(requests, key=lambda r: r.endpoint_class):
+            by_class.setdefault(request.endpoint_class, []).append(request)
+        by_class['all'] = requests
+        for endpoint_class, class_requests in by_class.items():
+            totals = sorted(r.total for r in class_requests)
+            lines.append('%-12s %6d %6d %10s %9s %9s %9s' % (
+                endpoint_class,
+                len(class_requests),
+                sum(1 for r in class_requests if _is_error(r)),
+                _format_size(sum(r.size for r in class_requests)),
+                _format_duration(_mean([r.ttfb for r in class_requests])),
+                _format_duration(_mean(totals)),
+                _format_duration(_percentile(totals, 0.95)),
+            ))
+
+        # Latency histogram
+        lines.extend(['', 'Latency histogram:'])
+        counts = [0] * len(HISTOGRAM_BUCKETS)
+        for request in requests:
+            for index, bound in enumerate(HISTOGRAM_BUCKETS):
+                if request.total < bound:
+                    counts[index] += 1
+                    break
+        max_count = max(counts)
+        lower_bound = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS, counts):
+            label = '%s-%s' % (_format_duration(lower_bound),
+                               _format_duration(bound))
+            bar = '#' * int(round(HISTOGRAM_WIDTH * count / float(max_count)))
+            lines.append('%15s %6d %s' % (label, count, bar))
+            lower_bound = bound
+
+        # Slow requests
+        if self.slow_threshold is not None:
+            slow_requests = [r for r in requests
+                             if r.total > self.slow_threshold]
+            if slow_requests:
+                lines.extend(['', 'Requests slower than %s:' %
+                              _format_duration(self.slow_threshold)])
+                for request in slow_requests:
+                    lines.append('%9s %s %s %s' % (
+                        _format_duration(request.total),
+                        request.status or 'error',
+                        request.method,
+                        request.url,
+                    ))
+
+        # Time spent waiting for the server, counting concurrent requests only
+        # once
+        waiting_time = _get_busy_time(requests)
+        lines.extend(['', 'Time spent waiting for the server: %s of %s (%d%%)'
+                      % (_format_duration(waiting_time),
+                         _format_duration(wall_time),
+                         100 * waiting_time / wall_time if wall_time else 0)])
+        return lines
+
+
+def _is_error(request):
+    return request.status is None or request.status >= 400
+
+
+def _mean(values):
+    return sum(values) / float(len(values))
+
+
+def _percentile(sorted_values, fraction):
+    index = max(int(round(len(sorted_values) * fraction)) - 1, 0)
+    return sorted_values[index]
+
+
+def _get_busy_time(requests):
+    """
+    Get the duration of the union of the time intervals of *requests*.
+    """
+    busy_time = 0
+    current_start = current_end = None
+    for request in sorted(requests, key=lambda r: r.start):
+        end = request.start + request.total
+        if current_end is None or request.start > current_end:
+            if current_end is not None:
+                busy_time += current_end - current_start
+            current_start, current_end = request.start, end
+        else:
+            current_end = max(current_end, end)
+    return busy_time + current_end - current_start
+
+
+def _format_duration(seconds):
+    if seconds == float('inf'):
+        return 'inf'
+    if seconds < 1:
+        return '%dms' % round(seconds * 1000)
+    return '%.1fs' % seconds
+
+
+def _format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return '%d%s' % (size, unit)
+        size /= 1024.0
+    return '%.1fGB' % size
@@ -1,25 +1,77 @@
+from concurrent import futures
+import logging
+import os.path as op
+import threading
+import time
+
 import click
 import requests
+import requests.adapters
 import re
 import six
 from six.moves.urllib import parse as urlparse
 
 from . import conf
 from . import exceptions
+from . import repository
+from . import session_cache
+from . import http_cache
+from . import cassette
+from . import http_stats
+from . import http_policy
+from . import limiter
+
+
+logger = logging.getLogger(__name__)
+
+
+#: HTTP methods that don't need a crumb
+SAFE_HTTP_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+#: HTTP status codes signaling that the server is overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
+
+#: Endpoint classes whose responses are stored in the HTTP cache
+CACHED_ENDPOINT_CLASSES = ('config_get', 'api_json')
 
 
-def auth(base_dir, jenkins_url=None):
+def auth(base_dir, jenkins_url=None, use_cache=True):
     """
     Authenticate with the Jenkins server.
 
-    Return a :class:`requests.Session` object with authentication baked in.
-    """
-    session = requests.session()
+    Return a :class:`JenkinsSession` object with authentication baked in.
+
+    The state resulting from authentication (crumb, cookies, etc...) is cached
+    for ``server.session_cache_ttl`` seconds, so the next sessions for the
+    same server don't have to talk to the server before doing real work. Set
+    *use_cache* to false to ignore the cache and always check authentication
+    against the server.
+
+    Responses of GET requests to ``config.xml`` and ``api/json`` pages are
+    cached in the repository at *base_dir*, up to ``http.cache_max_size``
+    bytes, and revalidated with conditional requests.
 
+    Both caches are disabled when recording or replaying requests with
+    :mod:`jenskipper.cassette`.
+    """
     # Retrieve user/password from conf
     if jenkins_url is None:
         jenkins_url = conf.get(base_dir, ['server', 'location'])
-    session.jenkins_url = jenkins_url
+    session = JenkinsSession(jenkins_url)
+    session.cache_ttl = conf.get(base_dir, ['server', 'session_cache_ttl'])
+    http_conf = conf.get(base_dir, ['http'])
+    session.policy = http_policy.RequestPolicy.from_conf(http_conf)
+    session.limiter = limiter.AdaptiveLimiter.from_conf(http_conf)
+    cassette.mount(session)
+    _resize_connection_pool(session, session.limiter.max_limit)
+    cache_max_size = http_conf['cache_max_size']
+    # Responses must not depend on the cache when recording or replaying
+    if (cache_max_size and op.isdir(base_dir) and
+            not cassette.is_enabled()):
+        cache_dir = repository.get_cache_dir(base_dir, 'http')
+        if cache_dir is not None:
+            session.http_cache = http_cache.HTTPCache(cache_dir,
+                                                      cache_max_size)
     try:
         server_conf = conf.get(base_dir, [jenkins_url])
     except KeyError:
@@ -27,8 +79,24 @@ def auth(base_dir, jenkins_url=None):
     else:
         session.auth = (server_conf['username'], server_conf['password'])
 
+    # Always bootstrap when recording or replaying, so cassettes don't depend
+    # on the state of the cache
+    use_cache = use_cache and not cassette.is_enabled()
+    if use_cache and session.restore_bootstrap_state():
+        return session
+    _bootstrap(session)
+    return session
+
+
+def _bootstrap(session):
+    """
+    Check authentication on *session*'s server, asking credentials to the
+    user if needed, and setup crumbs.
+    """
+    jenkins_url = session.jenkins_url
+
     # Get info page on Jenkins to check authentication
-    info_url = urlparse.urljoin(jenkins_url, '/api/json')
+    info_url = _get_object_url(session, '', tree='useCrumbs')
     user_gave_auth = False
     while True:
         info_resp = session.get(info_url)
@@ -54,24 +122,284 @@ def auth(base_dir, jenkins_url=None):
             conf.set_in_user([jenkins_url, 'username'], username)
             conf.set_in_user([jenkins_url, 'password'], password)
 
-    # Add crumbs headers to the session if the server demands it
+    # Crumbs are only needed for mutating requests, so they are fetched by
+    # the session right before sending the first one
     info_dict = info_resp.json()
-    if info_dict['useCrumbs']:
-        crumbs_url = urlparse.urljoin(jenkins_url, '/crumbIssuer/api/json')
-        crumbs_resp = session.get(crumbs_url)
-        crumbs_resp.raise_for_status()
-        crumbs_dict = crumbs_resp.json()
-        field = crumbs_dict['crumbRequestField']
-        session.headers[field] = crumbs_dict['crumb']
+    session.use_crumbs = info_dict['useCrumbs']
+    session.save_bootstrap_state()
 
-    return session
+
+def get_endpoint_class(method, url):
+    """
+    Classify the request to *url* with *method*.
+
+    Return one of :data:`jenskipper.http_policy.ENDPOINT_CLASSES`.
+    """
+    path = urlparse.urlparse(url).path
+    if path.endswith('/config.xml'):
+        if method.upper() == 'GET':
+            return 'config_get'
+        return 'config_post'
+    elif path.endswith('/api/json'):
+        return 'api_json'
+    elif path.endswith('/consoleText'):
+        return 'console'
+    elif '/artifact/' in path:
+        return 'artifact'
+    return 'other'
+
+
+def _is_crumb_error(resp):
+    return resp.status_code == 403 and 'No valid crumb' in resp.text
+
+
+def _fetch_crumb(session):
+    crumbs_url = urlparse.urljoin(session.jenkins_url, '/crumbIssuer/api/json')
+    crumbs_resp = session.get(crumbs_url)
+    crumbs_resp.raise_for_status()
+    crumbs_dict = crumbs_resp.json()
+    session.set_crumb(crumbs_dict['crumbRequestField'], crumbs_dict['crumb'])
+
+
+def _record_request(recorder, method, url, resp, start_time, latency,
+                    stream):
+    """
+    Record a request sent by a :class:`JenkinsSession` in
+    :class:`jenskipper.http_stats.StatsRecorder` *recorder*.
+    """
+    endpoint_class = get_endpoint_class(method, url)
+    if resp is None:
+        recorder.record(method, url, endpoint_class, None, 0, start_time,
+                        latency, latency)
+        return
+    if stream:
+        # Don't consume the body of streamed responses
+        size = int(resp.headers.get('content-length', 0))
+    else:
+        size = len(resp.content)
+    recorder.record(method, url, endpoint_class, resp.status_code, size,
+                    start_time, resp.elapsed.total_seconds(), latency)
+
+
+class JenkinsSession(requests.Session):
+    """
+    A :class:`requests.Session` talking to the Jenkins server at
+    *jenkins_url*.
+
+    If the server demands it, a crumb is fetched right before sending the
+    first mutating request, and fetched again if the server rejects it.
+
+    Sessions restored from the bootstrap cache are bootstrapped again
+    transparently the first time the server rejects their credentials.
+
+    Timeouts and retries of requests are controlled by :attr:`policy`, a
+    :class:`jenskipper.http_policy.RequestPolicy`. Non-idempotent requests
+    (i.e. POSTs) are only retried on errors if the *idempotent* keyword
+    argument is true.
+
+    The number of concurrent requests is controlled by :attr:`limiter`, a
+    :class:`jenskipper.limiter.AdaptiveLimiter`.
+
+    If :attr:`http_cache` is set to a :class:`jenskipper.http_cache.HTTPCache`,
+    responses of GET requests to :data:`CACHED_ENDPOINT_CLASSES` are stored in
+    it, and served from it when the server tells they did not change.
+    """
+
+    def __init__(self, jenkins_url):
+        super(JenkinsSession, self).__init__()
+        self.jenkins_url = jenkins_url
+        self.cache_ttl = 0
+        self.use_crumbs = False
+        self.crumb_field = None
+        self.crumb = None
+        self._restored = False
+        self._bootstraps_count = 0
+        self._bootstrap_lock = threading.Lock()
+        self._crumb_lock = threading.Lock()
+        self.policy = http_policy.RequestPolicy()
+        self.limiter = limiter.AdaptiveLimiter()
+        self.http_cache = None
+
+    def request(self, method, url, *args, **kwargs):
+        if (self.http_cache is not None and
+                method.upper() == 'GET' and
+                not kwargs.get('stream') and
+                get_endpoint_class(method, url) in CACHED_ENDPOINT_CLASSES):
+            return self._cached_request(url, *args, **kwargs)
+        return self._request(method, url, *args, **kwargs)
+
+    def _cached_request(self, url, *args, **kwargs):
+        entry = self.http_cache.get(url)
+        if entry is not None:
+            kwargs['headers'] = self.http_cache.add_validators(
+                kwargs.get('headers'), entry
+            )
+        resp = self._request('GET', url, *args, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            return self.http_cache.make_response(entry, resp)
+        if resp.status_code == 200:
+            self.http_cache.set(url, resp)
+        return resp
+
+    def invalidate_http_cache(self, *jobs_names):
+        """
+        Drop the cached responses related to *jobs_names*.
+        """
+        if self.http_cache is not None:
+            for name in jobs_names:
+                self.http_cache.invalidate_job(name)
+
+    def _request(self, method, url, *args, **kwargs):
+        idempotent = kwargs.pop('idempotent', None)
+        if idempotent is None:
+            idempotent = method.upper() in http_policy.IDEMPOTENT_METHODS
+        needs_crumb = (self.use_crumbs and
+                       method.upper() not in SAFE_HTTP_METHODS)
+        if needs_crumb and self.crumb is None:
+            self._refresh_crumb(None)
+        crumb = self.crumb
+        restored = self._restored
+        bootstraps_count = self._bootstraps_count
+        resp = self._send(method, url, idempotent, *args, **kwargs)
+        if needs_crumb and _is_crumb_error(resp):
+            resp.close()
+            self._refresh_crumb(crumb)
+            resp = self._send(method, url, idempotent, *args, **kwargs)
+        if restored and resp.status_code in (401, 403):
+            # The cached state is stale, start over
+            resp.close()
+            self._bootstrap_again(bootstraps_count)
+            return self.request(method, url, *args, idempotent=idempotent,
+                                **kwargs)
+        return resp
+
+    def _bootstrap_again(self, bootstraps_count):
+        # Concurrent requests may all be rejected at the same time, only
+        # bootstrap once and retry them all after
+        with self._bootstrap_lock:
+            if self._bootstraps_count == bootstraps_count:
+                self._restored = False
+                session_cache.invalidate(self.jenkins_url,
+                                         self._get_username())
+                self.set_crumb(None, None)
+                self.cookies.clear()
+                _bootstrap(self)
+                self._bootstraps_count += 1
+
+    def _send(self, method, url, idempotent, *args, **kwargs):
+        """
+        Send a request, retrying it according to :attr:`policy`.
+        """
+        endpoint_class = get_endpoint_class(method, url)
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.policy.get_timeout(endpoint_class)
+        attempt = 0
+        while True:
+            try:
+                resp = self._send_once(method, url, *args, **kwargs)
+            except requests.RequestException as exc:
+                if not self.policy.should_retry(attempt, idempotent,
+                                                error=exc):
+                    raise
+                delay = self.policy.get_delay(attempt)
+                reason = exc
+            else:
+                if not self.policy.should_retry(attempt, idempotent,
+                                                response=resp):
+                    return resp
+                resp.close()
+                delay = self.policy.get_delay(attempt, resp)
+                reason = 'HTTP %s' % resp.status_code
+            logger.warning('%s %s failed (%s), retrying in %.1fs', method,
+                           url, reason, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _send_once(self, method, url, *args, **kwargs):
+        self.limiter.acquire()
+        start_time = time.time()
+        overloaded = False
+        resp = None
+        try:
+            resp = super(JenkinsSession, self).request(method, url, *args,
+                                                       **kwargs)
+            overloaded = resp.status_code in OVERLOAD_STATUS_CODES
+            return resp
+        except requests.Timeout:
+            overloaded = True
+            raise
+        finally:
+            latency = time.time() - start_time
+            self.limiter.release(latency, overloaded)
+            recorder = http_stats.get_recorder()
+            if recorder is not None:
+                _record_request(recorder, method, url, resp, start_time,
+                                latency, kwargs.get('stream'))
+
+    def _refresh_crumb(self, stale_crumb):
+        # Concurrent requests may all need a crumb at the same time, only
+        # fetch it once
+        with self._crumb_lock:
+            if self.crumb == stale_crumb:
+                _fetch_crumb(self)
+                self.save_bootstrap_state()
+
+    def set_crumb(self, field, crumb):
+        """
+        Set the crumb sent in requests headers, or remove it if *field* is
+        None.
+        """
+        if self.crumb_field is not None:
+            self.headers.pop(self.crumb_field, None)
+        self.crumb_field = field
+        self.crumb = crumb
+        if field is not None:
+            self.headers[field] = crumb
+
+    def save_bootstrap_state(self):
+        """
+        Save the state resulting from the authentication process in the
+        bootstrap cache.
+        """
+        if not self.cache_ttl:
+            return
+        state = {
+            'use_crumbs': self.use_crumbs,
+            'crumb_field': self.crumb_field,
+            'crumb': self.crumb,
+            'cookies': self.cookies.get_dict(),
+        }
+        session_cache.save(self.jenkins_url, self._get_username(), state)
+
+    def restore_bootstrap_state(self):
+        """
+        Restore the session state from the bootstrap cache.
+
+        Return True if a valid state was found in the cache.
+        """
+        if not self.cache_ttl:
+            return False
+        state = session_cache.load(self.jenkins_url, self._get_username(),
+                                   self.cache_ttl)
+        if state is None:
+            return False
+        self.use_crumbs = state['use_crumbs']
+        self.set_crumb(state['crumb_field'], state['crumb'])
+        self.cookies.update(state['cookies'])
+        self._restored = True
+        return True
+
+    def _get_username(self):
+        if self.auth is None:
+            return None
+        return self.auth[0]
 
 
 def list_jobs(session):
     """
     Get the names of jobs on the server.
     """
-    data = get_object(session, '')
+    data = get_object(session, '', tree='jobs[name]')
     return [j['name'] for j in data['jobs']]
 
 
@@ -85,6 +413,10 @@ def get_job_config(session, name):
     """
     url = _get_job_config_url(session, name)
     resp = session.get(url)
+    return _handle_job_config_response(resp, name)
+
+
+def _handle_job_config_response(resp, name):
     try:
         resp.raise_for_status()
     except requests.HTTPError as exc:
@@ -94,16 +426,109 @@ def get_job_config(session, name):
     return resp.text
 
 
-def _post_data(session, url, data, content_type='application/xml'):
+def get_jobs_configs(session, names, max_workers=None):
+    """
+    Get the XML configurations of jobs *names* from server, fetching them
+    concurrently.
+
+    The number of requests in flight is decided by *session*'s limiter, and
+    can be capped further by *max_workers*.
+
+    Return an iterator of ``(name, config, error)`` tuples, in the same order
+    as *names*. If fetching a job failed, *config* is None and *error* is the
+    exception that was raised (e.g.
+    :class:`jenskipper.exceptions.JobNotFound`); errors do not prevent the
+    other jobs from being fetched.
+    """
+    return _map_concurrently(session, get_job_config, names, max_workers)
+
+
+def get_objects(session, paths_or_urls, tree=None, depth=None,
+                max_workers=None):
+    """
+    Get data from the ``api/json`` pages of *paths_or_urls* concurrently.
+
+    Return an iterator of ``(path_or_url, data, error)`` tuples, like
+    :func:`get_jobs_configs`. See :func:`get_object` for the meaning of the
+    other arguments.
+    """
+    def func(session, path_or_url):
+        return get_object(session, path_or_url, tree=tree, depth=depth)
+
+    return _map_concurrently(session, func, paths_or_urls, max_workers)
+
+
+def _map_concurrently(session, func, items, max_workers=None):
+    """
+    Call ``func(session, item)`` for each element of *items* in a pool of
+    threads, sharing the connection pool of *session*.
+
+    There are *max_workers* threads, or as many as the maximum concurrency of
+    *session*'s limiter if it's None.
+
+    Yield ``(item, result, error)`` tuples in the order of *items*.
+    """
+    if max_workers is None:
+        max_workers = session.limiter.max_limit
+    items = list(items)
+    if len(items) > 1:
+        _resize_connection_pool(session, max_workers)
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    pending = []
+    try:
+        pending = [(item, executor.submit(func, session, item))
+                   for item in items]
+        for item, future in pending:
+            try:
+                result = future.result()
+            except (exceptions.JenskipperError,
+                    requests.RequestException) as exc:
+                yield item, None, exc
+            else:
+                yield item, result, None
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _resize_connection_pool(session, size):
+    """
+    Make sure *session* keeps at least *size* connections alive per host, so
+    concurrent requests don't have to open new ones.
+    """
+    for prefix in ('http://', 'https://'):
+        adapter = session.adapters.get(prefix)
+        # Other adapters (e.g. replaying cassettes) don't pool connections
+        if (not isinstance(adapter, requests.adapters.HTTPAdapter) or
+                adapter._pool_maxsize >= size):
+            continue
+        adapter.poolmanager.clear()
+        adapter.init_poolmanager(size, size, block=adapter._pool_block)
+
+
+def _post_data(session, url, data, content_type='application/xml',
+               **kwargs):
     """
     POST data to *url*, properly encoding to bytes and setting Content-Type
     header with charset if needed.
+
+    Extra keyword arguments are passed to :meth:`JenkinsSession.post`.
+    """
+    data, headers = _encode_post_data(data, content_type)
+    return session.post(url, data, headers=headers, **kwargs)
+
+
+def _encode_post_data(data, content_type='application/xml'):
+    """
+    Return a ``(data, headers)`` tuple for POSTing *data*, encoding text to
+    UTF-8 bytes.
     """
     if isinstance(data, six.text_type):
         data = data.encode('utf-8')
         if 'charset' not in content_type:
             content_type += '; charset=utf-8'
-    return session.post(url, data, headers={'content-type': content_type})
+    return data, {'content-type': content_type}
 
 
 def push_job_config(session, name, config, allow_create=True):
@@ -119,20 +544,32 @@ def push_job_config(session, name, config, allow_create=True):
     on the server.
     """
     url = _get_job_config_url(session, name)
-    resp = _post_data(session, url, config)
+    resp = _post_data(session, url, config, idempotent=True)
+    session.invalidate_http_cache(name)
+    if _push_job_config_needs_create(resp, allow_create):
+        return create_job(session, name, config)
+
+
+def _push_job_config_needs_create(resp, allow_create):
+    """
+    Check the response of a job configuration push.
+
+    Return True if the job does not exist and should be created.
+    """
     try:
         resp.raise_for_status()
     except requests.HTTPError as exc:
         if exc.response.status_code == 500:
             match = re.search(r'java.io.IOException: Expecting class '
-                              r'([^\d\W][\w.]*) but got class ([^\d\W][\w.]*) '
-                              r'instead', exc.response.text)
+                              r'([^\d\W][\w.]*) but got class '
+                              r'([^\d\W][\w.]*) instead', exc.response.text)
             if match is not None:
                 expected_type, pushed_type = match.groups()
                 raise exceptions.JobTypeMismatch(expected_type, pushed_type)
         elif exc.response.status_code == 404 and allow_create:
-            return create_job(session, name, config)
+            return True
         raise
+    return False
 
 
 def _get_credentials(jenkins_url):
@@ -148,31 +585,44 @@ def delete_job(session, name):
     """
     Delete job named *name* on server.
     """
-    url = urlparse.urljoin(session.jenkins_url, '/job/%s/doDelete' % name)
-    resp = session.post(url)
+    resp = session.post(_get_delete_job_url(session, name))
+    session.invalidate_http_cache(name)
     resp.raise_for_status()
 
 
+def _get_delete_job_url(session, name):
+    return urlparse.urljoin(session.jenkins_url, '/job/%s/doDelete' % name)
+
+
 def rename_job(session, name, new_name):
     """
     Rename job *name* to *new_name* on server.
     """
-    url = urlparse.urljoin(session.jenkins_url, '/job/%s/doRename?newName=%s' %
-                           (name, new_name))
-    resp = session.post(url)
+    resp = session.post(_get_rename_job_url(session, name, new_name))
+    session.invalidate_http_cache(name, new_name)
     resp.raise_for_status()
 
 
+def _get_rename_job_url(session, name, new_name):
+    return urlparse.urljoin(session.jenkins_url,
+                            '/job/%s/doRename?newName=%s' % (name, new_name))
+
+
 def create_job(session, name, conf):
     """
     Create a new job named *name* with *conf* on server.
     """
-    url = urlparse.urljoin(session.jenkins_url, '/createItem?name=%s' %
-                           urlparse.quote_plus(name))
+    url = _get_create_job_url(session, name)
     resp = _post_data(session, url, conf, 'application/xml')
+    session.invalidate_http_cache(name)
     resp.raise_for_status()
 
 
+def _get_create_job_url(session, name):
+    return urlparse.urljoin(session.jenkins_url, '/createItem?name=%s' %
+                            urlparse.quote_plus(name))
+
+
 def build_job(session, job_name, parameters=None):
     """
     Trigger a build for *job_name*.
@@ -182,12 +632,21 @@ def build_job(session, job_name, parameters=None):
 
     Return the URL of the item in the builds queue.
     """
+    url = _get_build_job_url(session, job_name, parameters)
+    resp = _post_data(session, url, parameters)
+    return _handle_build_job_response(resp, job_name)
+
+
+def _get_build_job_url(session, job_name, parameters):
     if parameters:
-        url = urlparse.urljoin(session.jenkins_url,
-                               '/job/%s/buildWithParameters' % job_name)
+        return urlparse.urljoin(session.jenkins_url,
+                                '/job/%s/buildWithParameters' % job_name)
     else:
-        url = urlparse.urljoin(session.jenkins_url, '/job/%s/build' % job_name)
-    resp = _post_data(session, url, parameters)
+        return urlparse.urljoin(session.jenkins_url,
+                                '/job/%s/build' % job_name)
+
+
+def _handle_build_job_response(resp, job_name):
     if resp.status_code == 400:
         raise exceptions.MissingParametrizedBuildParameters(job_name)
     if resp.status_code == 500:
@@ -205,46 +664,75 @@ def get_build_log(session, build_url):
     *build_url* is expected to be a full URL, as returned by
     :func:`jenskipper.cli.build.wait_for_builds`.
     """
-    url = urlparse.urljoin(build_url, 'consoleText')
-    resp = session.get(url)
+    resp = session.get(_get_build_log_url(build_url))
     resp.raise_for_status()
     return resp.text
 
 
-def get_object(session, path_or_url):
+def _get_build_log_url(build_url):
+    return urlparse.urljoin(build_url, 'consoleText')
+
+
+def get_object(session, path_or_url, tree=None, depth=None):
     """
     Get data from the ``api/json`` page of *path_or_url*.
 
     *path_or_url* can be a path relative to *session.jenkins_url* or a full
     jenkins URL.
+
+    *tree* restricts the returned data to the given fields, using the Jenkins
+    API ``tree`` syntax (e.g. ``"builds[number,url]"``). Always pass it when
+    possible, some objects are huge (the root object contains all the jobs
+    for example). *depth* controls how deep nested objects are returned.
     """
-    parsed = urlparse.urlparse(path_or_url)
-    url = urlparse.urljoin(session.jenkins_url, '%s/api/json' % parsed.path)
-    resp = session.get(url)
+    resp = session.get(_get_object_url(session, path_or_url, tree, depth))
     resp.raise_for_status()
     return resp.json()
 
 
+def _get_object_url(session, path_or_url, tree=None, depth=None):
+    parsed = urlparse.urlparse(path_or_url)
+    url = urlparse.urljoin(session.jenkins_url, '%s/api/json' % parsed.path)
+    params = []
+    if tree is not None:
+        params.append(('tree', tree))
+    if depth is not None:
+        params.append(('depth', depth))
+    if params:
+        url += '?' + urlparse.urlencode(params)
+    return url
+
+
 def toggle_job(session, job_name, enable):
     """
     Enable or disable a job.
     """
-    url = urlparse.urljoin(session.jenkins_url,
-                           '/job/%s/%s' %
-                           (job_name, 'enable' if enable else 'disable'))
-    resp = session.post(url)
+    resp = session.post(_get_toggle_job_url(session, job_name, enable),
+                        idempotent=True)
+    session.invalidate_http_cache(job_name)
     resp.raise_for_status()
 
 
+def _get_toggle_job_url(session, job_name, enable):
+    return urlparse.urljoin(session.jenkins_url,
+                            '/job/%s/%s' %
+                            (job_name, 'enable' if enable else 'disable'))
+
+
 def get_artifact(session, job_name, build, artifact_name, node_name):
     """
     Get a build artifact.
 
     Return a :class:`requests.Response` object.
     """
+    url = _get_artifact_url(session, job_name, build, artifact_name,
+                            node_name)
+    return session.get(url, stream=True)
+
+
+def _get_artifact_url(session, job_name, build, artifact_name, node_name):
     path = '/job/%s/%s' % (job_name, build)
     if node_name is not None:
         path += '/nodes=%s' % node_name
     path += '/artifact/%s' % artifact_name
-    url = urlparse.urljoin(session.jenkins_url, path)
-    return session.get(url, stream=True)
+    return urlparse.urljoin(session.jenkins_url, path)
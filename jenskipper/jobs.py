@@ -53,6 +53,11 @@ def merge_pipeline_conf(conf, parents, link_type):
     to them (one of "SUCCESS", "UNSTABLE" or "FAILURE").
     """
     tree = utils.parse_xml(conf)
+    _merge_pipeline_tree(tree, parents, link_type)
+    return utils.render_xml(tree)
+
+
+def _merge_pipeline_tree(tree, parents, link_type):
     trigger = _create_elt('jenkins.triggers.ReverseBuildTrigger')
     trigger.append(_create_elt('spec'))
     upstream_projects = _create_elt('upstreamProjects', ', '.join(parents))
@@ -65,7 +70,6 @@ def merge_pipeline_conf(conf, parents, link_type):
     trigger.append(threshold)
     triggers = tree.find('.//triggers')
     triggers.append(trigger)
-    return utils.render_xml(tree)
 
 
 def _create_elt(tag, text=None):
@@ -75,7 +79,7 @@ def _create_elt(tag, text=None):
 
 
 def render_job(templates_dir, template, context, pipe_info, insert_hash=False,
-               context_overrides={}):
+               context_overrides={}, bytecode_cache_dir=None):
     """
     Render a job XML from job definition.
 
@@ -91,28 +95,60 @@ def render_job(templates_dir, template, context, pipe_info, insert_hash=False,
         the job description
     :param context_overrides:
         a mapping that will be deep merged in the final context
+    :param bytecode_cache_dir:
+        the directory where compiled templates are cached, or None
     :return:
         a ``(rendered_job, template_files)`` tuple, where
         ``template_files`` is the set of files that were loaded to render the
         job XML
     """
     rendered, files = templates.render(templates_dir, template, context,
-                                       context_overrides=context_overrides)
-    rendered = rendered.strip()
+                                       context_overrides=context_overrides,
+                                       bytecode_cache_dir=bytecode_cache_dir)
+    rendered, _ = finalize_job(rendered, pipe_info, insert_hash=insert_hash)
+    return rendered, files
+
+
+def finalize_job(conf, pipe_info, insert_hash=False):
+    """
+    Merge pipeline informations *pipe_info* in rendered job *conf*, and
+    insert its hash in its description if *insert_hash* is true.
+
+    The XML is parsed and serialized at most once, and not at all if there
+    is nothing to do.
+
+    Return a ``(conf, conf_hash)`` tuple. *conf_hash* is the hash of the job
+    configuration without the hash tag (see :func:`get_conf_hash`) if
+    *insert_hash* is true, None otherwise.
+    """
+    conf = conf.strip()
+    if pipe_info is None and not insert_hash:
+        return conf, None
+    tree = utils.parse_xml(conf)
     if pipe_info is not None:
         parents, link_type = pipe_info
-        rendered = merge_pipeline_conf(rendered, parents, link_type)
+        _merge_pipeline_tree(tree, parents, link_type)
     if insert_hash:
-        rendered = append_hash_in_description(rendered)
-    return rendered, files
+        conf_hash = get_tree_hash(tree)
+        _insert_hash_in_description(tree, conf_hash)
+    else:
+        conf_hash = None
+    return utils.render_xml(tree), conf_hash
 
 
 def get_conf_hash(conf):
     """
     Get a hash uniquely representing the XML job configuration *conf*.
     """
+    return get_tree_hash(utils.parse_xml(conf))
+
+
+def get_tree_hash(tree):
+    """
+    Get a hash uniquely representing the parsed XML job configuration *tree*,
+    see :func:`get_conf_hash`.
+    """
     hobj = hashlib.sha1()
-    tree = utils.parse_xml(conf)
     for element in tree.iter():
         hobj.update(element.tag.encode('utf8'))
         if element.text is not None:
@@ -128,13 +164,16 @@ def append_hash_in_description(conf):
     """
     Append the *conf* hash at the end of its description.
     """
-    conf_hash = get_conf_hash(conf)
     tree = utils.parse_xml(conf)
+    _insert_hash_in_description(tree, get_tree_hash(tree))
+    return utils.render_xml(tree)
+
+
+def _insert_hash_in_description(tree, conf_hash):
     description_elt = tree.find('.//description')
     text = description_elt.text if description_elt.text is not None else ''
     text += '\r\n\r\n-*- jenskipper-hash: %s -*-' % conf_hash
     description_elt.text = text
-    return utils.render_xml(tree)
 
 
 def extract_hash_from_description(conf):
@@ -0,0 +1,94 @@
+"""
+Adaptive concurrency limiting for requests made to the Jenkins server.
+"""
+import collections
+import threading
+
+
+class AdaptiveLimiter(object):
+    """
+    Limit the number of concurrent requests, adapting the limit to the load of
+    the server with an AIMD (additive increase, multiplicative decrease)
+    algorithm.
+
+    The limit starts at *initial_limit* and stays between *min_limit* and
+    *max_limit*. It increases by one each time a full limit's worth of
+    requests succeed while latency stays flat, and is multiplied by
+    *backoff_ratio* when the server signals it is overloaded (429 and 503
+    responses, timeouts), or when the 95th percentile of the last *window*
+    latencies rises above *latency_tolerance* times the baseline latency. The
+    baseline is the lowest 95th percentile observed, slowly drifting towards
+    the current one.
+
+    Use :meth:`acquire` before sending a request and :meth:`release` when it
+    is done.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=16,
+                 backoff_ratio=0.5, latency_tolerance=2.0, window=20):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._baseline = None
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_conf(cls, http_conf):
+        """
+        Create a limiter from the ``http`` section of the configuration.
+        """
+        return cls(initial_limit=http_conf['initial_concurrency'],
+                   min_limit=http_conf['min_concurrency'],
+                   max_limit=http_conf['max_concurrency'])
+
+    def acquire(self):
+        """
+        Wait until a request can be sent.
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency, overloaded=False):
+        """
+        Signal that a request is done.
+
+        *latency* is the time it took in seconds, and *overloaded* tells if
+        the server signaled it is overloaded.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self._decrease()
+            else:
+                self._latencies.append(latency)
+                if self._latency_is_rising():
+                    self._decrease()
+                else:
+                    self.limit = min(self.limit + 1.0 / self.limit,
+                                     self.max_limit)
+            self._cond.notify_all()
+
+    def _latency_is_rising(self):
+        if len(self._latencies) < self._latencies.maxlen:
+            return False
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        if self._baseline is None or p95 < self._baseline:
+            self._baseline = p95
+            return False
+        rising = p95 > self._baseline * self.latency_tolerance
+        # Let the baseline slowly follow the latency, or the limiter would
+        # never recover from a permanent slow down of the server
+        self._baseline += (p95 - self._baseline) * 0.1
+        return rising
+
+    def _decrease(self):
+        self.limit = max(self.limit * self.backoff_ratio, self.min_limit)
+        # Judge the new limit on fresh latencies only
+        self._latencies.clear()
@@ -0,0 +1,222 @@
+"""
+A content-addressed cache of rendered jobs.
+
+Rendering a job only depends on its template files, its context, its
+pipeline informations and the rendering options. A job is cached in two
+steps:
+
+* a manifest, keyed on a digest of the rendering inputs known before
+  rendering (see :func:`get_inputs_key`), lists the template files that were
+  loaded to render the job, and the files of the templates that were looked
+  up but not found;
+* an entry, keyed on this digest and the contents of the files listed in the
+  manifest, contains the rendered XML. Missing files are hashed as such, so
+  creating them invalidates the entry.
+
+A job is served from the cache as long as its inputs and the contents of its
+template files do not change, whatever their modification times.
+"""
+import collections
+import collections.abc
+import hashlib
+import json
+import os
+import os.path as op
+import threading
+
+import jinja2
+from six.moves import cPickle as pickle
+
+from . import utils
+
+
+#: Version of the cache entries format, and of the rendering process
+CACHE_VERSION = 4
+
+#: A rendered job, see :meth:`RenderCache.get`
+Entry = collections.namedtuple('Entry', 'rendered files')
+
+_files_hashes = {}
+_files_hashes_lock = threading.Lock()
+
+
+def get_inputs_key(template, context, pipe_info, insert_hash,
+                   context_overrides, base_dir=None):
+    """
+    Get a digest of the inputs of :func:`jenskipper.jobs.render_job`, except
+    the templates contents.
+
+    *base_dir* is the location of the repository. Entries store the absolute
+    paths of the template files, so they can't be shared by copies of a
+    repository.
+
+    Return None if the inputs can't be serialized reliably.
+    """
+    return get_digest([CACHE_VERSION, jinja2.__version__, template, context,
+                       pipe_info, insert_hash, context_overrides,
+                       base_dir])
+
+
+def get_digest(obj):
+    """
+    Get a digest of *obj*, a structure of JSON-like types.
+
+    Return None if *obj* can't be serialized reliably.
+    """
+    try:
+        data = json.dumps(obj, sort_keys=True, default=_json_default)
+    except (TypeError, ValueError):
+        # Keys of mixed types can't be sorted
+        return None
+    return hashlib.sha1(data.encode('utf8')).hexdigest()
+
+
+def _json_default(obj):
+    if isinstance(obj, collections.abc.Mapping):
+        # Contexts may be views, see jenskipper.repository.JobDef
+        return dict(obj)
+    return repr(obj)
+
+
+def get_file_hash(fname):
+    """
+    Get the hash of file *fname* contents, or None if it can't be read.
+
+    Hashes are memoized for the life of the process, and computed again
+    when the file modification time or size change.
+    """
+    stamp = utils.get_file_stamp(fname)
+    if stamp is None:
+        return None
+    with _files_hashes_lock:
+        memoized = _files_hashes.get(fname)
+    if memoized is not None and memoized[0] == stamp:
+        return memoized[1]
+    try:
+        with open(fname, 'rb') as fp:
+            file_hash = hashlib.sha1(fp.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+    with _files_hashes_lock:
+        _files_hashes[fname] = (stamp, file_hash)
+    return file_hash
+
+
+class RenderCache(object):
+    """
+    A cache of rendered jobs stored in *directory*.
+
+    The least recently used entries are evicted when the size of the cache
+    goes over *max_size* bytes.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+        self._lock = threading.Lock()
+
+    def get(self, inputs_key):
+        """
+        Get the job rendered from inputs *inputs_key* (see
+        :func:`get_inputs_key`) and the current contents of its templates.
+
+        Return an :class:`Entry`, or None if the job is not in the cache.
+        """
+        files = self._read(self._get_fname(inputs_key, 'manifest'))
+        if files is None:
+            return None
+        entry_key = self._get_entry_key(inputs_key, files)
+        if entry_key is None:
+            return None
+        entry = self._read(self._get_fname(entry_key, 'entry'))
+        if entry is None:
+            return None
+        return Entry(*entry)
+
+    def set(self, inputs_key, rendered, files):
+        """
+        Store job *rendered* from inputs *inputs_key* and template *files*.
+        """
+        files = sorted(files)
+        entry_key = self._get_entry_key(inputs_key, files)
+        if entry_key is None:
+            return
+        self._write(self._get_fname(inputs_key, 'manifest'), files)
+        self._write(self._get_fname(entry_key, 'entry'),
+                    (rendered, files))
+
+    def _get_entry_key(self, inputs_key, files):
+        hobj = hashlib.sha1(inputs_key.encode('utf8'))
+        for fname in files:
+            file_hash = get_file_hash(fname)
+            hobj.update(fname.encode('utf8'))
+            if file_hash is None:
+                hobj.update(b'\0missing')
+            else:
+                hobj.update(file_hash.encode('utf8'))
+        return hobj.hexdigest()
+
+    def _get_fname(self, key, kind):
+        return op.join(self.directory, '%s.%s' % (key, kind))
+
+    def _read(self, fname):
+        try:
+            with open(fname, 'rb') as fp:
+                data = pickle.load(fp)
+            # Entries are evicted in modification time order
+            os.utime(fname, None)
+        except Exception:
+            # Missing, truncated or incompatible entry
+            return None
+        return data
+
+    def _write(self, fname, data):
+        tmp_fname = '%s.%s.%s.tmp' % (fname, os.getpid(),
+                                      threading.current_thread().ident)
+        try:
+            with open(tmp_fname, 'wb') as fp:
+                pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+            try:
+                old_size = os.stat(fname).st_size
+            except OSError:
+                old_size = 0
+            os.rename(tmp_fname, fname)
+            size = os.stat(fname).st_size
+        except (IOError, OSError, pickle.PicklingError):
+            # The cache is only an optimization
+            try:
+                os.unlink(tmp_fname)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(s for _, _, s in self._list_entries())
+            else:
+                # Manifests are overwritten when jobs are rendered again
+                self._size += size - old_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._list_entries())
+        target_size = self.max_size * 0.8
+        for _, fname, size in entries:
+            if self._size <= target_size:
+                break
+            try:
+                os.unlink(fname)
+            except OSError:
+                pass
+            self._size -= size
+
+    def _list_entries(self):
+        for fname in os.listdir(self.directory):
+            path = op.join(self.directory, fname)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield (getattr(stat, 'st_mtime_ns', stat.st_mtime), path,
+                   stat.st_size)
@@ -0,0 +1,151 @@
+"""
+Render jobs in parallel, in a pool of processes.
+
+Rendering jobs is CPU bound, so it is spread over processes rather than
+threads. Each worker process keeps its own :class:`jenskipper.repository.
+Repository` and Jinja environments, so definitions are parsed and templates
+compiled only once per worker.
+"""
+from concurrent import futures
+import multiprocessing
+import sys
+from xml.etree import ElementTree
+
+import jinja2
+
+from . import exceptions
+from . import repository
+from . import templates
+
+
+#: Batches smaller than this number of jobs per worker are rendered in the
+#: current process, starting workers would cost more than it saves
+MIN_JOBS_PER_WORKER = 8
+
+#: Maximum number of jobs sent to a worker at once
+MAX_CHUNK_SIZE = 32
+
+
+def render_jobs(base_dir, jobs_names, context_overrides={}, insert_hash=False,
+                workers=None, use_cache=True):
+    """
+    Render jobs *jobs_names* of the repository at *base_dir* in *workers*
+    processes (the number of CPUs by default). The render cache is used if
+    *use_cache* is true.
+
+    Yield ``(job_name, result, error)`` tuples in the order of *jobs_names*.
+    *result* is the ``(rendered_job, template_files)`` tuple returned by
+    :meth:`jenskipper.repository.Repository.render_job`, or None if rendering
+    failed on a template error, or on an XML error for the jobs whose XML is
+    post-processed (see :func:`jenskipper.jobs.finalize_job`). *error* is
+    then a :class:`jenskipper.exceptions.RenderError`. Other errors are
+    raised.
+    """
+    jobs_names = list(jobs_names)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(jobs_names) // MIN_JOBS_PER_WORKER)
+    if workers <= 1:
+        for job_name in jobs_names:
+            result, error = render_job(base_dir, job_name, context_overrides,
+                                       insert_hash, use_cache)
+            yield job_name, result, error
+        return
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(jobs_names) // (workers * 4)))
+    chunks = [jobs_names[i:i + chunk_size]
+              for i in range(0, len(jobs_names), chunk_size)]
+    executor = futures.ProcessPoolExecutor(max_workers=workers)
+    pending = []
+    try:
+        pending = [executor.submit(_render_chunk, base_dir, chunk,
+                                   context_overrides, insert_hash, use_cache)
+                   for chunk in chunks]
+        for chunk, future in zip(chunks, pending):
+            for job_name, (result, error) in zip(chunk, future.result()):
+                yield job_name, result, error
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def find_jobs_files(base_dir, jobs_names, workers=None):
+    """
+    Find the template files used by jobs *jobs_names* of the repository at
+    *base_dir*.
+
+    Files are found statically (see :meth:`jenskipper.repository.Repository.
+    find_job_files`). Only the jobs using templates referenced dynamically
+    are rendered, in *workers* processes.
+
+    Yield ``(job_name, files, error)`` tuples in the order of *jobs_names*.
+    If rendering a job failed, *error* is a
+    :class:`jenskipper.exceptions.RenderError` and *files* only contains the
+    files found statically.
+    """
+    repos = repository.get_repository(base_dir)
+    jobs_names = list(jobs_names)
+    found_files = {}
+    incomplete_jobs = []
+    for job_name in jobs_names:
+        files, complete = repos.find_job_files(job_name)
+        found_files[job_name] = files
+        if not complete:
+            incomplete_jobs.append(job_name)
+    repos.index.save()
+    errors = {}
+    results = render_jobs(base_dir, incomplete_jobs, workers=workers)
+    for job_name, result, error in results:
+        if error is None:
+            found_files[job_name] = found_files[job_name].union(result[1])
+        else:
+            errors[job_name] = error
+    for job_name in jobs_names:
+        yield job_name, found_files[job_name], errors.get(job_name)
+
+
+def render_job(base_dir, job_name, context_overrides={}, insert_hash=False,
+               use_cache=True):
+    """
+    Render job *job_name* of the repository at *base_dir*.
+
+    Return a ``(result, error)`` tuple, see :func:`render_jobs`.
+    """
+    repos = repository.get_repository(base_dir)
+    try:
+        result = repos.render_job(job_name,
+                                  context_overrides=context_overrides,
+                                  insert_hash=insert_hash,
+                                  use_cache=use_cache)
+    except jinja2.TemplateNotFound as exc:
+        return None, exceptions.RenderError(job_name,
+                                            missing_template=exc.name)
+    except jinja2.TemplateError:
+        exc_info = sys.exc_info()
+        try:
+            stack, message = templates.extract_jinja_error(exc_info,
+                                                           base_dir)
+        except TypeError:
+            stack, message = [], u'%s: %s' % (exc_info[0].__name__,
+                                              exc_info[1])
+        if isinstance(exc_info[1], jinja2.TemplateSyntaxError):
+            syntax_error_fname = exc_info[1].filename
+        else:
+            syntax_error_fname = None
+        return None, exceptions.RenderError(
+            job_name, stack=stack, message=message,
+            syntax_error_fname=syntax_error_fname
+        )
+    except ElementTree.ParseError as exc:
+        # Jobs in pipelines can't be rendered from invalid XML
+        return None, exceptions.RenderError(job_name, stack=[],
+                                            message=u'XML error: %s' % exc)
+    return result, None
+
+
+def _render_chunk(base_dir, jobs_names, context_overrides, insert_hash,
+                  use_cache):
+    return [render_job(base_dir, job_name, context_overrides, insert_hash,
+                       use_cache)
+            for job_name in jobs_names]
@@ -1,15 +1,26 @@
+import collections
 import os
 import os.path as op
 import sys
+import threading
 
-import yaml
 import click
 
 from . import pipelines
 from . import jobs
+from . import render_cache
+from . import repository_index
+from . import templates
+from . import yaml_cache
+from . import utils
+from . import exceptions
 
 
 CONF_FNAME = '.jenskipper.conf'
+DATA_DIRNAME = '.jenskipper'
+
+#: Maximum size of the rendered jobs cache, in bytes
+RENDER_CACHE_MAX_SIZE = 200 * 1024 * 1024
 
 
 def search_base_dir(from_dir='.', up_to_dir='/'):
@@ -56,60 +67,177 @@ def _get_extra_jobs_defs_fname(base_dir):
     return op.join(base_dir, 'extra-jobs.yaml')
 
 
+def get_jobs_shards_dir(base_dir):
+    return op.join(base_dir, 'jobs.d')
+
+
 def parse_jobs_defs(fp, default_contexts):
-    jobs_defs = yaml.safe_load(fp)
+    return normalize_jobs_defs(yaml_cache.parse(fp), default_contexts)
+
+
+def normalize_jobs_defs(jobs_defs, default_contexts):
+    """
+    Merge the *default_contexts* in parsed jobs definitions *jobs_defs*.
+    """
     return {k: _normalize_job_def(v, default_contexts)
             for k, v in jobs_defs.items()}
 
 
 def _normalize_job_def(job_def, default_contexts):
-    job_def_context = job_def.get('context', {})
     default_context_name = job_def.get('default_context', 'default')
-    context = default_contexts.get(default_context_name, {}).copy()
-    context.update(job_def_context)
-    return {
-        'template': job_def['template'],
-        'default_context': default_context_name,
-        'context': context,
-    }
+    return JobDef(job_def['template'], default_context_name,
+                  job_def.get('context') or None,
+                  default_contexts.get(default_context_name))
+
+
+class JobDef(object):
+    """
+    The definition of a job, rendered from *template* with the default
+    context named *default_context* updated with the job's own context.
+
+    Jobs reference their default context instead of copying it, so all the
+    jobs using the same default context share it. Attributes can also be
+    accessed as items, e.g. ``job_def['template']``.
+
+    :attr template: the path to the job template
+    :attr default_context: the name of the job's default context
+    :attr own_context: the job's context, or None if it's empty
+    :attr context:
+        a read-only view of the job's full context, including its nested
+        values (see :class:`jenskipper.utils.LayeredMapping`)
+    """
+
+    __slots__ = ('template', 'default_context', 'own_context',
+                 '_default_context_values')
+
+    def __init__(self, template, default_context, own_context=None,
+                 default_context_values=None):
+        self.template = template
+        self.default_context = default_context
+        self.own_context = own_context
+        self._default_context_values = default_context_values
+
+    @property
+    def context(self):
+        layers = [c for c in (self.own_context, self._default_context_values)
+                  if c]
+        # The default context values are shared with other jobs, nested
+        # values are read-only too
+        return utils.LayeredMapping(collections.ChainMap(*layers))
+
+    def __getitem__(self, key):
+        if key not in ('template', 'default_context', 'context'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return '<JobDef template=%r default_context=%r>' % (
+            self.template, self.default_context
+        )
 
 
 def get_jobs_defs(base_dir):
     """
     Get the jobs definitons for the repository in *base_dir*.
 
-    Return a dict indexed by job name containing jobs properties (template,
-    context, etc...).
+    Return a dict of :class:`JobDef` objects indexed by job name.
     """
     default_contexts = get_default_contexts(base_dir)
-    jobs_fname = get_jobs_defs_fname(base_dir)
-    with open(jobs_fname) as fp:
-        jobs_defs = parse_jobs_defs(fp, default_contexts)
-    extra_jobs_fname = _get_extra_jobs_defs_fname(base_dir)
+    return _read_jobs_defs(base_dir, default_contexts)
+
+
+def _get_jobs_defs_fnames(base_dir):
+    return (_get_sharded_fnames(get_jobs_defs_fname(base_dir),
+                                get_jobs_shards_dir(base_dir)) +
+            [_get_extra_jobs_defs_fname(base_dir)])
+
+
+def _read_jobs_defs(base_dir, default_contexts):
+    fnames = _get_jobs_defs_fnames(base_dir)
+    extra_jobs_fname = fnames.pop()
+    cache_dir = _get_defs_cache_dir(base_dir)
+    jobs_defs = normalize_jobs_defs(_load_shards('job', fnames, cache_dir),
+                                    default_contexts)
     if op.exists(extra_jobs_fname):
-        with open(extra_jobs_fname) as fp:
-            extra_jobs_defs = parse_jobs_defs(fp, default_contexts)
+        extra_jobs_defs = normalize_jobs_defs(
+            yaml_cache.load(extra_jobs_fname, cache_dir), default_contexts
+        )
     else:
         extra_jobs_defs = {}
     jobs_defs.update(extra_jobs_defs)
     return jobs_defs
 
 
+def _get_defs_cache_dir(base_dir):
+    return get_cache_dir(base_dir, 'defs')
+
+
+def _get_sharded_fnames(main_fname, shards_dir):
+    """
+    Get the files a sharded definitions file is made of: *main_fname* and the
+    YAML files in *shards_dir*, in alphabetical order.
+
+    *main_fname* is optional if there are shards.
+    """
+    try:
+        shards_names = sorted(n for n in os.listdir(shards_dir)
+                              if n.endswith('.yaml') and
+                              not n.startswith('.'))
+    except OSError:
+        shards_names = []
+    fnames = [op.join(shards_dir, n) for n in shards_names]
+    if not fnames or op.exists(main_fname):
+        fnames.insert(0, main_fname)
+    return fnames
+
+
+def _load_shards(kind, fnames, cache_dir):
+    """
+    Load and merge the definitions of the *kind* objects (jobs or contexts)
+    in YAML files *fnames*.
+
+    Raise a :class:`jenskipper.exceptions.DuplicateDefinition` if an object
+    is defined in several files.
+    """
+    merged = {}
+    origins = {}
+    for fname, defs in zip(fnames, yaml_cache.load_many(fnames, cache_dir)):
+        for name, value in (defs or {}).items():
+            if name in merged:
+                locations = [(f, yaml_cache.get_keys_lines(f).get(name))
+                             for f in (origins[name], fname)]
+                raise exceptions.DuplicateDefinition(kind, name, locations)
+            merged[name] = value
+            origins[name] = fname
+    return merged
+
+
 def get_default_contexts_fname(base_dir):
     return op.join(base_dir, 'contexts.yaml')
 
 
+def get_contexts_shards_dir(base_dir):
+    return op.join(base_dir, 'contexts.d')
+
+
+def _get_default_contexts_fnames(base_dir):
+    return _get_sharded_fnames(get_default_contexts_fname(base_dir),
+                               get_contexts_shards_dir(base_dir))
+
+
 def parse_default_contexts(fp):
-    contexts = yaml.safe_load(fp)
+    return _normalize_default_contexts(yaml_cache.parse(fp))
+
+
+def _normalize_default_contexts(contexts):
     if contexts is None:
         contexts = {}
     return contexts
 
 
 def get_default_contexts(base_dir):
-    fname = get_default_contexts_fname(base_dir)
-    with open(fname) as fp:
-        return parse_default_contexts(fp)
+    fnames = _get_default_contexts_fnames(base_dir)
+    return _load_shards('context', fnames, _get_defs_cache_dir(base_dir))
 
 
 def get_pipelines_fname(base_dir):
@@ -126,12 +254,267 @@ def get_conf_fname(base_dir):
     return op.join(base_dir, CONF_FNAME)
 
 
+def get_cache_dir(base_dir, name):
+    """
+    Get the directory for cache *name* in the repository at *base_dir*,
+    creating it if needed.
+
+    Caches are stored in a ``.jenskipper`` directory that is ignored by git.
+
+    Return None if the directory could not be created.
+    """
+    data_dir = get_data_dir(base_dir)
+    if data_dir is None:
+        return None
+    cache_dir = op.join(data_dir, 'cache', name)
+    try:
+        if not op.isdir(cache_dir):
+            os.makedirs(cache_dir)
+    except (IOError, OSError):
+        return None
+    return cache_dir
+
+
+def get_data_dir(base_dir):
+    """
+    Get the ``.jenskipper`` directory of the repository at *base_dir*, where
+    caches and other data that is not versioned are stored, creating it if
+    needed.
+
+    Return None if the directory could not be created.
+    """
+    data_dir = op.join(base_dir, DATA_DIRNAME)
+    try:
+        if not op.isdir(data_dir):
+            os.makedirs(data_dir)
+        gitignore_fname = op.join(data_dir, '.gitignore')
+        if not op.exists(gitignore_fname):
+            with open(gitignore_fname, 'w') as fp:
+                fp.write('*\n')
+    except (IOError, OSError):
+        return None
+    return data_dir
+
+
+def get_index_fname(base_dir):
+    """
+    Get the path of the index of the repository at *base_dir* (see
+    :mod:`jenskipper.repository_index`), or None if its directory could not
+    be created.
+    """
+    data_dir = get_data_dir(base_dir)
+    if data_dir is None:
+        return None
+    return op.join(data_dir, 'index')
+
+
+def get_bytecode_cache_dir(base_dir):
+    """
+    Get the directory where compiled templates of the repository at
+    *base_dir* are cached, or None if it could not be created.
+    """
+    return get_cache_dir(base_dir, 'jinja')
+
+
+def get_render_cache(base_dir):
+    """
+    Get the :class:`jenskipper.render_cache.RenderCache` of the repository at
+    *base_dir*, or None if its directory could not be created.
+    """
+    cache_dir = get_cache_dir(base_dir, 'render')
+    if cache_dir is None:
+        return None
+    return render_cache.RenderCache(cache_dir, RENDER_CACHE_MAX_SIZE)
+
+
 def get_job_conf(base_dir, job_name, context_overrides={}):
-    jobs_defs = get_jobs_defs(base_dir)
-    pipelines = get_pipelines(base_dir)
-    job_def = jobs_defs[job_name]
-    pipe_info = pipelines.get(job_name)
-    templates_dir = get_templates_dir(base_dir)
-    return jobs.render_job(templates_dir, job_def['template'],
-                           job_def['context'], pipe_info,
-                           context_overrides=context_overrides)
+    """
+    Render job *job_name* of the repository at *base_dir*, see
+    :meth:`Repository.render_job`.
+    """
+    return get_repository(base_dir).render_job(
+        job_name, context_overrides=context_overrides
+    )
+
+
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(base_dir):
+    """
+    Get the :class:`Repository` at *base_dir*.
+
+    Repositories are shared for the life of the process.
+    """
+    with _repositories_lock:
+        repos = _repositories.get(base_dir)
+        if repos is None:
+            repos = Repository(base_dir)
+            _repositories[base_dir] = repos
+        return repos
+
+
+class Repository(object):
+    """
+    The jenskipper repository at *base_dir*.
+
+    The jobs definitions, default contexts and pipelines are parsed the first
+    time they are accessed, and parsed again only when their files change.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.templates_dir = get_templates_dir(base_dir)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self._bytecode_cache_dir = None
+        self._render_cache = None
+        self._index = None
+
+    @property
+    def default_contexts(self):
+        """
+        The default contexts, indexed by name.
+        """
+        return self._load('default_contexts',
+                          _get_default_contexts_fnames(self.base_dir),
+                          lambda: get_default_contexts(self.base_dir))
+
+    @property
+    def jobs_defs(self):
+        """
+        The jobs definitions, see :func:`get_jobs_defs`.
+        """
+        default_contexts = self.default_contexts
+        return self._load('jobs_defs',
+                          _get_default_contexts_fnames(self.base_dir) +
+                          _get_jobs_defs_fnames(self.base_dir),
+                          lambda: _read_jobs_defs(self.base_dir,
+                                                  default_contexts))
+
+    @property
+    def pipelines(self):
+        """
+        The pipelines, see :func:`jenskipper.pipelines.parse_pipelines`.
+        """
+        return self._load('pipelines',
+                          [get_pipelines_fname(self.base_dir)],
+                          lambda: get_pipelines(self.base_dir))
+
+    @property
+    def bytecode_cache_dir(self):
+        """
+        The directory where compiled templates are cached, see
+        :func:`get_bytecode_cache_dir`.
+        """
+        if self._bytecode_cache_dir is None:
+            self._bytecode_cache_dir = get_bytecode_cache_dir(self.base_dir)
+        return self._bytecode_cache_dir
+
+    @property
+    def render_cache(self):
+        """
+        The cache of rendered jobs, see :func:`get_render_cache`.
+        """
+        if self._render_cache is None:
+            self._render_cache = get_render_cache(self.base_dir)
+        return self._render_cache
+
+    @property
+    def index(self):
+        """
+        The :class:`jenskipper.repository_index.RepositoryIndex` of the
+        repository.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = repository_index.RepositoryIndex(
+                    self, get_index_fname(self.base_dir),
+                    self._get_defs_fnames
+                )
+            return self._index
+
+    def get_jobs_names(self):
+        """
+        Get the names of the jobs of the repository, from its index.
+        """
+        jobs_names = self.index.get_jobs_names()
+        self.index.save()
+        return jobs_names
+
+    def render_job(self, job_name, context_overrides={}, insert_hash=False,
+                   use_cache=True):
+        """
+        Render the XML configuration of job *job_name*.
+
+        Return a ``(rendered_job, template_files)`` tuple, see
+        :func:`jenskipper.jobs.render_job`.
+        """
+        entry = self.get_rendered_job(job_name, context_overrides,
+                                      insert_hash, use_cache)
+        return entry.rendered, set(entry.files)
+
+    def find_job_files(self, job_name):
+        """
+        Find the template files used by job *job_name* without rendering it,
+        from the index. Call ``self.index.save()`` when done.
+
+        Return a ``(files, complete)`` tuple, see
+        :func:`jenskipper.templates.find_dependencies`.
+        """
+        return self.index.get_job_files(job_name)
+
+    def get_rendered_job(self, job_name, context_overrides={},
+                         insert_hash=False, use_cache=True):
+        """
+        Render job *job_name*, or get it from the render cache if *use_cache*
+        is true and its templates and definition did not change.
+
+        Return a :class:`jenskipper.render_cache.Entry`.
+        """
+        job_def = self.jobs_defs[job_name]
+        pipe_info = self.pipelines.get(job_name)
+        cache = self.render_cache if use_cache else None
+        if cache is not None:
+            inputs_key = render_cache.get_inputs_key(
+                job_def.template, job_def.context, pipe_info,
+                insert_hash, context_overrides, self.base_dir
+            )
+        else:
+            inputs_key = None
+        if inputs_key is not None:
+            entry = cache.get(inputs_key)
+            if entry is not None:
+                return entry
+        rendered, files = templates.render(
+            self.templates_dir, job_def.template, job_def.context,
+            context_overrides=context_overrides,
+            bytecode_cache_dir=self.bytecode_cache_dir
+        )
+        rendered, _ = jobs.finalize_job(rendered, pipe_info,
+                                        insert_hash=insert_hash)
+        entry = render_cache.Entry(rendered, sorted(files))
+        if inputs_key is not None:
+            cache.set(inputs_key, entry.rendered, entry.files)
+        return entry
+
+    def _get_defs_fnames(self):
+        return (_get_default_contexts_fnames(self.base_dir) +
+                _get_jobs_defs_fnames(self.base_dir) +
+                [get_pipelines_fname(self.base_dir)])
+
+    def _load(self, key, fnames, load_func):
+        """
+        Return the result of *load_func*, cached under *key* until one of
+        *fnames* changes.
+        """
+        stamps = [(f, utils.get_file_stamp(f)) for f in fnames]
+        with self._lock:
+            loaded = self._loaded.get(key)
+            if loaded is not None and loaded[0] == stamps:
+                return loaded[1]
+        value = load_func()
+        with self._lock:
+            self._loaded[key] = (stamps, value)
+        return value
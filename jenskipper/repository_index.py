@@ -0,0 +1,194 @@
+"""
+A persistent index of the jobs of a repository.
+
+The index maps each job to its template, a digest of its context, its
+pipeline informations and the template files it uses, with the hashes of
+their contents. It is stored in the ``.jenskipper`` directory and updated
+incrementally:
+
+* jobs definitions are parsed only when their files change;
+* the template files used by a job are searched again only when the contents
+  of one of them changes.
+
+This way simple commands like ``jk list-jobs`` don't have to parse the jobs
+definitions, and ``jk dirty`` and ``jk sweep`` don't have to parse templates.
+"""
+import os
+import threading
+
+from six.moves import cPickle as pickle
+
+from . import render_cache
+from . import templates
+from . import utils
+
+
+#: Version of the index format
+INDEX_VERSION = 3
+
+
+class RepositoryIndex(object):
+    """
+    The index of :class:`jenskipper.repository.Repository` *repos*, stored
+    in file *fname*, or only in memory if *fname* is None.
+
+    *defs_fnames_func* is a function returning the list of files the jobs
+    definitions and pipelines are read from.
+
+    Changes are written to *fname* by :meth:`save`.
+    """
+
+    def __init__(self, repos, fname, defs_fnames_func):
+        self.repos = repos
+        self.fname = fname
+        self._defs_fnames_func = defs_fnames_func
+        self._data = None
+        self._modified = False
+        self._lock = threading.RLock()
+
+    def get_jobs_names(self):
+        """
+        Get the list of the jobs names, in definition order.
+        """
+        with self._lock:
+            return list(self._get_data()['jobs'])
+
+    def get_job(self, job_name):
+        """
+        Get the indexed informations of job *job_name*.
+
+        Return a dict with the following keys:
+
+        * ``template``: the job template;
+        * ``context_digest``: a digest of the job context;
+        * ``pipe_info``: the job ``(parents, link_type)`` pipeline
+          informations, or None.
+        """
+        with self._lock:
+            job = self._get_data()['jobs'][job_name]
+            return {k: job[k] for k in ('template', 'context_digest',
+                                        'pipe_info')}
+
+    def get_job_files(self, job_name):
+        """
+        Get the template files used by job *job_name*.
+
+        Return a ``(files, complete)`` tuple, see
+        :func:`jenskipper.templates.find_dependencies`.
+        """
+        with self._lock:
+            data = self._get_data()
+            job = data['jobs'][job_name]
+            if job['files'] is None or not self._check_files(job['files']):
+                files, complete = templates.find_dependencies(
+                    self.repos.templates_dir, job['template'],
+                    self.repos.bytecode_cache_dir
+                )
+                job['files'] = {f: _get_file_info(f) for f in files}
+                job['complete'] = complete
+                self._modified = True
+            return set(job['files']), job['complete']
+
+    def save(self):
+        """
+        Write the index to its file, if it was modified.
+        """
+        with self._lock:
+            if not self._modified or self.fname is None:
+                return
+            data = self._data
+            tmp_fname = '%s.%s.tmp' % (self.fname, os.getpid())
+            try:
+                with open(tmp_fname, 'wb') as fp:
+                    pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+                os.rename(tmp_fname, self.fname)
+            except (IOError, OSError):
+                # The index will be updated again next time
+                try:
+                    os.unlink(tmp_fname)
+                except OSError:
+                    pass
+                return
+            self._modified = False
+
+    def _get_data(self):
+        if self._data is None:
+            self._data = self._read()
+        defs_stamps = [(f, utils.get_file_stamp(f))
+                       for f in self._defs_fnames_func()]
+        if self._data['defs_stamps'] != defs_stamps:
+            self._update_jobs(defs_stamps)
+        return self._data
+
+    def _read(self):
+        data = None
+        if self.fname is not None:
+            try:
+                with open(self.fname, 'rb') as fp:
+                    data = pickle.load(fp)
+            except Exception:
+                # Missing, truncated or incompatible index
+                data = None
+        # Files are indexed by absolute paths, the index of a copied
+        # repository can't be reused
+        if not isinstance(data, dict) or \
+                data.get('version') != INDEX_VERSION or \
+                data.get('base_dir') != self.repos.base_dir:
+            data = {
+                'version': INDEX_VERSION,
+                'base_dir': self.repos.base_dir,
+                'defs_stamps': None,
+                'jobs': {},
+            }
+        return data
+
+    def _update_jobs(self, defs_stamps):
+        old_jobs = self._data['jobs']
+        pipelines = self.repos.pipelines
+        jobs = {}
+        for job_name, job_def in self.repos.jobs_defs.items():
+            job = {
+                'template': job_def.template,
+                'context_digest': render_cache.get_digest(job_def.context),
+                'pipe_info': pipelines.get(job_name),
+                'files': None,
+                'complete': False,
+            }
+            old_job = old_jobs.get(job_name)
+            if old_job is not None and old_job['template'] == job['template']:
+                job['files'] = old_job['files']
+                job['complete'] = old_job['complete']
+            jobs[job_name] = job
+        self._data['jobs'] = jobs
+        self._data['defs_stamps'] = defs_stamps
+        self._modified = True
+
+    def _check_files(self, files):
+        """
+        Check the contents of *files*, a dict of ``(stamp, hash)`` tuples
+        indexed by file name, did not change.
+
+        The stamps of the files that were only touched are updated. Stamps
+        are stored per job: a file changed and checked for a job must still
+        be checked for the other jobs using it.
+        """
+        for fname, (stamp, file_hash) in files.items():
+            new_stamp = utils.get_file_stamp(fname)
+            if new_stamp is not None and new_stamp == stamp:
+                continue
+            if render_cache.get_file_hash(fname) != file_hash:
+                return False
+            if new_stamp != stamp:
+                files[fname] = (new_stamp, file_hash)
+                self._modified = True
+        return True
+
+
+def _get_file_info(fname):
+    """
+    Get the ``(stamp, hash)`` tuple of file *fname*, with None values if it
+    does not exist.
+    """
+    # Get the stamp first, the file may change while it is hashed
+    stamp = utils.get_file_stamp(fname)
+    return stamp, render_cache.get_file_hash(fname)
@@ -0,0 +1,81 @@
+"""
+A persistent cache of Jenkins sessions bootstrap state.
+
+Authenticating with a Jenkins server takes several round trips (checking
+credentials, retrieving crumbs). The resulting state is stored per server and
+user in the user's cache directory, so subsequent commands can skip these
+steps until the entry expires.
+"""
+import json
+import os
+import os.path as op
+import time
+
+from . import conf
+
+
+def get_fname():
+    return op.join(conf.get_user_cache_dir(), 'sessions.json')
+
+
+def load(jenkins_url, username, ttl):
+    """
+    Get the cached state for *username* on *jenkins_url*.
+
+    Return None if there is no entry or if it is older than *ttl* seconds.
+    """
+    entry = _read().get(_get_key(jenkins_url, username))
+    if entry is None or time.time() - entry['timestamp'] > ttl:
+        return None
+    return entry['state']
+
+
+def save(jenkins_url, username, state):
+    """
+    Save *state* for *username* on *jenkins_url*.
+    """
+    entries = _read()
+    entries[_get_key(jenkins_url, username)] = {
+        'timestamp': time.time(),
+        'state': state,
+    }
+    _write(entries)
+
+
+def invalidate(jenkins_url, username):
+    """
+    Remove the entry for *username* on *jenkins_url*.
+    """
+    entries = _read()
+    if entries.pop(_get_key(jenkins_url, username), None) is not None:
+        _write(entries)
+
+
+def _get_key(jenkins_url, username):
+    return '%s %s' % (username or '', jenkins_url)
+
+
+def _read():
+    try:
+        with open(get_fname()) as fp:
+            return json.load(fp)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _write(entries):
+    # The file contains session cookies, so make sure only the user can read
+    # it, and replace it atomically in case several commands are running
+    fname = get_fname()
+    dirname = op.dirname(fname)
+    try:
+        if not op.exists(dirname):
+            os.makedirs(dirname)
+        tmp_fname = '%s.%s.tmp' % (fname, os.getpid())
+        fd = os.open(tmp_fname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(entries, fp)
+        os.rename(tmp_fname, fname)
+    except (IOError, OSError):
+        # The cache is only an optimization
+        pass
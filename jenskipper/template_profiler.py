@@ -0,0 +1,182 @@
+"""
+Profile templates rendering.
+
+While :func:`profile` is active, the time spent rendering each template, each
+included or imported template, and each macro is recorded. Templates are
+instrumented when they are loaded by a :class:`jenskipper.templates.
+TrackingEnvironment`.
+"""
+import collections
+import contextlib
+import functools
+import sys
+import timeit
+
+import jinja2.environment
+import jinja2.runtime
+
+
+#: Number of lines in the report
+REPORT_LIMIT = 30
+
+
+_profiler = None
+
+
+@contextlib.contextmanager
+def profile():
+    """
+    A context manager profiling templates rendered while it is active.
+
+    Return a :class:`Profiler`.
+    """
+    global _profiler
+    orig_invoke = jinja2.runtime.Macro._invoke
+    profiler = Profiler()
+
+    @functools.wraps(orig_invoke)
+    def invoke(macro, *args, **kwargs):
+        name = '%s:%s' % (profiler.get_template_name(
+            macro._func.__code__.co_filename
+        ), macro.name)
+        profiler.enter()
+        try:
+            return orig_invoke(macro, *args, **kwargs)
+        finally:
+            profiler.exit('macro', name)
+
+    jinja2.runtime.Macro._invoke = invoke
+    _profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _profiler = None
+        jinja2.runtime.Macro._invoke = orig_invoke
+
+
+def is_enabled():
+    """
+    Return True if templates are being profiled.
+    """
+    return _profiler is not None
+
+
+def instrument(template):
+    """
+    Instrument :class:`jinja2.Template` *template* so its renders are
+    profiled while :func:`profile` is active.
+    """
+    if _profiler is not None and template.filename is not None:
+        _profiler.template_names[template.filename] = template.name
+    render_func = template.root_render_func
+    if getattr(render_func, 'profiled', False):
+        return
+
+    @functools.wraps(render_func)
+    def wrapper(context):
+        profiler = _profiler
+        if profiler is None:
+            return render_func(context)
+        kind = profiler.get_template_kind(sys._getframe(1))
+        return profiler.profile_generator(kind, template.name,
+                                          render_func(context))
+
+    wrapper.profiled = True
+    template.root_render_func = wrapper
+
+
+class Profiler(object):
+    """
+    Record the time spent in templates and macros.
+
+    Times are recorded by (kind, name), where kind is "template" for the
+    templates rendered directly, "include" for the templates included or
+    extended by other templates, "import" for the templates imported by other
+    templates, and "macro" for macros.
+    """
+
+    def __init__(self):
+        #: Statistics indexed by ``(kind, name)``, as ``[calls, total_time,
+        #: own_time]`` lists
+        self.stats = collections.defaultdict(lambda: [0, 0.0, 0.0])
+        #: Templates names indexed by file name
+        self.template_names = {}
+        self._stack = []
+
+    def get_template_name(self, fname):
+        return self.template_names.get(fname, fname)
+
+    def get_template_kind(self, caller_frame):
+        if not self._stack:
+            return 'template'
+        caller = caller_frame.f_locals.get('self')
+        if isinstance(caller, jinja2.environment.TemplateModule):
+            return 'import'
+        return 'include'
+
+    def enter(self):
+        """
+        Start timing a call, to be ended with :meth:`exit`.
+        """
+        self._stack.append([timeit.default_timer(), 0.0])
+
+    def exit(self, kind, name, new_call=True):
+        """
+        End timing the last call started with :meth:`enter`, and record it
+        under *kind* and *name*.
+
+        Set *new_call* to false to add the time to a call already counted.
+        """
+        start_time, children_time = self._stack.pop()
+        elapsed = timeit.default_timer() - start_time
+        stats = self.stats[kind, name]
+        if new_call:
+            stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - children_time
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def profile_generator(self, kind, name, generator):
+        """
+        Iterate over template render *generator*, recording the time spent
+        producing its items under *kind* and *name*.
+        """
+        self.stats[kind, name][0] += 1
+        while True:
+            self.enter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                self.exit(kind, name, new_call=False)
+            yield item
+
+    def format_report(self, limit=REPORT_LIMIT):
+        """
+        Return the report of the *limit* most costly templates and macros, as
+        a list of lines.
+        """
+        lines = ['Templates profile:', '']
+        if not self.stats:
+            lines.append('No templates were rendered.')
+            return lines
+        lines.append('%-8s %7s %9s %9s  %s' %
+                     ('kind', 'calls', 'total', 'own', 'name'))
+        stats = sorted(self.stats.items(), key=lambda i: i[1][2],
+                       reverse=True)
+        for (kind, name), (calls, total_time, own_time) in stats[:limit]:
+            lines.append('%-8s %7d %9s %9s  %s' % (
+                kind, calls, _format_duration(total_time),
+                _format_duration(own_time), name
+            ))
+        if len(stats) > limit:
+            lines.append('(%d more)' % (len(stats) - limit))
+        return lines
+
+
+def _format_duration(seconds):
+    if seconds < 1:
+        return '%.1fms' % (seconds * 1000)
+    return '%.2fs' % seconds
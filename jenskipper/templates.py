@@ -1,13 +1,21 @@
+import collections.abc
+import contextlib
+import fnmatch
+import os
+import os.path as op
+import threading
 import traceback
 
 import jinja2
 import jinja2.nodes
 import jinja2.ext
+import jinja2.meta
 import click
 import six
 
 from . import utils
 from . import exceptions
+from . import template_profiler
 
 
 class _RaiseExtension(jinja2.ext.Extension):
@@ -32,7 +40,18 @@ class _RaiseExtension(jinja2.ext.Extension):
         raise exceptions.TemplateUserError(msg)
 
 
-def render(templates_dir, template, context, context_overrides={}):
+#: Maximum size of the templates bytecode caches, in bytes
+BYTECODE_CACHE_MAX_SIZE = 50 * 1024 * 1024
+
+_environments = {}
+_environments_lock = threading.Lock()
+
+_references = {}
+_references_lock = threading.Lock()
+
+
+def render(templates_dir, template, context, context_overrides={},
+           bytecode_cache_dir=None):
     """
     Render a job XML from job definition.
 
@@ -43,20 +62,131 @@ def render(templates_dir, template, context, context_overrides={}):
     :param template: the path to the job template, relative to *templates_dir*
     :param context: a dict containing the variables passed to the tamplate
     :param context_overrides:
-        a mapping that will be deep merged in the final context
+        a mapping that will be deep merged in the final context, without
+        copying *context*; templates get a read-only view of both (see
+        :class:`jenskipper.utils.LayeredMapping`), so they can't modify
+        contexts shared by other jobs
+    :param bytecode_cache_dir:
+        the directory where compiled templates are cached between processes,
+        see :func:`get_environment`
     :return:
         a ``(rendered_template, template_files)`` tuple, where
         ``template_files`` is the set of files that were loaded to render the
-        template
+        template, including the files of templates that were looked up but
+        not found (e.g. by ``{% include ... ignore missing %}``)
+    """
+    env = get_environment(templates_dir, bytecode_cache_dir)
+    with env.track_loaded_files() as loaded_files:
+        template = env.get_template(template)
+        context = utils.LayeredMapping(context, context_overrides)
+        return template.render(context), loaded_files
+
+
+def get_environment(templates_dir, bytecode_cache_dir=None):
+    """
+    Get the :class:`jinja2.Environment` for *templates_dir*.
+
+    Environments are shared for the life of the process, so templates are
+    compiled only once. They are reloaded automatically when modified.
+
+    If *bytecode_cache_dir* is not None, compiled templates are also cached
+    in this directory, so other processes don't have to compile them again.
     """
-    loader = TrackingFileSystemLoader(templates_dir)
-    env = jinja2.Environment(loader=loader,
-                             autoescape=True,
-                             undefined=jinja2.StrictUndefined,
-                             extensions=[_RaiseExtension])
-    template = env.get_template(template)
-    context = utils.deep_merge(context, context_overrides)
-    return template.render(**context), loader.loaded_files
+    key = (templates_dir, bytecode_cache_dir)
+    with _environments_lock:
+        env = _environments.get(key)
+        if env is None:
+            if bytecode_cache_dir is not None:
+                bytecode_cache = SizeCappedBytecodeCache(
+                    bytecode_cache_dir, BYTECODE_CACHE_MAX_SIZE
+                )
+            else:
+                bytecode_cache = None
+            env = TrackingEnvironment(
+                loader=jinja2.FileSystemLoader(templates_dir),
+                autoescape=True,
+                undefined=jinja2.StrictUndefined,
+                extensions=[_RaiseExtension],
+                bytecode_cache=bytecode_cache
+            )
+            # Contexts may contain LayeredMapping views
+            env.policies['json.dumps_kwargs'] = dict(
+                env.policies['json.dumps_kwargs'], default=_json_default
+            )
+            _environments[key] = env
+        return env
+
+
+def _json_default(obj):
+    if isinstance(obj, collections.abc.Mapping):
+        return dict(obj)
+    raise TypeError('Object of type %s is not JSON serializable' %
+                    obj.__class__.__name__)
+
+
+def find_dependencies(templates_dir, template, bytecode_cache_dir=None):
+    """
+    Find the files needed to render *template* in *templates_dir*, without
+    rendering it.
+
+    The templates referenced by ``extends``, ``include``, ``import`` and
+    ``from`` tags are followed recursively. Templates referenced by a
+    dynamic name (e.g. ``{% include name %}``) can't be found this way.
+    Missing templates are included as the file they would be loaded from.
+
+    Return a ``(files, complete)`` tuple, where *files* is the set of files
+    found and *complete* is False if some templates are referenced
+    dynamically, or have syntax errors.
+    """
+    env = get_environment(templates_dir, bytecode_cache_dir)
+    files = set()
+    complete = True
+    seen = set()
+    names = [template]
+    while names:
+        name = names.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            fname, references = _get_references(env, templates_dir, name)
+        except jinja2.TemplateNotFound:
+            files.add(op.join(templates_dir, name))
+            continue
+        files.add(fname)
+        for reference in references:
+            if reference is None:
+                complete = False
+            else:
+                names.append(reference)
+    return files, complete
+
+
+def _get_references(env, templates_dir, name):
+    """
+    Get the names of the templates referenced by template *name*, with None
+    for dynamic references, or if the template has syntax errors.
+
+    References are memoized until the template file changes.
+    """
+    source, fname, _ = env.loader.get_source(env, name)
+    stamp = utils.get_file_stamp(fname)
+    key = (templates_dir, name)
+    with _references_lock:
+        memoized = _references.get(key)
+    if memoized is not None and memoized[0] == (fname, stamp):
+        return fname, memoized[1]
+    try:
+        ast = env.parse(source, name, fname)
+    except jinja2.TemplateSyntaxError:
+        # The references are unknown, the template has to be rendered to
+        # report the error
+        references = [None]
+    else:
+        references = list(jinja2.meta.find_referenced_templates(ast))
+    with _references_lock:
+        _references[key] = ((fname, stamp), references)
+    return fname, references
 
 
 def extract_jinja_error(exc_info, fnames_prefix=None):
@@ -104,20 +234,115 @@ def print_jinja_error(stack_lines, error, lines_prefix=''):
     click.secho(lines_prefix + error, fg='red', bold=True)
 
 
-class TrackingFileSystemLoader(jinja2.FileSystemLoader):
+class TrackingEnvironment(jinja2.Environment):
     """
-    A :class:`jinja2.FileSystemLoader` subclass that keeps track of the files
-    it loads.
+    A :class:`jinja2.Environment` subclass that can keep track of the files
+    loaded in the current thread, including templates served from its cache,
+    and of the files of the templates that were not found.
 
-    :attr loaded_files: the set of loaded files
+    Use :meth:`track_loaded_files` to retrieve them.
     """
 
     def __init__(self, *args, **kwargs):
-        super(TrackingFileSystemLoader, self).__init__(*args, **kwargs)
-        self.loaded_files = set()
-
-    def get_source(self, *args, **kwargs):
-        contents, filename, uptodate = \
-            super(TrackingFileSystemLoader, self).get_source(*args, **kwargs)
-        self.loaded_files.add(filename)
-        return contents, filename, uptodate
+        super(TrackingEnvironment, self).__init__(*args, **kwargs)
+        self._tracking = threading.local()
+
+    @contextlib.contextmanager
+    def track_loaded_files(self):
+        """
+        A context manager returning the set of files loaded by the current
+        thread while it is active.
+        """
+        prev_loaded_files = getattr(self._tracking, 'loaded_files', None)
+        loaded_files = set()
+        self._tracking.loaded_files = loaded_files
+        try:
+            yield loaded_files
+        finally:
+            self._tracking.loaded_files = prev_loaded_files
+
+    def _load_template(self, name, *args, **kwargs):
+        loaded_files = getattr(self._tracking, 'loaded_files', None)
+        try:
+            template = super(TrackingEnvironment, self)._load_template(
+                name, *args, **kwargs
+            )
+        except jinja2.TemplateNotFound:
+            # Creating the template would change the output of
+            # "ignore missing" includes and select_template()
+            if loaded_files is not None:
+                loaded_files.update(self._get_candidate_files(name))
+            raise
+        if loaded_files is not None and template.filename is not None:
+            loaded_files.add(template.filename)
+        if template_profiler.is_enabled():
+            template_profiler.instrument(template)
+        return template
+
+    def _get_candidate_files(self, name):
+        """
+        Get the files template *name* would be loaded from.
+        """
+        try:
+            pieces = jinja2.loaders.split_template_path(name)
+        except jinja2.TemplateNotFound:
+            return []
+        return [op.join(searchpath, *pieces)
+                for searchpath in self.loader.searchpath]
+
+
+class SizeCappedBytecodeCache(jinja2.FileSystemBytecodeCache):
+    """
+    A :class:`jinja2.FileSystemBytecodeCache` storing compiled templates in
+    *directory*, evicting the least recently written ones when the size of
+    the cache goes over *max_size* bytes.
+
+    Entries are keyed on the template name and path, and invalidated when the
+    template source changes. Errors reading and writing the cache are ignored,
+    the templates are compiled again instead.
+    """
+
+    def __init__(self, directory, max_size):
+        super(SizeCappedBytecodeCache, self).__init__(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    def load_bytecode(self, bucket):
+        try:
+            super(SizeCappedBytecodeCache, self).load_bytecode(bucket)
+        except (IOError, OSError, EOFError, ValueError):
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        try:
+            super(SizeCappedBytecodeCache, self).dump_bytecode(bucket)
+        except (IOError, OSError):
+            return
+        with self._lock:
+            entries = self._list_entries()
+            size = sum(s for _, _, s in entries)
+            if size > self.max_size:
+                self._evict(entries, size)
+
+    def _evict(self, entries, size):
+        for _, fname, entry_size in sorted(entries):
+            if size <= self.max_size * 0.8:
+                break
+            try:
+                os.unlink(fname)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def _list_entries(self):
+        entries = []
+        for fname in os.listdir(self.directory):
+            if not fnmatch.fnmatch(fname, self.pattern % '*'):
+                continue
+            path = op.join(self.directory, fname)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
@@ -124,6 +124,22 @@ def deep_merge(dct_a, dct_b, inplace=False):
     return ret
 
 
+def get_file_stamp(fname):
+    """
+    Get a ``(modification_time, size)`` stamp of file *fname*, or None if it
+    does not exist.
+
+    The stamp changes when the file is modified, but the file can change
+    without changing its stamp, e.g. if it is modified twice within the
+    resolution of the file system timestamps.
+    """
+    try:
+        stat = os.stat(fname)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def flatten_dict(dct):
     """
     Flatten keys of (possibly nested) *dct*.
@@ -135,6 +151,74 @@ def flatten_dict(dct):
     return dict(items)
 
 
+class LayeredMapping(collections.abc.Mapping):
+    """
+    A read-only view of the "deep merge" of the *layers* mappings, see
+    :func:`deep_merge`.
+
+    Values of the last layers take precedence. Nested mappings are returned
+    as other :class:`LayeredMapping` views, merged lazily when found in
+    several layers, so they are not copied. Nested lists are returned as
+    tuples, so the layers can't be modified through the view.
+    """
+
+    __slots__ = ('_layers',)
+
+    def __init__(self, *layers):
+        self._layers = layers
+
+    def __getitem__(self, key):
+        mappings = []
+        for layer in reversed(self._layers):
+            if key not in layer:
+                continue
+            value = layer[key]
+            if not isinstance(value, collections.abc.Mapping):
+                if mappings:
+                    # Hidden by the mappings of the upper layers
+                    break
+                return _freeze(value)
+            mappings.append(value)
+        if not mappings:
+            raise KeyError(key)
+        if len(mappings) == 1:
+            return _freeze(mappings[0])
+        return LayeredMapping(*reversed(mappings))
+
+    def __contains__(self, key):
+        return any(key in layer for layer in self._layers)
+
+    def __iter__(self):
+        seen = set()
+        for layer in self._layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        # Rendered like a dict in templates
+        return repr(dict(self))
+
+
+def _freeze(value):
+    """
+    Get a read-only version of *value*, see :class:`LayeredMapping`.
+    """
+    if isinstance(value, LayeredMapping):
+        return value
+    if isinstance(value, collections.abc.Mapping):
+        return LayeredMapping(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
 @contextlib.contextmanager
 def add_lxml_syntax_error_context(full_xml, context):
     """
@@ -0,0 +1,151 @@
+"""
+A cache of parsed YAML files.
+
+Parsing big YAML files is slow, even with the C loader. Parsed documents are
+pickled in a cache directory, keyed on the path of the source file. An entry
+is used without reading the source file if its modification time and size
+did not change, or after checking the source file contents hash otherwise
+(e.g. after a ``git checkout`` touched the file).
+"""
+from concurrent import futures
+import hashlib
+import multiprocessing
+import os
+import os.path as op
+
+import yaml
+from six.moves import cPickle as pickle
+
+from . import utils
+
+try:
+    SafeLoader = yaml.CSafeLoader
+except AttributeError:
+    SafeLoader = yaml.SafeLoader
+
+
+#: Version of the cache entries format
+CACHE_VERSION = 1
+
+
+def parse(stream):
+    """
+    Parse YAML document *stream* (a string or a file object) with the fastest
+    safe loader available.
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load(fname, cache_dir=None):
+    """
+    Parse YAML file *fname*, using the cache in *cache_dir* if it's not None.
+    """
+    if cache_dir is None:
+        with open(fname, 'rb') as fp:
+            return parse(fp)
+    entry_fname, stamp, entry = _lookup(fname, cache_dir)
+    if entry is not None and entry['stamp'] == stamp:
+        return entry['data']
+    return _refresh(fname, entry_fname, stamp, entry)
+
+
+def load_many(fnames, cache_dir=None, workers=None):
+    """
+    Parse YAML files *fnames* like :func:`load`.
+
+    The files that are not in the cache are parsed in parallel, in *workers*
+    processes (the number of CPUs by default).
+
+    Return the list of parsed documents, in the order of *fnames*.
+    """
+    docs = {}
+    stale_fnames = []
+    for fname in fnames:
+        if cache_dir is not None:
+            _, stamp, entry = _lookup(fname, cache_dir)
+            if entry is not None and entry['stamp'] == stamp:
+                docs[fname] = entry['data']
+                continue
+        stale_fnames.append(fname)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(stale_fnames))
+    if workers > 1:
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = [(fname, executor.submit(load, fname, cache_dir))
+                    for fname in stale_fnames]
+            for fname, job in jobs:
+                try:
+                    docs[fname] = job.result()
+                except Exception:
+                    # Parse errors are raised in the current process below,
+                    # where they keep all their attributes
+                    pass
+    for fname in stale_fnames:
+        if fname not in docs:
+            docs[fname] = load(fname, cache_dir)
+    return [docs[fname] for fname in fnames]
+
+
+def get_keys_lines(fname):
+    """
+    Get the line numbers (starting at 1) of the top-level keys of the YAML
+    mapping in file *fname*.
+
+    Return a dict indexed by key.
+    """
+    with open(fname, 'rb') as fp:
+        node = yaml.compose(fp, Loader=SafeLoader)
+    if not isinstance(node, yaml.MappingNode):
+        return {}
+    return {k.value: k.start_mark.line + 1 for k, _ in node.value}
+
+
+def _lookup(fname, cache_dir):
+    stamp = utils.get_file_stamp(fname)
+    entry_fname = op.join(cache_dir, '%s.pickle' % hashlib.sha1(
+        op.abspath(fname).encode('utf8')
+    ).hexdigest())
+    return entry_fname, stamp, _read_entry(entry_fname)
+
+
+def _refresh(fname, entry_fname, stamp, entry):
+    with open(fname, 'rb') as fp:
+        content = fp.read()
+    content_hash = hashlib.sha1(content).hexdigest()
+    if entry is not None and entry['hash'] == content_hash:
+        data = entry['data']
+    else:
+        data = parse(content)
+    _write_entry(entry_fname, {
+        'version': CACHE_VERSION,
+        'stamp': stamp,
+        'hash': content_hash,
+        'data': data,
+    })
+    return data
+
+
+def _read_entry(fname):
+    try:
+        with open(fname, 'rb') as fp:
+            entry = pickle.load(fp)
+    except Exception:
+        # Missing, truncated or incompatible entry
+        return None
+    if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _write_entry(fname, entry):
+    tmp_fname = '%s.%s.tmp' % (fname, os.getpid())
+    try:
+        with open(tmp_fname, 'wb') as fp:
+            pickle.dump(entry, fp, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_fname, fname)
+    except (IOError, OSError, pickle.PicklingError):
+        try:
+            os.unlink(tmp_fname)
+        except OSError:
+            pass
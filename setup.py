@@ -14,7 +14,10 @@ setup(
     version=__version__,
     description="",
     long_description=README + '\n\n' + NEWS,
-    classifiers=[],
+    classifiers=[
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+    ],
     keywords='',
     author='Luper Rouch',
     author_email='luper.rouch@gmail.com',
@@ -23,6 +26,7 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     zip_safe=False,
+    python_requires='>=3.7',
     install_requires=[
         'click>=7.0',
         'requests[security]',
@@ -38,6 +42,10 @@ setup(
             'lxml',
             'sphinx',
             'requests-mock',
+            'aiohttp',
+        ],
+        'async': [
+            'aiohttp',
         ],
     },
     entry_points={
@@ -17,3 +17,11 @@ def test_check_template_errors():
 def test_check_errors_combine():
     assert check.check(['syntax_error', 'missing_template'],
                        standalone_mode=False) == 3
+
+
+def test_check_profile_templates(capsys):
+    assert check.check(['default_job', '--profile-templates'],
+                       standalone_mode=False) == 0
+    err = capsys.readouterr().err
+    assert 'Templates profile:' in err
+    assert 'default_job.txt' in err
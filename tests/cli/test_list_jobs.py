@@ -1,3 +1,6 @@
+import os
+import shutil
+
 from click.testing import CliRunner
 
 from jenskipper.cli import list_jobs
@@ -11,3 +14,17 @@ def test_list_jobs(requests_mock):
                                                'missing_template',
                                                'syntax_error',
                                                'undefined_var'}
+
+
+def test_list_jobs_duplicate_definition(tmp_path):
+    base_dir = tmp_path.joinpath('repos')
+    shutil.copytree(os.environ['JK_DIR'], str(base_dir))
+    base_dir.joinpath('jobs.d').mkdir()
+    base_dir.joinpath('jobs.d', 'shard.yaml').write_text(
+        u'default_job:\n  template: default_job.txt\n'
+    )
+    runner = CliRunner()
+    result = runner.invoke(list_jobs.list_jobs, env={'JK_DIR': str(base_dir)})
+    assert result.exit_code == 1
+    assert 'The job "default_job" is defined several times' in result.output
+    assert 'jobs.d/shard.yaml:1' in result.output
@@ -35,3 +35,11 @@ def test_sweep_delete(data_dir, tmp_dir, setup_cli_env_vars):
     assert exit_code is None
     assert 'unused_template.txt' not in (p.basename
                                          for p in templates_dir.listdir())
+
+
+def test_sweep_syntax_error():
+    # The templates used by a broken template are unknown
+    runner = CliRunner()
+    result = runner.invoke(sweep.sweep, [])
+    assert result.exit_code == 1
+    assert 'unused_template.txt' not in result.output
@@ -0,0 +1,134 @@
+import os
+import shutil
+
+from click.testing import CliRunner
+
+from jenskipper.cli import watch
+from jenskipper import file_watcher
+
+
+class FakeWatcher(object):
+    """
+    A watcher applying *changes*, a list of functions returning the changed
+    files, one per call to :meth:`wait`.
+    """
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def wait(self, timeout=None):
+        if not self.changes:
+            raise KeyboardInterrupt()
+        return self.changes.pop(0)()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+def _append(fname, text):
+    def change():
+        with open(fname, 'a') as fp:
+            fp.write(text)
+        return {fname}
+    return change
+
+
+def test_watch(tmp_path, monkeypatch):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    jobs_fname = os.path.join(base_dir, 'jobs.yaml')
+    default_job_fname = os.path.join(base_dir, 'templates', 'default_job.txt')
+    changes = [
+        _append(default_job_fname, '<foo/>'),
+        _append(os.path.join(base_dir, 'templates', 'unused_template.txt'),
+                'foo'),
+        _append(jobs_fname, '\nnew_job:\n  template: default_job.txt\n'
+                '  context:\n    name: new\n'),
+    ]
+    monkeypatch.setattr(file_watcher, 'get_watcher',
+                        lambda paths, poll: FakeWatcher(changes))
+    runner = CliRunner()
+    result = runner.invoke(watch.watch, ['--diff'],
+                           env={'JK_DIR': base_dir})
+    assert result.exit_code == 0
+    runs = result.output.split('Watching 4 jobs, press Ctrl-C to stop.\n')
+    assert len(runs) == 2
+    initial_run, runs = runs
+    for job_name in ('default_job', 'missing_template', 'syntax_error',
+                     'undefined_var'):
+        assert 'Checking %s' % job_name in initial_run
+    assert '3 jobs have errors :(' in initial_run
+    # Only the jobs whose templates or definitions change are checked again,
+    # an unused template changes nothing
+    checked = [line for line in runs.splitlines()
+               if line.startswith('Checking ')]
+    assert checked == [
+        'Checking default_job',
+        'Checking new_job',
+    ]
+    assert 'XML error: junk after document element' in runs
+    assert '5 jobs have errors :(' in runs
+
+
+def test_watch_diff(tmp_path, monkeypatch):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    default_job_fname = os.path.join(base_dir, 'templates', 'default_job.txt')
+
+    def change():
+        with open(default_job_fname) as fp:
+            template = fp.read()
+        with open(default_job_fname, 'w') as fp:
+            fp.write(template.replace('{{ name }}', '{{ name }}-changed'))
+        return {default_job_fname}
+
+    monkeypatch.setattr(file_watcher, 'get_watcher',
+                        lambda paths, poll: FakeWatcher([change]))
+    runner = CliRunner()
+    result = runner.invoke(watch.watch, ['--diff', 'default_job'],
+                           env={'JK_DIR': base_dir})
+    assert result.exit_code == 0
+    assert result.output.count('Checking default_job') == 2
+    assert '--- previous/default_job.xml' in result.output
+    assert '+++ current/default_job.xml' in result.output
+    assert 'All good!' in result.output
+
+
+def test_watch_dynamic_include(tmp_path, monkeypatch):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    templates_dir = os.path.join(base_dir, 'templates')
+    with open(os.path.join(templates_dir, 'dynamic.txt'), 'w') as fp:
+        fp.write('<xml>{% include included %}</xml>')
+    with open(os.path.join(templates_dir, 'included.txt'), 'w') as fp:
+        fp.write('{{ undefined }}')
+    with open(os.path.join(base_dir, 'jobs.yaml'), 'a') as fp:
+        fp.write('\ndynamic_job:\n  template: dynamic.txt\n'
+                 '  context:\n    included: included.txt\n')
+
+    def fix_included():
+        fname = os.path.join(templates_dir, 'included.txt')
+        with open(fname, 'w') as fp:
+            fp.write('<included/>')
+        return {fname}
+
+    changes = [
+        _append(os.path.join(templates_dir, 'unused_template.txt'), 'foo'),
+        fix_included,
+    ]
+    monkeypatch.setattr(file_watcher, 'get_watcher',
+                        lambda paths, poll: FakeWatcher(changes))
+    runner = CliRunner()
+    result = runner.invoke(watch.watch, ['dynamic_job', 'undefined_var'],
+                           env={'JK_DIR': base_dir})
+    assert result.exit_code == 0
+    _, runs = result.output.split('Watching 2 jobs, press Ctrl-C to stop.\n')
+    # The files of failed jobs including templates dynamically are unknown,
+    # they are checked again on every change until they are fixed
+    checked = [line for line in runs.splitlines()
+               if line.startswith('Checking ')]
+    assert checked == ['Checking dynamic_job', 'Checking dynamic_job']
+    assert runs.rstrip().endswith('1 jobs have errors :(')
@@ -1,9 +1,12 @@
+import hashlib
 import os
 import os.path as op
 
 import pytest
 import py.path
 
+from jenskipper import repository
+
 
 HERE = op.dirname(__file__)
 
@@ -36,6 +39,27 @@ def setup_global_cli_env_vars():
     _setup_cli_env_vars(param)
 
 
+@pytest.fixture(autouse=True)
+def isolate_cache_dirs(tmp_path, monkeypatch):
+    """
+    Give each test its own empty user cache directory, and its own
+    repositories data directories (see
+    :func:`jenskipper.repository.get_data_dir`) instead of writing them in the
+    test data.
+    """
+    monkeypatch.setenv('JK_CACHE_DIR', str(tmp_path.joinpath('cache')))
+    get_data_dir = repository.get_data_dir
+    data_dirs = tmp_path.joinpath('repositories-data')
+
+    def get_test_data_dir(base_dir):
+        name = hashlib.sha1(op.abspath(base_dir).encode('utf8')).hexdigest()
+        return get_data_dir(str(data_dirs.joinpath(name)))
+
+    monkeypatch.setattr(repository, 'get_data_dir', get_test_data_dir)
+    # Repositories keep their data directories
+    monkeypatch.setattr(repository, '_repositories', {})
+
+
 @pytest.fixture
 def setup_cli_env_vars(request):
     prev_vars = _setup_cli_env_vars(request.param)
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+import requests
+
+from jenskipper import exceptions
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # NOQA
+from aiohttp import test_utils  # NOQA
+
+from jenskipper import aio_jenkins_api  # NOQA
+
+
+def _make_app():
+    app = web.Application()
+    configs = {'job_1': '<xml>1</xml>', 'job_2': '<xml>2</xml>'}
+    pushed = {}
+    state = {'pushed': pushed, 'crumb_requests': 0}
+
+    async def get_config(request):
+        name = request.match_info['name']
+        if name not in configs:
+            raise web.HTTPNotFound()
+        return web.Response(text=configs[name])
+
+    async def post_config(request):
+        name = request.match_info['name']
+        if name not in configs:
+            raise web.HTTPNotFound()
+        pushed[name] = await request.text()
+        return web.Response()
+
+    async def create_item(request):
+        name = request.query['name']
+        configs[name] = pushed[name] = await request.text()
+        return web.Response()
+
+    async def build(request):
+        raise web.HTTPCreated(headers={'Location': 'http://queue/1'})
+
+    async def api_json(request):
+        return web.json_response({'jobs': [{'name': n} for n in configs]})
+
+    async def crumb_issuer(request):
+        state['crumb_requests'] += 1
+        return web.json_response({'crumbRequestField': 'Jenkins-Crumb',
+                                  'crumb': 'secret'})
+
+    app.router.add_get('/crumbIssuer/api/json', crumb_issuer)
+    app.router.add_get('/job/{name}/config.xml', get_config)
+    app.router.add_post('/job/{name}/config.xml', post_config)
+    app.router.add_post('/createItem', create_item)
+    app.router.add_post('/job/{name}/build', build)
+    app.router.add_get('/api/json', api_json)
+    return app, state
+
+
+def _run_with_client(func):
+
+    async def runner():
+        app, state = _make_app()
+        async with test_utils.TestServer(app) as server:
+            url = str(server.make_url('/'))
+            client = aio_jenkins_api.AsyncJenkinsClient(url, concurrency=2)
+            async with client:
+                return await func(client, state), state
+
+    return asyncio.run(runner())
+
+
+def test_get_jobs_configs():
+
+    async def func(client, state):
+        return await client.get_jobs_configs(['job_1', 'unknown', 'job_2'])
+
+    results, _ = _run_with_client(func)
+    assert [(n, c) for n, c, _ in results] == [
+        ('job_1', '<xml>1</xml>'),
+        ('unknown', None),
+        ('job_2', '<xml>2</xml>'),
+    ]
+    assert isinstance(results[1][2], exceptions.JobNotFound)
+
+
+def test_push_job_config_creates_job():
+
+    async def func(client, state):
+        await client.push_job_config('job_1', '<xml>€</xml>')
+        await client.push_job_config('new_job', '<xml>new</xml>')
+        return await client.list_jobs()
+
+    jobs_names, state = _run_with_client(func)
+    assert sorted(jobs_names) == ['job_1', 'job_2', 'new_job']
+    assert state['pushed'] == {'job_1': '<xml>€</xml>',
+                               'new_job': '<xml>new</xml>'}
+
+
+def test_build_job_and_errors():
+
+    async def func(client, state):
+        queue_url = await client.build_job('job_1')
+        with pytest.raises(requests.HTTPError):
+            await client.get_object('/job/job_1')
+        return queue_url
+
+    queue_url, _ = _run_with_client(func)
+    assert queue_url == 'http://queue/1'
+
+
+def test_crumb_is_fetched_lazily():
+    crumbs = []
+
+    async def func(client, state):
+        client.use_crumbs = True
+        await client.get_job_config('job_1')
+        assert state['crumb_requests'] == 0
+        await client.push_job_config('job_1', '<xml/>')
+        await client.push_job_config('job_2', '<xml/>')
+        assert state['crumb_requests'] == 1
+        crumbs.append(client.crumb_headers)
+
+    _run_with_client(func)
+    assert crumbs == [{'Jenkins-Crumb': 'secret'}]
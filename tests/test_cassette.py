@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+
+import pytest
+from six.moves import BaseHTTPServer
+
+from jenskipper import cassette
+from jenskipper import exceptions
+from jenskipper import jenkins_api
+
+
+class FakeJenkinsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.path.startswith('/api/json'):
+            self._reply(json.dumps({'useCrumbs': False,
+                                    'jobs': [{'name': 'job_name'}]}))
+        elif self.path == '/job/job_name/config.xml':
+            self._reply('<xml/>')
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self.server.hits += 1
+        length = int(self.headers['content-length'])
+        self._reply('got %s' % self.rfile.read(length).decode('utf8'))
+
+    def _reply(self, body):
+        body = body.encode('utf8')
+        self.send_response(200)
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), FakeJenkinsHandler)
+    server.hits = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    monkeypatch.setattr(cassette, '_adapter_factory', None)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _run_session(server):
+    jenkins_url = 'http://127.0.0.1:%s' % server.server_port
+    session = jenkins_api.auth(os.environ['JK_DIR'], jenkins_url)
+    return (jenkins_api.list_jobs(session),
+            jenkins_api.get_job_config(session, 'job_name'),
+            session.post(jenkins_url + '/foo', data='bar').text)
+
+
+def test_record_and_replay(server, tmp_path):
+    fname = str(tmp_path.joinpath('cassette.jsonl.gz'))
+    cassette.enable_recording(fname)
+    recorded = _run_session(server)
+    assert recorded == (['job_name'], '<xml/>', 'got bar')
+    hits = server.hits
+    cassette.enable_replay(fname)
+    assert _run_session(server) == recorded
+    assert server.hits == hits
+
+
+def test_replay_missing_interaction(server, tmp_path):
+    fname = str(tmp_path.joinpath('cassette.jsonl.gz'))
+    jenkins_url = 'http://127.0.0.1:%s' % server.server_port
+    cassette.enable_recording(fname)
+    jenkins_api.auth(os.environ['JK_DIR'], jenkins_url)
+    cassette.enable_replay(fname)
+    session = jenkins_api.auth(os.environ['JK_DIR'], jenkins_url)
+    with pytest.raises(exceptions.InteractionNotRecorded):
+        jenkins_api.get_job_config(session, 'job_name')
+
+
+def test_identical_requests_are_replayed_in_order():
+    interactions = [
+        {'method': 'GET', 'url': 'http://jenkins/', 'body_hash': None,
+         'status': status}
+        for status in (404, 200)
+    ]
+    recorded = cassette.Cassette(interactions)
+    assert recorded.pop('GET', 'http://jenkins/', None)['status'] == 404
+    assert recorded.pop('GET', 'http://jenkins/', None)['status'] == 200
+    assert recorded.pop('GET', 'http://jenkins/', None)['status'] == 200
+    with pytest.raises(exceptions.InteractionNotRecorded):
+        recorded.pop('GET', 'http://jenkins/', b'data')
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+import requests
+
+from jenskipper import fake_jenkins
+from jenskipper import jenkins_api
+from jenskipper import exceptions
+
+
+@pytest.fixture
+def app():
+    return fake_jenkins.FakeJenkins(job_count=3, use_crumbs=True, jobs={
+        'param_job': u'<project><parameterDefinitions/></project>',
+    })
+
+
+@pytest.fixture
+def server(app):
+    server = fake_jenkins.serve(app)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session(server):
+    return jenkins_api.auth(os.environ['JK_DIR'], server.url)
+
+
+def test_jobs(session):
+    assert jenkins_api.list_jobs(session) == [
+        'job-00000', 'job-00001', 'job-00002', 'param_job',
+    ]
+    results = list(jenkins_api.get_jobs_configs(session,
+                                                ['job-00001', 'unknown']))
+    assert '<description>job-00001</description>' in results[0][1]
+    assert isinstance(results[1][2], exceptions.JobNotFound)
+    jenkins_api.push_job_config(session, 'job-00001', u'<project/>')
+    jenkins_api.push_job_config(session, 'new_job', u'<new/>')
+    jenkins_api.rename_job(session, 'new_job', 'renamed_job')
+    jenkins_api.delete_job(session, 'job-00000')
+    jenkins_api.toggle_job(session, 'job-00002', False)
+    assert jenkins_api.get_job_config(session, 'job-00001') == '<project/>'
+    assert jenkins_api.get_job_config(session, 'renamed_job') == '<new/>'
+    assert '<disabled>true</disabled>' in \
+        jenkins_api.get_job_config(session, 'job-00002')
+    assert jenkins_api.list_jobs(session) == [
+        'job-00001', 'job-00002', 'param_job', 'renamed_job',
+    ]
+
+
+def test_builds(session):
+    queue_url = jenkins_api.build_job(session, 'job-00000')
+    build_url = jenkins_api.get_object(session, queue_url,
+                                       tree='executable[url]')
+    build_url = build_url['executable']['url']
+    assert build_url.endswith('/job/job-00000/1/')
+    assert jenkins_api.get_object(session, build_url, tree='result') == {
+        'result': 'SUCCESS',
+    }
+    assert jenkins_api.get_object(session, '/job/job-00000',
+                                  tree='lastFailedBuild[number],'
+                                  'lastStableBuild[number]') == {
+        'lastFailedBuild': None,
+        'lastStableBuild': {'number': 1},
+    }
+    assert jenkins_api.get_build_log(session, build_url).endswith(
+        'Finished: SUCCESS\n'
+    )
+    resp = jenkins_api.get_artifact(session, 'job-00000', 1, 'out.txt', None)
+    assert resp.text == 'job-00000 #1: out.txt\n'
+    with pytest.raises(exceptions.MissingParametrizedBuildParameters):
+        jenkins_api.build_job(session, 'param_job')
+    with pytest.raises(exceptions.BuildIsNotParametrized):
+        jenkins_api.build_job(session, 'job-00000', {'foo': 'bar'})
+    jenkins_api.build_job(session, 'param_job', {'foo': 'bar'})
+    assert 'foo=bar' in jenkins_api.get_build_log(
+        session, session.jenkins_url + 'job/param_job/1/'
+    )
+
+
+def test_concurrent_requests():
+    server = fake_jenkins.serve(fake_jenkins.FakeJenkins(job_count=100,
+                                                         latency=0.01))
+    try:
+        session = jenkins_api.auth(os.environ['JK_DIR'], server.url)
+        names = jenkins_api.list_jobs(session)
+        results = list(jenkins_api.get_jobs_configs(session, names))
+    finally:
+        server.stop()
+    assert len(results) == 100
+    assert all(e is None for _, _, e in results)
+
+
+def test_errors_are_retried(app, session):
+    session.policy.backoff_factor = 0
+    app.error_rate = 1
+    requests_count = app.requests_count
+    with pytest.raises(requests.HTTPError) as excinfo:
+        jenkins_api.list_jobs(session)
+    assert excinfo.value.response.status_code == 503
+    assert app.requests_count == requests_count + 4
+
+
+def test_filter_tree():
+    data = {
+        'name': 'foo',
+        'builds': [{'number': 1, 'url': 'a', 'result': 'SUCCESS'}],
+        'lastBuild': None,
+        'runs': [{'url': 'b', 'builds': [{'number': 2, 'url': 'c'}]}],
+    }
+    tree = 'builds[number,url],lastBuild[number],runs[builds[number]]'
+    assert fake_jenkins.filter_tree(data, tree) == {
+        'builds': [{'number': 1, 'url': 'a'}],
+        'lastBuild': None,
+        'runs': [{'builds': [{'number': 2}]}],
+    }
+
+
+def test_keep_alive(server):
+    with requests.Session() as http_session:
+        for _ in range(5):
+            resp = http_session.get(server.url + 'api/json')
+            assert resp.status_code == 200
+            assert resp.json()['jobs']
+        resp = http_session.post(server.url + 'createItem?name=x',
+                                 data=b'<project/>')
+        assert resp.status_code == 403
+    assert server.connections_count == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from jenskipper import file_watcher
+
+
+def _make_watcher(kind, paths):
+    if kind == 'inotify':
+        try:
+            return file_watcher.InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pytest.skip('inotify is not available')
+    return file_watcher.PollingWatcher(paths, interval=0.01)
+
+
+@pytest.mark.parametrize('kind', ['polling', 'inotify'])
+def test_watcher(tmp_path, kind):
+    templates_dir = tmp_path.joinpath('templates')
+    templates_dir.mkdir()
+    template = templates_dir.joinpath('job.txt')
+    template.write_text(u'foo')
+    jobs_fname = tmp_path.joinpath('jobs.yaml')
+    shards_dir = tmp_path.joinpath('jobs.d')
+    with _make_watcher(kind, [str(templates_dir), str(jobs_fname),
+                              str(shards_dir)]) as watcher:
+        assert watcher.wait(timeout=0.1) == set()
+
+        template.write_text(u'foobar')
+        assert watcher.wait(timeout=5) == {str(template)}
+
+        jobs_fname.write_text(u'job: {}')
+        tmp_path.joinpath('unwatched.txt').write_text(u'foo')
+        templates_dir.joinpath('.job.txt.swp').write_text(u'foo')
+        assert watcher.wait(timeout=5) == {str(jobs_fname)}
+
+        shards_dir.mkdir()
+        shard = shards_dir.joinpath('shard.yaml')
+        shard.write_text(u'job2: {}')
+        assert watcher.wait(timeout=5) == {str(shard)}
+
+        templates_dir.joinpath('sub').mkdir()
+        sub_template = templates_dir.joinpath('sub', 'job.txt')
+        sub_template.write_text(u'foo')
+        assert watcher.wait(timeout=5) == {str(sub_template)}
+
+        template.unlink()
+        assert watcher.wait(timeout=5) == {str(template)}
+
+
+def test_get_watcher_poll(tmp_path):
+    watcher = file_watcher.get_watcher([str(tmp_path)], poll=True)
+    assert type(watcher) is file_watcher.PollingWatcher
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+import requests
+
+from jenskipper import jenkins_api
+from jenskipper import http_cache
+
+
+@pytest.fixture
+def session(requests_mock, tmp_path):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    session.http_cache = http_cache.HTTPCache(str(tmp_path.joinpath('http')),
+                                              1024)
+    return session
+
+
+def _config_callback(request, context):
+    if request.headers.get('If-None-Match') == '"v1"':
+        context.status_code = 304
+        return ''
+    context.headers['ETag'] = '"v1"'
+    return '<xml>1</xml>'
+
+
+def test_not_modified_responses_are_served_from_cache(requests_mock, session):
+    requests_mock.get('/job/job_name/config.xml', text=_config_callback)
+    assert jenkins_api.get_job_config(session, 'job_name') == '<xml>1</xml>'
+    assert jenkins_api.get_job_config(session, 'job_name') == '<xml>1</xml>'
+    history = requests_mock.request_history[-2:]
+    assert 'If-None-Match' not in history[0].headers
+    assert history[1].headers['If-None-Match'] == '"v1"'
+
+
+def test_cache_is_invalidated_on_push(requests_mock, session):
+    requests_mock.get('/job/job_name/config.xml', text=_config_callback)
+    requests_mock.post('/job/job_name/config.xml')
+    jenkins_api.get_job_config(session, 'job_name')
+    jenkins_api.push_job_config(session, 'job_name', '<xml>2</xml>')
+    jenkins_api.get_job_config(session, 'job_name')
+    assert 'If-None-Match' not in requests_mock.last_request.headers
+
+
+def test_responses_without_validators_are_not_cached(requests_mock, session):
+    requests_mock.get('/job/job_name/config.xml', text='<xml/>')
+    jenkins_api.get_job_config(session, 'job_name')
+    assert session.http_cache.get(
+        jenkins_api._get_job_config_url(session, 'job_name')
+    ) is None
+
+
+def test_lru_eviction(requests_mock, tmp_path):
+    cache = http_cache.HTTPCache(str(tmp_path), 1000)
+    requests_mock.get('http://jenkins/api/json', text='x' * 300,
+                      headers={'ETag': '"1"'})
+    resp = requests.get('http://jenkins/api/json')
+    urls = ['http://jenkins/job/job_%s/api/json' % i for i in range(3)]
+    for url in urls:
+        cache.set(url, resp)
+    os.utime(cache._get_entry_fname(urls[0]), (0, 10))
+    os.utime(cache._get_entry_fname(urls[1]), (0, 0))
+    os.utime(cache._get_entry_fname(urls[2]), (0, 5))
+    # Use the first entry, so the second one is the least recently used
+    assert cache.get(urls[0]) is not None
+    cache.set('http://jenkins/job/job_3/api/json', resp)
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[1]) is None
+
+
+def test_overwritten_entries_size(requests_mock, tmp_path):
+    cache = http_cache.HTTPCache(str(tmp_path), 1000)
+    requests_mock.get('http://jenkins/api/json', text='x' * 300,
+                      headers={'ETag': '"1"'})
+    resp = requests.get('http://jenkins/api/json')
+    urls = ['http://jenkins/job/job_%s/api/json' % i for i in range(2)]
+    for url in urls:
+        cache.set(url, resp)
+    # Storing the same entry again must not evict the other one
+    for _ in range(5):
+        cache.set(urls[0], resp)
+    assert cache.get(urls[1]) is not None
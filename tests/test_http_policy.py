@@ -0,0 +1,46 @@
+import requests
+
+from jenskipper import http_policy
+
+
+def test_get_timeout():
+    policy = http_policy.RequestPolicy(connect_timeout=5, read_timeout=0,
+                                       read_timeouts={'console': 300,
+                                                      'api_json': None})
+    assert policy.get_timeout('console') == (5, 300)
+    assert policy.get_timeout('api_json') == (5, None)
+    assert policy.get_timeout('other') == (5, None)
+
+
+def test_should_retry_idempotent():
+    policy = http_policy.RequestPolicy(retries=2)
+    resp = requests.Response()
+    resp.status_code = 503
+    assert policy.should_retry(0, True, response=resp)
+    assert policy.should_retry(1, True, response=resp)
+    assert not policy.should_retry(2, True, response=resp)
+    resp.status_code = 500
+    assert not policy.should_retry(0, True, response=resp)
+    assert policy.should_retry(0, True, error=requests.ConnectionError())
+    assert policy.should_retry(0, True, error=requests.ReadTimeout())
+
+
+def test_should_retry_non_idempotent():
+    policy = http_policy.RequestPolicy(retries=2)
+    resp = requests.Response()
+    resp.status_code = 503
+    assert not policy.should_retry(0, False, response=resp)
+    assert not policy.should_retry(0, False, error=requests.ConnectionError())
+    assert not policy.should_retry(0, False, error=requests.ReadTimeout())
+    assert policy.should_retry(0, False, error=requests.ConnectTimeout())
+
+
+def test_get_delay():
+    policy = http_policy.RequestPolicy(backoff_factor=1, backoff_max=3)
+    for attempt in range(5):
+        assert 0 <= policy.get_delay(attempt) <= min(3, 2 ** attempt)
+    resp = requests.Response()
+    resp.headers['Retry-After'] = '2'
+    assert policy.get_delay(0, resp) == 2
+    resp.headers['Retry-After'] = '3600'
+    assert policy.get_delay(0, resp) == 3
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+from jenskipper import http_stats
+from jenskipper import jenkins_api
+from jenskipper.cli import main
+
+
+@pytest.fixture(autouse=True)
+def reset_recorder(monkeypatch):
+    monkeypatch.setattr(http_stats, '_recorder', None)
+
+
+def test_requests_are_recorded(requests_mock):
+    recorder = http_stats.enable()
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    requests_mock.get('/job/job_name/config.xml', text='<xml/>')
+    requests_mock.post('/job/job_name/config.xml', status_code=500)
+    session = jenkins_api.auth(os.environ['JK_DIR'], use_cache=False)
+    jenkins_api.get_job_config(session, 'job_name')
+    with pytest.raises(requests.HTTPError):
+        jenkins_api.push_job_config(session, 'job_name', '<xml/>')
+    assert [(r.method, r.endpoint_class, r.status, r.size)
+            for r in recorder.requests] == [
+        ('GET', 'api_json', 200, 20),
+        ('GET', 'config_get', 200, 6),
+        ('POST', 'config_post', 500, 0),
+    ]
+
+
+def test_format_report():
+    recorder = http_stats.StatsRecorder(slow_threshold=1)
+    recorder.record('GET', 'http://jenkins/api/json', 'api_json', 200, 2048,
+                    0, 0.01, 0.02)
+    recorder.record('GET', 'http://jenkins/job/foo/config.xml', 'config_get',
+                    200, 100, 0.01, 1, 2)
+    recorder.record('GET', 'http://jenkins/job/bar/config.xml', 'config_get',
+                    None, 0, 5, 0.2, 0.2)
+    report = '\n'.join(recorder.format_report())
+    assert ('api_json          1      0        2KB      10ms      20ms'
+            in report)
+    assert 'config_get        2      1       100B' in report
+    assert '2.0s 200 GET http://jenkins/job/foo/config.xml' in report
+    assert 'bar/config.xml' not in report
+    assert 'Time spent waiting for the server: 2.2s' in report
+
+
+def test_busy_time():
+    requests = [
+        http_stats.Request('GET', '', '', 200, 0, start, 0, total)
+        for start, total in [(0, 2), (1, 2), (5, 1), (5.5, 0.2)]
+    ]
+    assert http_stats._get_busy_time(requests) == 4
+
+
+def test_http_stats_option(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    requests_mock.get('/job/default_job/api/json',
+                      json={'lastCompletedBuild': None})
+    runner = CliRunner()
+    result = runner.invoke(main.main, ['--http-stats', 'status',
+                                       'default_job'])
+    assert result.exit_code == 0
+    assert 'HTTP requests statistics:' in result.output
+    assert 'Latency histogram:' in result.output
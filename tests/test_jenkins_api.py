@@ -1,9 +1,12 @@
 import os
+import threading
 
 import pytest
+import requests
 
 from jenskipper import jenkins_api
 from jenskipper import exceptions
+from jenskipper import http_policy
 
 
 def test_list_jobs(requests_mock, data_dir):
@@ -23,3 +26,164 @@ def test_push_job_config_type_mismatch(requests_mock, data_dir):
     exc = excinfo.value
     assert exc.pushed_type == 'hudson.matrix.MatrixProject'
     assert exc.expected_type == 'hudson.model.FreeStyleProject'
+
+
+def test_get_jobs_configs(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    requests_mock.get('/job/job_1/config.xml', text='<xml>1</xml>')
+    requests_mock.get('/job/job_2/config.xml', status_code=404)
+    requests_mock.get('/job/job_3/config.xml', text='<xml>3</xml>')
+    results = list(jenkins_api.get_jobs_configs(session,
+                                                ['job_1', 'job_2', 'job_3']))
+    assert [(n, c) for n, c, _ in results] == [
+        ('job_1', '<xml>1</xml>'),
+        ('job_2', None),
+        ('job_3', '<xml>3</xml>'),
+    ]
+    assert results[0][2] is None
+    assert isinstance(results[1][2], exceptions.JobNotFound)
+    assert results[2][2] is None
+
+
+def test_auth_uses_bootstrap_cache(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    jenkins_api.auth(os.environ['JK_DIR'])
+    assert requests_mock.call_count == 1
+    jenkins_api.auth(os.environ['JK_DIR'])
+    assert requests_mock.call_count == 1
+    jenkins_api.auth(os.environ['JK_DIR'], use_cache=False)
+    assert requests_mock.call_count == 2
+
+
+def test_auth_refreshes_stale_bootstrap_cache(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    jenkins_api.auth(os.environ['JK_DIR'])
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    requests_mock.get('/job/job_name/config.xml', [
+        {'status_code': 401},
+        {'text': '<xml/>'},
+    ])
+    assert jenkins_api.get_job_config(session, 'job_name') == '<xml/>'
+    assert [r.path for r in requests_mock.request_history] == [
+        '/api/json',
+        '/job/job_name/config.xml',
+        '/api/json',
+        '/job/job_name/config.xml',
+    ]
+
+
+def test_auth_refreshes_stale_bootstrap_cache_once(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    jenkins_api.auth(os.environ['JK_DIR'])
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    requests_mock.get('/job/job_name/config.xml', [
+        {'status_code': 401},
+        {'status_code': 401},
+        {'status_code': 401},
+        {'text': '<xml/>'},
+    ])
+    # Send all the requests with the stale state before any is rejected
+    barrier = threading.Barrier(3, timeout=10)
+    send = session._send
+
+    def send_together(method, url, *args, **kwargs):
+        if url.endswith('config.xml') and session._bootstraps_count == 0:
+            barrier.wait()
+        return send(method, url, *args, **kwargs)
+
+    session._send = send_together
+    results = []
+    threads = [threading.Thread(
+        target=lambda: results.append(
+            jenkins_api.get_job_config(session, 'job_name')
+        )
+    ) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['<xml/>'] * 3
+    paths = [r.path for r in requests_mock.request_history]
+    assert paths.count('/api/json') == 2
+    assert paths.count('/job/job_name/config.xml') == 6
+
+
+def test_crumb_is_fetched_lazily(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': True})
+    requests_mock.get('/crumbIssuer/api/json',
+                      json={'crumbRequestField': 'Jenkins-Crumb',
+                            'crumb': 'secret'})
+    requests_mock.get('/job/job_name/config.xml', text='<xml/>')
+    requests_mock.post('/job/job_name/doDelete')
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    jenkins_api.get_job_config(session, 'job_name')
+    assert 'Jenkins-Crumb' not in requests_mock.last_request.headers
+    jenkins_api.delete_job(session, 'job_name')
+    assert requests_mock.last_request.headers['Jenkins-Crumb'] == 'secret'
+    assert [r.path for r in requests_mock.request_history] == [
+        '/api/json',
+        '/job/job_name/config.xml',
+        '/crumbissuer/api/json',
+        '/job/job_name/dodelete',
+    ]
+
+
+def test_crumb_is_refreshed_on_crumb_errors(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': True})
+    requests_mock.get('/crumbIssuer/api/json', [
+        {'json': {'crumbRequestField': 'Jenkins-Crumb', 'crumb': 'old'}},
+        {'json': {'crumbRequestField': 'Jenkins-Crumb', 'crumb': 'new'}},
+    ])
+    requests_mock.post('/job/job_name/doDelete', [
+        {'status_code': 200},
+        {'status_code': 403, 'text': 'No valid crumb was included'},
+        {'status_code': 200},
+    ])
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    jenkins_api.delete_job(session, 'job_name')
+    # The crumb is cached with the session state
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    assert session.crumb == 'old'
+    jenkins_api.delete_job(session, 'job_name')
+    assert requests_mock.last_request.headers['Jenkins-Crumb'] == 'new'
+
+
+def test_get_object_tree(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    requests_mock.get('/job/job_name/api/json', json={'builds': []})
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    assert requests_mock.last_request.query == 'tree=usecrumbs'
+    data = jenkins_api.get_object(session, '/job/job_name',
+                                  tree='builds[number,url]', depth=1)
+    assert data == {'builds': []}
+    assert requests_mock.last_request.url.endswith(
+        '/job/job_name/api/json?tree=builds%5Bnumber%2Curl%5D&depth=1'
+    )
+
+
+def test_retries(requests_mock):
+    requests_mock.get('/api/json', json={'useCrumbs': False})
+    session = jenkins_api.auth(os.environ['JK_DIR'])
+    session.policy = http_policy.RequestPolicy(
+        retries=1,
+        backoff_factor=0,
+        read_timeouts={'config_post': 300},
+    )
+    requests_mock.get('/job/job_name/config.xml', [
+        {'status_code': 503},
+        {'text': '<xml/>'},
+    ])
+    assert jenkins_api.get_job_config(session, 'job_name') == '<xml/>'
+    requests_mock.post('/job/job_name/doDelete', [
+        {'status_code': 503},
+        {'status_code': 200},
+    ])
+    with pytest.raises(requests.HTTPError):
+        jenkins_api.delete_job(session, 'job_name')
+    requests_mock.post('/job/job_name/config.xml', [
+        {'status_code': 503},
+        {'status_code': 200},
+    ])
+    jenkins_api.push_job_config(session, 'job_name', '<xml/>')
+    assert requests_mock.last_request.timeout == (10, 300)
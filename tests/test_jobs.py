@@ -126,3 +126,16 @@ JOB_WITHOUT_PIPELINE = """<?xml version='1.0' encoding='UTF-8'?>
   <publishers/>
   <buildWrappers/>
 </project>"""  # NOQA
+
+
+def test_finalize_job(data_dir):
+    conf = data_dir.join('job_config.xml').read_text('utf8')
+    _, pruned_conf = jobs.extract_pipeline_conf(conf)
+    pipe_info = (['stupeflix'], 'SUCCESS')
+    assert jobs.finalize_job(pruned_conf, None) == (pruned_conf.strip(), None)
+    finalized, conf_hash = jobs.finalize_job(pruned_conf, pipe_info,
+                                             insert_hash=True)
+    merged_conf = jobs.merge_pipeline_conf(pruned_conf, *pipe_info)
+    assert finalized == jobs.append_hash_in_description(merged_conf)
+    assert conf_hash == jobs.get_conf_hash(merged_conf)
+    assert jobs.finalize_job(u'<broken', None) == (u'<broken', None)
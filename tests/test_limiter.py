@@ -0,0 +1,53 @@
+import threading
+
+from jenskipper import limiter
+
+
+def _run_requests(lim, count, latency, overloaded=False):
+    for _ in range(count):
+        lim.acquire()
+        lim.release(latency, overloaded)
+
+
+def test_additive_increase():
+    lim = limiter.AdaptiveLimiter(initial_limit=2, max_limit=4)
+    _run_requests(lim, 2, 0.1)
+    assert 2 < lim.limit < 3
+    _run_requests(lim, 100, 0.1)
+    assert lim.limit == 4
+
+
+def test_multiplicative_decrease_on_overload():
+    lim = limiter.AdaptiveLimiter(initial_limit=8, min_limit=2)
+    _run_requests(lim, 1, 0.1, overloaded=True)
+    assert lim.limit == 4
+    _run_requests(lim, 3, 0.1, overloaded=True)
+    assert lim.limit == 2
+
+
+def test_decrease_on_rising_latency():
+    lim = limiter.AdaptiveLimiter(initial_limit=8, max_limit=8, window=10)
+    _run_requests(lim, 10, 0.1)
+    assert lim.limit == 8
+    _run_requests(lim, 2, 0.5)
+    assert lim.limit == 4
+    # Latency at the minimum limit becomes the new baseline
+    _run_requests(lim, 100, 0.5)
+    assert lim.limit == 8
+
+
+def test_acquire_blocks_at_limit():
+    lim = limiter.AdaptiveLimiter(initial_limit=1, max_limit=1)
+    lim.acquire()
+    acquired = threading.Event()
+
+    def acquire():
+        lim.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+    lim.release(0.1)
+    assert acquired.wait(1)
+    thread.join()
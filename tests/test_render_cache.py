@@ -0,0 +1,98 @@
+import os
+import shutil
+
+import pytest
+
+from jenskipper import render_cache
+from jenskipper import repository
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache_dir = tmp_path.joinpath('cache')
+    cache_dir.mkdir()
+    return render_cache.RenderCache(str(cache_dir), 10000)
+
+
+@pytest.fixture
+def template(tmp_path):
+    fname = tmp_path.joinpath('template.txt')
+    fname.write_text(u'template')
+    return str(fname)
+
+
+def test_get_inputs_key():
+    key = render_cache.get_inputs_key('t.xml', {'a': 1, 'b': 2}, None, False,
+                                      {})
+    assert render_cache.get_inputs_key('t.xml', {'b': 2, 'a': 1}, None,
+                                       False, {}) == key
+    assert render_cache.get_inputs_key('t.xml', {'a': 1, 'b': 3}, None,
+                                       False, {}) != key
+    assert render_cache.get_inputs_key('t.xml', {'a': 1, 'b': 2}, None,
+                                       True, {}) != key
+    assert render_cache.get_inputs_key('t.xml', {'a': 1, 'b': 2}, None,
+                                       False, {}, '/copy') != key
+    assert render_cache.get_inputs_key('t.xml', {1: 1, 'b': 2}, None,
+                                       False, {}) is None
+
+
+def test_get_set(cache, template):
+    assert cache.get('key') is None
+    cache.set('key', u'<xml/>', [template])
+    assert cache.get('key') == (u'<xml/>', [template])
+    assert cache.get('other_key') is None
+
+
+def test_template_modification(cache, template):
+    cache.set('key', u'<xml/>', [template])
+    with open(template, 'w') as fp:
+        fp.write('modified template')
+    assert cache.get('key') is None
+    with open(template, 'w') as fp:
+        fp.write('template')
+    assert cache.get('key') == (u'<xml/>', [template])
+    os.unlink(template)
+    assert cache.get('key') is None
+
+
+def test_eviction(cache, template):
+    for i in range(20):
+        cache.set('key%s' % i, u'x' * 1000, [template])
+    size = sum(os.path.getsize(os.path.join(cache.directory, f))
+               for f in os.listdir(cache.directory))
+    assert size <= cache.max_size
+    assert cache.get('key19') is not None
+    assert cache.get('key0') is None
+
+
+def test_repository_render_cache(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    repos = repository.Repository(base_dir)
+    rendered, files = repos.render_job('default_job')
+
+    repos = repository.Repository(base_dir)
+    repos.templates_dir = None
+    assert repos.render_job('default_job') == (rendered, files)
+    with pytest.raises(TypeError):
+        repos.render_job('default_job', context_overrides={'name': 'other'})
+
+
+def test_repository_render_cache_missing_templates(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    templates_dir = os.path.join(base_dir, 'templates')
+    with open(os.path.join(templates_dir, 'optional.txt'), 'w') as fp:
+        fp.write('<xml>{% include "opt.txt" ignore missing %}</xml>')
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\noptional_job:\n  template: optional.txt\n')
+    repos = repository.Repository(base_dir)
+    rendered, files = repos.render_job('optional_job')
+    assert rendered == '<xml></xml>'
+    assert os.path.join(templates_dir, 'opt.txt') in files
+
+    with open(os.path.join(templates_dir, 'opt.txt'), 'w') as fp:
+        fp.write('<extra/>')
+    repos = repository.Repository(base_dir)
+    rendered, _ = repos.render_job('optional_job')
+    assert rendered == '<xml><extra/></xml>'
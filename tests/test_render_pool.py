@@ -0,0 +1,98 @@
+import os
+import shutil
+
+from six.moves import cPickle as pickle
+
+from jenskipper import render_pool
+from jenskipper import repository
+from jenskipper import exceptions
+
+
+def test_render_jobs_serial():
+    base_dir = os.environ['JK_DIR']
+    jobs_names = ['undefined_var', 'default_job', 'missing_template']
+    results = list(render_pool.render_jobs(base_dir, jobs_names))
+    assert [r[0] for r in results] == jobs_names
+    job_name, result, error = results[0]
+    assert result is None
+    assert error.job_name == 'undefined_var'
+    assert error.message.startswith('Undefined variable: ')
+    assert error.missing_template is None
+    job_name, result, error = results[1]
+    assert error is None
+    assert result == repository.get_job_conf(base_dir, 'default_job')
+    job_name, result, error = results[2]
+    assert result is None
+    assert error.missing_template == 'no_template.xml'
+
+
+def test_render_jobs_pool(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    jobs_names = ['job_%02d' % i for i in range(40)]
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        for job_name in jobs_names:
+            fp.write('\n%s:\n  template: default_job.txt\n  context:\n'
+                     '    name: %s\n' % (job_name, job_name))
+    jobs_names.insert(20, 'syntax_error')
+    results = list(render_pool.render_jobs(base_dir, jobs_names, workers=4))
+    assert [r[0] for r in results] == jobs_names
+    for job_name, result, error in results:
+        if job_name == 'syntax_error':
+            assert result is None
+            assert error.message.startswith('Syntax error: ')
+        else:
+            assert error is None
+            assert result == repository.get_job_conf(base_dir, job_name)
+
+
+def test_render_error_pickling():
+    error = exceptions.RenderError('job', stack=['line'], message='error',
+                                   syntax_error_fname='t.txt')
+    error = pickle.loads(pickle.dumps(error))
+    assert error.job_name == 'job'
+    assert error.stack == ['line']
+    assert error.syntax_error_fname == 't.txt'
+    assert str(error) == 'error'
+
+
+def test_find_jobs_files(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    templates_dir = os.path.join(base_dir, 'templates')
+    with open(os.path.join(templates_dir, 'dynamic.txt'), 'w') as fp:
+        fp.write('{% include template %}')
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\ndynamic_job:\n  template: dynamic.txt\n  context:\n'
+                 '    template: default_job.txt\n    name: dynamic\n'
+                 'broken_dynamic_job:\n  template: dynamic.txt\n')
+    jobs_names = ['default_job', 'dynamic_job', 'broken_dynamic_job',
+                  'missing_template']
+    results = list(render_pool.find_jobs_files(base_dir, jobs_names))
+    assert [r[0] for r in results] == jobs_names
+    default_job_fname = os.path.join(templates_dir, 'default_job.txt')
+    dynamic_fname = os.path.join(templates_dir, 'dynamic.txt')
+    assert results[0][1:] == ({default_job_fname}, None)
+    assert results[1][1:] == ({default_job_fname, dynamic_fname}, None)
+    assert results[2][1] == {dynamic_fname}
+    assert isinstance(results[2][2], exceptions.RenderError)
+    assert results[3][1:] == ({os.path.join(templates_dir,
+                                            'no_template.xml')}, None)
+
+
+def test_render_jobs_xml_error(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    with open(os.path.join(base_dir, 'templates', 'broken_xml.txt'),
+              'w') as fp:
+        fp.write('<xml>')
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\nbroken_xml:\n  template: broken_xml.txt\n')
+    with open(repository.get_pipelines_fname(base_dir), 'w') as fp:
+        fp.write('default_job > broken_xml\n')
+    results = list(render_pool.render_jobs(base_dir, ['broken_xml',
+                                                      'default_job']))
+    job_name, result, error = results[0]
+    assert result is None
+    assert error.message.startswith('XML error: ')
+    assert results[1][2] is None
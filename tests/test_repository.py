@@ -1,4 +1,12 @@
+import os
+import shutil
+
+import jinja2
+import pytest
+
 from jenskipper import repository
+from jenskipper import exceptions
+from jenskipper import utils
 
 
 def test_get_current_repository(data_dir):
@@ -7,3 +15,121 @@ def test_get_current_repository(data_dir):
     assert repository.search_base_dir(str(from_dir), data_dir) == base_dir
     assert repository.search_base_dir(str(base_dir), data_dir) == base_dir
     assert repository.search_base_dir(str(data_dir), data_dir) is None
+
+
+def test_render_job_without_pipeline_is_not_parsed(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(utils, 'parse_xml', parsed.append)
+    repos = repository.get_repository(os.environ['JK_DIR'])
+    repos.render_job('default_job', use_cache=False)
+    assert parsed == []
+
+
+def test_repository_reloads_modified_files(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    repos = repository.Repository(base_dir)
+    jobs_defs = repos.jobs_defs
+    assert repos.jobs_defs is jobs_defs
+    assert repos.pipelines is repos.pipelines
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\nnew_job:\n  template: default_job.txt\n')
+    assert repos.jobs_defs is not jobs_defs
+    assert 'new_job' in repos.jobs_defs
+
+
+def test_get_repository():
+    repos = repository.get_repository(os.environ['JK_DIR'])
+    assert repository.get_repository(os.environ['JK_DIR']) is repos
+    _, files = repos.render_job('default_job')
+    assert files == {os.path.join(repos.templates_dir, 'default_job.txt')}
+
+
+def test_parse_jobs_defs_shares_default_contexts():
+    default_contexts = {'default': {'a': 1, 'b': 2}, 'other': {'c': 3}}
+    jobs_defs = repository.parse_jobs_defs(
+        'job1:\n'
+        '  template: t.xml\n'
+        '  context:\n'
+        '    b: 4\n'
+        'job2:\n'
+        '  template: t.xml\n'
+        'job3:\n'
+        '  template: t.xml\n'
+        '  default_context: other\n',
+        default_contexts
+    )
+    job1 = jobs_defs['job1']
+    assert job1['template'] == job1.template == 't.xml'
+    assert job1['default_context'] == 'default'
+    assert dict(job1['context']) == {'a': 1, 'b': 4}
+    assert jobs_defs['job2'].own_context is None
+    assert dict(jobs_defs['job2'].context) == {'a': 1, 'b': 2}
+    assert dict(jobs_defs['job3'].context) == {'c': 3}
+    with pytest.raises(TypeError):
+        jobs_defs['job2'].context['a'] = 5
+    assert jobs_defs['job2'].context['b'] == 2
+    assert default_contexts['default'] == {'a': 1, 'b': 2}
+    with pytest.raises(KeyError):
+        job1['own_context']
+
+
+def test_jobs_dont_modify_shared_contexts(tmp_path):
+    base_dir = str(tmp_path)
+    os.mkdir(repository.get_templates_dir(base_dir))
+    for name, source in [
+            ('append.txt', "{% set _ = nodes.append('x') %}"
+                           "{{ nodes|join(',') }}"),
+            ('update.txt', "{% set _ = conf.update({'x': 1}) %}"),
+            ('show.txt', "{{ nodes|join(',') }} {{ conf|tojson }}")]:
+        with open(os.path.join(base_dir, 'templates', name), 'w') as fp:
+            fp.write(source)
+    with open(repository.get_default_contexts_fname(base_dir), 'w') as fp:
+        fp.write('default:\n  nodes: [a, b]\n  conf: {y: 2}\n')
+    with open(repository.get_jobs_defs_fname(base_dir), 'w') as fp:
+        fp.write('job1:\n  template: append.txt\n'
+                 'job2:\n  template: update.txt\n'
+                 'job3:\n  template: show.txt\n')
+    open(repository.get_pipelines_fname(base_dir), 'w').close()
+    repos = repository.Repository(base_dir)
+    for job_name in ('job1', 'job2', 'job1', 'job2'):
+        with pytest.raises(jinja2.UndefinedError):
+            repos.render_job(job_name, use_cache=False)
+    rendered, _ = repos.render_job('job3', use_cache=False)
+    assert rendered == 'a,b {"y": 2}'
+    context = repos.jobs_defs['job1'].context
+    assert context['nodes'] == ('a', 'b')
+    assert isinstance(context['conf'], utils.LayeredMapping)
+    assert repos.default_contexts['default'] == \
+        {'nodes': ['a', 'b'], 'conf': {'y': 2}}
+
+
+def test_sharded_definitions(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    os.mkdir(repository.get_jobs_shards_dir(base_dir))
+    os.mkdir(repository.get_contexts_shards_dir(base_dir))
+    with open(os.path.join(base_dir, 'contexts.d', 'other.yaml'), 'w') as fp:
+        fp.write('other:\n  name: other\n')
+    with open(os.path.join(base_dir, 'jobs.d', 'other.yaml'), 'w') as fp:
+        fp.write('other_job:\n  template: default_job.txt\n'
+                 '  default_context: other\n')
+    repos = repository.Repository(base_dir)
+    assert 'default_job' in repos.jobs_defs
+    assert dict(repos.jobs_defs['other_job'].context) == {'name': 'other'}
+
+    # Only shards are required
+    os.unlink(repository.get_jobs_defs_fname(base_dir))
+    assert set(repos.jobs_defs) == {'other_job'}
+
+    # Duplicates are reported with their location
+    with open(os.path.join(base_dir, 'jobs.d', 'dup.yaml'), 'w') as fp:
+        fp.write('# comment\nother_job:\n  template: default_job.txt\n')
+    with pytest.raises(exceptions.DuplicateDefinition) as exc_info:
+        repos.jobs_defs
+    assert exc_info.value.kind == 'job'
+    assert exc_info.value.name == 'other_job'
+    assert exc_info.value.locations == [
+        (os.path.join(base_dir, 'jobs.d', 'dup.yaml'), 2),
+        (os.path.join(base_dir, 'jobs.d', 'other.yaml'), 1),
+    ]
@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import pytest
+
+from jenskipper import repository
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    base_dir = str(tmp_path.joinpath('repos'))
+    shutil.copytree(os.environ['JK_DIR'], base_dir)
+    return base_dir
+
+
+def test_jobs_names(base_dir, monkeypatch):
+    repos = repository.Repository(base_dir)
+    jobs_names = repos.get_jobs_names()
+    assert set(jobs_names) == {'default_job', 'missing_template',
+                               'syntax_error', 'undefined_var'}
+    assert os.path.exists(repository.get_index_fname(base_dir))
+
+    # Definitions are not parsed again when they did not change
+    repos = repository.Repository(base_dir)
+    monkeypatch.setattr(repository, '_read_jobs_defs', None)
+    assert repos.get_jobs_names() == jobs_names
+    monkeypatch.undo()
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\nnew_job:\n  template: default_job.txt\n')
+    assert repos.get_jobs_names() == jobs_names + ['new_job']
+    job = repos.index.get_job('new_job')
+    assert job['template'] == 'default_job.txt'
+    assert job['pipe_info'] is None
+    assert job['context_digest'] is not None
+
+
+def test_job_files(base_dir, monkeypatch):
+    templates_dir = os.path.join(base_dir, 'templates')
+    default_job_fname = os.path.join(templates_dir, 'default_job.txt')
+    included_fname = os.path.join(templates_dir, 'included.txt')
+    repos = repository.Repository(base_dir)
+    assert repos.find_job_files('default_job') == ({default_job_fname}, True)
+    repos.index.save()
+
+    # Templates are not parsed again when their contents did not change
+    repos = repository.Repository(base_dir)
+    find_dependencies = repository.templates.find_dependencies
+    monkeypatch.setattr(repository.templates, 'find_dependencies', None)
+    os.utime(default_job_fname, (0, 0))
+    assert repos.find_job_files('default_job') == ({default_job_fname}, True)
+    monkeypatch.setattr(repository.templates, 'find_dependencies',
+                        find_dependencies)
+    with open(default_job_fname, 'a') as fp:
+        fp.write("{% include 'included.txt' %}")
+    assert repos.find_job_files('default_job') == \
+        ({default_job_fname, included_fname}, True)
+
+    # Templates created later are taken into account
+    with open(included_fname, 'w') as fp:
+        fp.write("{% include name %}")
+    assert repos.find_job_files('default_job') == \
+        ({default_job_fname, included_fname}, False)
+
+
+def test_copied_repository(base_dir, tmp_path):
+    repos = repository.Repository(base_dir)
+    repos.find_job_files('default_job')
+    repos.index.save()
+    copy_dir = str(tmp_path.joinpath('copy'))
+    shutil.copytree(base_dir, copy_dir)
+    shutil.copy(repository.get_index_fname(base_dir),
+                repository.get_index_fname(copy_dir))
+    repos = repository.Repository(copy_dir)
+    assert repos.find_job_files('default_job') == (
+        {os.path.join(copy_dir, 'templates', 'default_job.txt')}, True
+    )
+
+
+def test_shared_template_files(base_dir):
+    templates_dir = os.path.join(base_dir, 'templates')
+    base_fname = os.path.join(templates_dir, 'base.txt')
+    new_fname = os.path.join(templates_dir, 'new.txt')
+    with open(base_fname, 'w') as fp:
+        fp.write('<xml/>')
+    with open(repository.get_jobs_defs_fname(base_dir), 'a') as fp:
+        fp.write('\njob_a:\n  template: base.txt\n'
+                 'job_b:\n  template: base.txt\n')
+    repos = repository.Repository(base_dir)
+    for job_name in ('job_a', 'job_b'):
+        assert repos.find_job_files(job_name) == ({base_fname}, True)
+
+    # A file changed is checked again for each job using it
+    with open(base_fname, 'a') as fp:
+        fp.write("{% include 'new.txt' %}")
+    for job_name in ('job_a', 'job_b'):
+        assert repos.find_job_files(job_name) == \
+            ({base_fname, new_fname}, True)
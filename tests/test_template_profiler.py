@@ -0,0 +1,41 @@
+import six
+
+from jenskipper import templates
+from jenskipper import template_profiler
+
+
+def test_profile(data_dir):
+    with template_profiler.profile() as profiler:
+        assert template_profiler.is_enabled()
+        rendered, _ = templates.render(six.text_type(data_dir),
+                                       'template_with_macros.txt',
+                                       {'name': 'John'})
+        templates.render(six.text_type(data_dir), 'template_with_macros.txt',
+                         {'name': 'Jane'})
+    assert not template_profiler.is_enabled()
+    assert rendered == 'My name is John, Hello John, Hello you'
+    calls = {k: v[0] for k, v in profiler.stats.items()}
+    assert calls == {
+        ('template', 'template_with_macros.txt'): 2,
+        ('include', 'template.txt'): 2,
+        # Jinja caches imported modules
+        ('import', 'macros.txt'): 1,
+        ('macro', 'macros.txt:hello'): 4,
+    }
+    for calls, total_time, own_time in profiler.stats.values():
+        assert total_time >= own_time >= 0
+    report = profiler.format_report()
+    assert len(report) == 7
+    assert report[2].split() == ['kind', 'calls', 'total', 'own', 'name']
+
+    # Instrumented templates are not profiled anymore
+    templates.render(six.text_type(data_dir), 'template_with_macros.txt',
+                     {'name': 'John'})
+    assert profiler.stats[('template', 'template_with_macros.txt')][0] == 2
+
+
+def test_profile_nothing():
+    with template_profiler.profile() as profiler:
+        pass
+    assert profiler.format_report() == ['Templates profile:', '',
+                                        'No templates were rendered.']
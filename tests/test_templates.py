@@ -1,6 +1,8 @@
+import os
 import sys
 
 import jinja2
+import pytest
 import six
 
 from jenskipper import templates
@@ -21,6 +23,34 @@ def test_render_with_overrides(data_dir):
     assert rendered == 'My name is Jane'
 
 
+def test_render_with_nested_overrides(data_dir):
+    context = {'conf': {'a': {'b': 1, 'c': 2}, 'd': [3]}}
+    rendered, _ = templates.render(six.text_type(data_dir),
+                                   'template_with_json.txt',
+                                   context,
+                                   context_overrides={'conf': {'a': {'b': 4}}})
+    assert rendered == '4 {"a": {"b": 4, "c": 2}, "d": [3]}'
+    assert context == {'conf': {'a': {'b': 1, 'c': 2}, 'd': [3]}}
+
+
+def test_render_does_not_modify_context(tmp_path):
+    tmp_path.joinpath('template.txt').write_text(
+        u"{% set _ = nodes.append('x') %}{{ nodes|join(',') }}"
+    )
+    context = {'nodes': ['a', 'b'], 'conf': {'nodes': ['c']}}
+    for _ in range(2):
+        with pytest.raises(jinja2.UndefinedError):
+            templates.render(six.text_type(tmp_path), 'template.txt',
+                             context)
+    tmp_path.joinpath('template.txt').write_text(
+        u"{% set _ = conf.update({'x': 1}) %}{{ conf|tojson }}"
+    )
+    with pytest.raises(jinja2.UndefinedError):
+        templates.render(six.text_type(tmp_path), 'template.txt', context,
+                         context_overrides={'conf': {'y': 2}})
+    assert context == {'nodes': ['a', 'b'], 'conf': {'nodes': ['c']}}
+
+
 def test_extract_jinja_error_undefined_variable(data_dir):
     tpl_name = 'template.txt'
     tpl_path = data_dir.join(tpl_name)
@@ -75,6 +105,53 @@ def test_track_includes(data_dir):
     }
 
 
+def test_track_cached_templates(data_dir):
+    templates.render(six.text_type(data_dir), 'template.txt', {'name': 'Jo'})
+    _, loaded_files = templates.render(six.text_type(data_dir),
+                                       'template_with_include.txt',
+                                       {'name': 'Jane'})
+    assert loaded_files == {
+        data_dir.join('template_with_include.txt'),
+        data_dir.join('template.txt')
+    }
+    _, loaded_files = templates.render(six.text_type(data_dir),
+                                       'template.txt', {'name': 'Jane'})
+    assert loaded_files == {data_dir.join('template.txt')}
+
+
+def test_environment_is_shared(data_dir):
+    env = templates.get_environment(six.text_type(data_dir))
+    assert templates.get_environment(six.text_type(data_dir)) is env
+
+
+def test_bytecode_cache(data_dir, tmp_path, monkeypatch):
+    templates_dir = six.text_type(data_dir)
+    cache_dir = str(tmp_path)
+    rendered, _ = templates.render(templates_dir, 'template.txt',
+                                   {'name': 'John'},
+                                   bytecode_cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    # Simulate a new process
+    monkeypatch.setattr(templates, '_environments', {})
+    monkeypatch.setattr(jinja2.Environment, '_compile', None)
+    rendered, _ = templates.render(templates_dir, 'template.txt',
+                                   {'name': 'John'},
+                                   bytecode_cache_dir=cache_dir)
+    assert rendered == 'My name is John'
+
+
+def test_bytecode_cache_size_cap(data_dir, tmp_path):
+    cache = templates.SizeCappedBytecodeCache(str(tmp_path), 5000)
+    env = jinja2.Environment(loader=jinja2.DictLoader({
+        'tpl_%s' % i: 'x' * 300 + '{{ foo }}' for i in range(10)
+    }), bytecode_cache=cache)
+    for i in range(10):
+        env.get_template('tpl_%s' % i)
+    sizes = [os.path.getsize(str(tmp_path.joinpath(f)))
+             for f in os.listdir(str(tmp_path))]
+    assert 0 < sum(sizes) <= 5000
+
+
 def test_template_with_raise(data_dir):
     tpl_name = 'template_with_raise.txt'
     try:
@@ -87,3 +164,26 @@ def test_template_with_raise(data_dir):
         '    {% raise "baz" %}',
     ]
     assert error == 'User error: baz'
+
+
+def test_find_dependencies(data_dir):
+    templates_dir = six.text_type(data_dir)
+    files, complete = templates.find_dependencies(templates_dir,
+                                                  'template_with_macros.txt')
+    assert complete
+    assert files == {str(data_dir.join(n)) for n in (
+        'template_with_macros.txt', 'macros.txt', 'template.txt'
+    )}
+    files, complete = templates.find_dependencies(
+        templates_dir, 'template_with_dynamic_include.txt'
+    )
+    assert not complete
+    assert files == {str(data_dir.join(n)) for n in (
+        'template_with_dynamic_include.txt', 'template_with_include.txt',
+        'template.txt'
+    )}
+    assert templates.find_dependencies(templates_dir, 'missing.txt') == \
+        ({str(data_dir.join('missing.txt'))}, True)
+    assert templates.find_dependencies(
+        templates_dir, 'template_with_syntax_error.txt'
+    ) == ({str(data_dir.join('template_with_syntax_error.txt'))}, False)
@@ -17,3 +17,27 @@ def test_deep_merge():
         {'a': {'b': 'c'}},
         {'a': {'b': 'C', 'D': 'E'}, 'F': 'G'}
     ) == {'a': {'b': 'C', 'D': 'E'}, 'F': 'G'}
+
+
+def test_layered_mapping():
+    base = {'a': {'b': 'c', 'd': [1]}, 'e': 'f', 'g': {'h': 'i'}}
+    overrides = {'a': {'b': 'C', 'D': 'E'}, 'F': 'G', 'g': 'G'}
+    view = utils.LayeredMapping(base, overrides)
+    assert view == {'a': {'b': 'C', 'D': 'E', 'd': (1,)}, 'e': 'f',
+                    'F': 'G', 'g': 'G'}
+    assert isinstance(view['a'], utils.LayeredMapping)
+    assert view['a']['d'] == (1,)
+    assert isinstance(utils.LayeredMapping(base)['g'], utils.LayeredMapping)
+    frozen = utils.LayeredMapping({'a': [{'b': [1]}], 'c': {2}})
+    assert frozen['a'] == ({'b': (1,)},)
+    assert isinstance(frozen['a'][0], utils.LayeredMapping)
+    assert frozen['c'] == frozenset([2])
+    assert list(view) == ['a', 'e', 'g', 'F']
+    assert len(view) == 4
+    assert 'F' in view
+    assert 'x' not in view
+    with pytest.raises(KeyError):
+        view['x']
+    assert utils.LayeredMapping({'a': 1}, {'a': {'b': 2}})['a'] == {'b': 2}
+    assert str(view) == repr(view) == \
+        "{'a': {'b': 'C', 'd': (1,), 'D': 'E'}, 'e': 'f', 'g': 'G', 'F': 'G'}"
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+import yaml
+
+from jenskipper import yaml_cache
+
+
+def test_load(tmp_path, monkeypatch):
+    fname = tmp_path.joinpath('doc.yaml')
+    cache_dir = tmp_path.joinpath('cache')
+    cache_dir.mkdir()
+    fname.write_text(u'foo: [1, 2]\n')
+    assert yaml_cache.load(str(fname), str(cache_dir)) == {'foo': [1, 2]}
+    assert len(os.listdir(str(cache_dir))) == 1
+
+    # Unchanged files are not parsed again, even if touched
+    parse = yaml_cache.parse
+    monkeypatch.setattr(yaml_cache, 'parse', None)
+    assert yaml_cache.load(str(fname), str(cache_dir)) == {'foo': [1, 2]}
+    os.utime(str(fname), (0, 0))
+    assert yaml_cache.load(str(fname), str(cache_dir)) == {'foo': [1, 2]}
+
+    # Modified files are
+    monkeypatch.setattr(yaml_cache, 'parse', parse)
+    fname.write_text(u'foo: bar\n')
+    os.utime(str(fname), (0, 0))
+    assert yaml_cache.load(str(fname), str(cache_dir)) == {'foo': 'bar'}
+
+
+def test_load_corrupted_entry(tmp_path):
+    fname = tmp_path.joinpath('doc.yaml')
+    cache_dir = tmp_path.joinpath('cache')
+    cache_dir.mkdir()
+    fname.write_text(u'foo: bar\n')
+    yaml_cache.load(str(fname), str(cache_dir))
+    entry_fname, = cache_dir.iterdir()
+    entry_fname.write_bytes(b'garbage')
+    assert yaml_cache.load(str(fname), str(cache_dir)) == {'foo': 'bar'}
+
+
+def test_load_many(tmp_path):
+    cache_dir = tmp_path.joinpath('cache')
+    cache_dir.mkdir()
+    fnames = []
+    for i in range(4):
+        fname = tmp_path.joinpath('doc%s.yaml' % i)
+        fname.write_text(u'foo: %s\n' % i)
+        fnames.append(str(fname))
+    docs = yaml_cache.load_many(fnames, str(cache_dir), workers=2)
+    assert docs == [{'foo': i} for i in range(4)]
+    assert len(os.listdir(str(cache_dir))) == 4
+    assert yaml_cache.load_many(fnames, str(cache_dir)) == docs
+    assert yaml_cache.load_many(fnames) == docs
+
+
+def test_load_many_parse_error(tmp_path):
+    fnames = []
+    for i, text in enumerate([u'foo: 1\n', u'foo: [\n']):
+        fname = tmp_path.joinpath('doc%s.yaml' % i)
+        fname.write_text(text)
+        fnames.append(str(fname))
+    with pytest.raises(yaml.MarkedYAMLError):
+        yaml_cache.load_many(fnames, workers=2)
+
+
+def test_get_keys_lines(tmp_path):
+    fname = tmp_path.joinpath('doc.yaml')
+    fname.write_text(u'# comment\nfoo:\n  bar: 1\n\nbaz: 2\n')
+    assert yaml_cache.get_keys_lines(str(fname)) == {'foo': 2, 'baz': 5}